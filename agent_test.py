@@ -0,0 +1,98 @@
+from unittest import mock
+import asyncio
+import os
+import shutil
+import tempfile
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+import common.agent as agent
+import workflow.database as database
+from workflow.database import DEFAULT_DB_CONFIG, collection_name_for_task, get_chroma_client
+from workflow.search_session import _sessions, get_search_session
+
+
+_patches = []
+_directory = None
+
+
+def setup_module(module=None):
+    """기본 설정의 컬렉션이 임시 디렉토리에 생성되도록 전역 클라이언트 / 경로 교체 (작업 디렉토리는 그대로)"""
+    global _directory
+    _directory = tempfile.mkdtemp()
+    _patches.extend([
+        mock.patch.object(DEFAULT_DB_CONFIG, "persist_directory", _directory),
+        mock.patch.multiple(database, _global_chroma_client=None, _global_client_path=None),
+        mock.patch.object(agent, "app", agent.app)
+    ])
+    for patch in _patches:
+        patch.start()
+
+
+def teardown_module(module=None):
+    while _patches:
+        _patches.pop().stop()
+    shutil.rmtree(_directory, ignore_errors=True)
+
+
+class FakeApp:
+    """그래프 대신 작업 컬렉션을 만들고 검색 세션을 사용하는 가짜 앱"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.run_id = None
+
+    async def ainvoke(self, state, config):
+        self.run_id = state["run_id"]
+        get_chroma_client().get_or_create_collection(collection_name_for_task(state["task_id"]))
+        get_search_session(state["run_id"])
+        if self.fail:
+            raise RuntimeError("graph failed")
+        return {"final_report": "report", "context": "context", "messages": []}
+
+
+def _collections():
+    return {collection.name for collection in get_chroma_client().list_collections()}
+
+
+def test_run_drops_task_collection():
+    agent.app = FakeApp()
+    assert agent.invoke_scenarios([], "task-047", "job-1", {}) == ("report", "context", [])
+    assert collection_name_for_task("task-047") not in _collections()
+    assert agent.app.run_id not in _sessions
+
+
+def test_failed_run_drops_task_collection():
+    agent.app = FakeApp(fail=True)
+    try:
+        agent.invoke_scenarios([], "task-047-fail", "job-1", {})
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("그래프 예외가 전달되어야 함")
+    assert collection_name_for_task("task-047-fail") not in _collections()
+    assert agent.app.run_id not in _sessions
+
+
+def test_invoke_inside_running_loop():
+    """Jupyter처럼 이벤트 루프가 실행 중인 스레드에서도 동기 진입점 사용 가능"""
+    agent.app = FakeApp()
+
+    async def caller():
+        return agent.invoke_scenarios([], "task-031-loop", "job-1", {})
+
+    assert asyncio.run(caller()) == ("report", "context", [])
+    assert collection_name_for_task("task-031-loop") not in _collections()
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        for name, test in list(globals().items()):
+            if name.startswith("test_"):
+                test()
+                print(f"✅ {name}")
+    finally:
+        teardown_module()
@@ -1,4 +1,4 @@
-from typing import Any, List
+from typing import Any, Callable, Dict, List, Optional
 from common.test_backendclient import TestBackendClient as BackendClient
 from common.agent import invoke_report_details_test, invoke_scenarios_test
 from common.agent import invoke_scenarios
@@ -8,25 +8,44 @@ from common.models import ScenarioCreate
 from common.sample import sample_create_data
 from pdf_export import PDFReportExporter
 from pdf_export.pdf_generator import transform_flat_to_hierarchical
+from workflow.token_ledger import TokenLedger, ledger_stage, track_tokens
 import logging
 
 
 class Generator:
-    def __init__(self) -> None:
+    def __init__(self, on_progress: Optional[Callable[[str], None]] = None) -> None:
         self.scenario: ScenarioCreate
         self.report: ReportCreate
         self.logger = logging.getLogger(__name__)
+        self.token_summary: Dict[str, Any] = {}
+        self.token_summary_path: Optional[str] = None
+        # 단계 진행 알림 (worker의 상태 파일 갱신용)
+        self.on_progress = on_progress
+
+    def _progress(self, stage: str) -> None:
+        if self.on_progress is not None:
+            self.on_progress(stage)
 
     def generate_no_data_report(self, task_id: str, job_id: str, job_info: dict, backend_client: BackendClient):
         pass
 
     def generate_report(self, task_id: str, job_id: str, artifacts: List[dict], job_info: dict, backend_client: BackendClient):
+        # 작업 전체의 LLM / 임베딩 토큰 사용량을 노드별로 기록 (실패해도 요약은 저장)
+        with track_tokens(task_id) as ledger:
+            try:
+                self._generate_report(task_id, job_id, artifacts, job_info, backend_client)
+            finally:
+                self._save_token_summary(ledger)
+
+    def _generate_report(self, task_id: str, job_id: str, artifacts: List[dict], job_info: dict, backend_client: BackendClient):
         # 1. artifacts를 분석하고, 시나리오 생성
         self.logger.info(f"Starting report generation for task_id: {task_id}, job_id: {job_id}")
+        self._progress("scenario")
         self._generate_scenarios(artifacts, task_id, job_id, job_info)
 
         # 2. 생성된 시나리오 데이터베이스에 저장
         self.logger.debug("Saving scenario to database")
+        self._progress("save_scenario")
         scenario_saved = backend_client.save_scenario(self.scenario)
         
         if not scenario_saved:
@@ -38,11 +57,13 @@ class Generator:
         # 3. 생성된 시나리오들 기반으로 보고서 내용 생성
         # 4. 위 내용들 정리하면서 보고서 나머지 항목들 생성
         self.logger.debug("Generating report details")
+        self._progress("report_details")
         self._generate_report_details(job_info, task_id)
 
         # 5. 보고서 항목들 데이터베이스에 저장
         user_id = job_info.get("user_id", "system")
         self.logger.debug(f"Saving report to database for user_id: {user_id}")
+        self._progress("save_report")
         report_saved = backend_client.save_report(self.report, user_id, job_id)
         
         if not report_saved:
@@ -53,9 +74,19 @@ class Generator:
         
         # 6. 보고서 pdf 처리
         self.logger.debug("Starting PDF generation")
+        self._progress("pdf")
         self._generate_pdf_report(report_saved, user_id)
         self.logger.info("Report generation completed successfully")
 
+    def _save_token_summary(self, ledger: TokenLedger) -> None:
+        self.token_summary = ledger.summary()
+        self.token_summary_path = ledger.write()
+        total = self.token_summary["total"]
+        self.logger.info(
+            f"Token usage: {total['calls']} calls, input {total['input_tokens']:,} / output {total['output_tokens']:,} tokens, "
+            f"estimated cost ${total['cost']:.4f} (summary: {self.token_summary_path})"
+        )
+
     def _generate_scenarios(self, artifacts, task_id: str, job_id: str, job_info: dict[str, Any]) -> None:
         # 1. llm service를 호출해서 시나리오 생성
         self.logger.debug(f"Invoking LLM service to generate scenarios for task_id: {task_id}")
@@ -85,7 +116,8 @@ class Generator:
         self.logger.debug("Generating report details for each section type")
         for sectiontype in SectionTypeEnum:
             self.logger.debug(f"Processing section: {sectiontype.value}")
-            content = invoke_report_details(sectiontype, data)
+            with ledger_stage(f"report_exporter:{sectiontype.value}"):
+                content = invoke_report_details(sectiontype, data)
             
             if not content:
                 self.logger.warning(f"No detail data generated for section: {sectiontype.value}")
@@ -1,11 +1,48 @@
 # agentic ai code implement
 from typing import Any, List, cast
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import logging
+
 from common.models import SectionTypeEnum, ReportBase, ReportDetailBase, ReportDetailCreate, ReportCreate, ScenarioCreate, ScenarioStepCreate
 from workflow.rag_agent_workflow import app, AgentState
 from workflow.classes import create_initial_state
+from workflow.database import collection_name_for_task, drop_collection
 from workflow.prompts import RAW_REQUIREMENTS
+from workflow.tools import ToolContext
+
+logger = logging.getLogger(__name__)
+
+def _release_run(state: AgentState) -> None:
+    """실행 단위 상태 정리 (검색 세션, 작업 전용 컬렉션 + 로컬 인덱스 + 도구 결과 근거 저장소)"""
+    ToolContext.end_run(state["run_id"])
+    # 컬렉션은 작업마다 새로 만들어지므로 실행이 끝나면 필요 없음 (워커 밖 호출도 디스크 / 메모리 누수 없이)
+    try:
+        drop_collection(collection_name_for_task(state["task_id"]))
+    except Exception as e:
+        logger.warning("컬렉션 정리 실패 (task_id: %s): %s", state['task_id'], e)
 
 def invoke_scenarios(artifacts, task_id, job_id, job_info) -> tuple[ScenarioCreate, str, List]:
+    """
+    시나리오 생성 동기 진입점 - 비동기 그래프 실행(ainvoke_scenarios)을 새 이벤트 루프에서 실행
+    (한 턴의 여러 도구 호출을 ToolNode가 동시에 실행, 이벤트 루프 안에서는 ainvoke_scenarios를 직접 await)
+
+    이미 이벤트 루프가 실행 중인 스레드(Jupyter 등)에서 호출하면 별도 스레드의 새 루프에서 실행하고 완료까지 대기합니다.
+    """
+    coroutine = ainvoke_scenarios(artifacts, task_id, job_id, job_info)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    # 토큰 장부 등 contextvar는 호출 스레드의 값을 복사해 사용
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="invoke-scenarios") as executor:
+        return executor.submit(context.run, asyncio.run, coroutine).result()
+
+async def ainvoke_scenarios(artifacts, task_id, job_id, job_info) -> tuple[ScenarioCreate, str, List]:
+    """시나리오 생성 (비동기) - 한 턴의 여러 도구 호출을 ToolNode가 동시에 실행"""
     initial_state = create_initial_state(
         job_id=job_id,
         task_id=task_id,
@@ -19,7 +56,11 @@ def invoke_scenarios(artifacts, task_id, job_id, job_info) -> tuple[ScenarioCrea
     )
 
     initial_state = cast(AgentState, initial_state)
-    final_state = app.invoke(initial_state, config={"recursion_limit": 80})
+    try:
+        final_state = await app.ainvoke(initial_state, config={"recursion_limit": 80})
+    finally:
+        # 검색 세션 / 도구 결과 원문은 실행 중에만 필요 (반환하는 messages에는 요약 + 핸들만 남음)
+        _release_run(initial_state)
     return final_state["final_report"], final_state["context"], final_state["messages"]
 
 def invoke_scenarios_test(artifacts, task_id: str, job_id: str, job_info: dict[str, Any]) -> tuple[ScenarioCreate, str]:
@@ -11,12 +11,12 @@ from dotenv import load_dotenv
 env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
 load_dotenv(env_path)
 
-from langchain.chat_models import init_chat_model
+from workflow.llm_factory import get_chat_model
 
 # LLM 초기화
-llm_small = init_chat_model("google_genai:gemini-2.5-flash-lite", temperature=0)
-llm_medium = init_chat_model("google_genai:gemini-2.5-flash", temperature=0)
-llm_large = init_chat_model("google_genai:gemini-2.5-pro", temperature=0)
+llm_small = get_chat_model("small")
+llm_medium = get_chat_model("medium")
+llm_large = get_chat_model("large")
 
 def load_artifacts(task_id: str) -> List[dict]:
     """아티팩트를 백엔드에서 로드"""
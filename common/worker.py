@@ -0,0 +1,369 @@
+"""
+보고서 생성 워커 (한 프로세스에서 여러 작업 동시 실행)
+
+로컬 SQLite 큐(백엔드 작업 큐 대용)에서 작업을 가져와 최대 N개를 동시에 실행합니다.
+- LLM 호출은 등급별 게이트웨이를 공유 (workflow/llm_gateway.py: 우선순위 대기열, LLM_RPM_* 속도 제한)
+  → 처리량은 프로세스 수가 아니라 API 할당량에 맞춰 늘어남
+- 작업마다 별도 벡터 컬렉션 사용 (task_id 기준), 작업 종료 시 삭제
+- 작업별 진행 단계 / 대기 시간 / 처리 시간 / 토큰 사용량, 게이트웨이 대기열 통계를 상태 파일(JSON)에 기록
+
+사용 방법:
+    python -m common.worker enqueue <task_id> <job_id>
+    python -m common.worker run --concurrency 4          # 큐를 계속 감시
+    python -m common.worker run --concurrency 4 --drain  # 큐가 비면 종료
+    python -m common.worker status
+"""
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import closing
+from pathlib import Path
+import argparse
+import json
+import logging
+import os
+import signal
+import sqlite3
+import sys
+import threading
+import time
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from workflow.llm_gateway import get_gateway_stats
+from workflow.utils import env_float, env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_QUEUE_PATH = "./worker_queue.sqlite"
+DEFAULT_STATUS_PATH = "./worker_status.json"
+DEFAULT_CONCURRENCY = 4
+DEFAULT_POLL_INTERVAL = 2.0
+STATUS_HISTORY_SIZE = 200  # 상태 파일에 남길 완료 작업 수
+
+
+# --------------------------------------------------------------------------
+# 작업 큐 (SQLite)
+# --------------------------------------------------------------------------
+
+class TaskQueue:
+    """로컬 작업 큐 - 여러 워커 프로세스가 같은 파일을 공유해도 작업을 한 번만 가져감"""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "task_id TEXT PRIMARY KEY, job_id TEXT NOT NULL, status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, enqueued_at REAL NOT NULL, "
+                "started_at REAL, finished_at REAL, error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, enqueued_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # 호출마다 연결 (스레드 간 연결 공유 없음), 자동 커밋 + 명시적 트랜잭션
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def enqueue(self, task_id: str, job_id: str) -> bool:
+        """작업 추가 (이미 있는 task_id면 실패/완료 상태일 때만 다시 대기열로)"""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "INSERT INTO tasks (task_id, job_id, status, enqueued_at) VALUES (?, ?, 'queued', ?) "
+                "ON CONFLICT(task_id) DO UPDATE SET job_id = excluded.job_id, status = 'queued', "
+                "enqueued_at = excluded.enqueued_at, started_at = NULL, finished_at = NULL, error = NULL "
+                "WHERE tasks.status IN ('done', 'failed')",
+                (task_id, job_id, time.time())
+            )
+            return cursor.rowcount > 0
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """가장 오래된 대기 작업을 실행 중으로 바꾸고 반환 (없으면 None)"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT task_id, job_id, enqueued_at, attempts FROM tasks "
+                "WHERE status = 'queued' ORDER BY enqueued_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            started_at = time.time()
+            conn.execute(
+                "UPDATE tasks SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE task_id = ?",
+                (started_at, row[0])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return {
+            "task_id": row[0],
+            "job_id": row[1],
+            "enqueued_at": row[2],
+            "attempts": row[3] + 1,
+            "started_at": started_at
+        }
+
+    def finish(self, task_id: str, error: Optional[str] = None) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE tasks SET status = ?, finished_at = ?, error = ? WHERE task_id = ?",
+                ("failed" if error else "done", time.time(), error, task_id)
+            )
+
+    def requeue_running(self) -> int:
+        """이전 워커가 비정상 종료하며 남긴 실행 중 작업을 대기열로 복구"""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            )
+            return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+# --------------------------------------------------------------------------
+# 상태 파일
+# --------------------------------------------------------------------------
+
+class StatusBoard:
+    """작업별 진행 상황 / 처리 시간을 JSON 파일로 기록 (갱신마다 원자적으로 교체)"""
+
+    def __init__(self, path: str, concurrency: int):
+        self.path = path
+        self.concurrency = concurrency
+        self.started_at = time.time()
+        self.running: Dict[str, Dict[str, Any]] = {}
+        self.finished: List[Dict[str, Any]] = []
+        self.completed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def start(self, task: Dict[str, Any]) -> None:
+        with self._lock:
+            self.running[task["task_id"]] = {
+                "task_id": task["task_id"],
+                "job_id": task["job_id"],
+                "attempts": task["attempts"],
+                "stage": "loading",
+                "queue_wait": round(task["started_at"] - task["enqueued_at"], 3),
+                "started_at": task["started_at"],
+                "stage_started_at": task["started_at"],
+                "stages": {}
+            }
+            self._write()
+
+    def stage(self, task_id: str, stage: str) -> None:
+        with self._lock:
+            job = self.running.get(task_id)
+            if job is None:
+                return
+            now = time.time()
+            job["stages"][job["stage"]] = round(now - job["stage_started_at"], 3)
+            job["stage"], job["stage_started_at"] = stage, now
+            self._write()
+
+    def finish(self, task_id: str, error: Optional[str], tokens: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            job = self.running.pop(task_id, None)
+            if job is None:
+                return
+            now = time.time()
+            job["stages"][job["stage"]] = round(now - job.pop("stage_started_at"), 3)
+            job.update({
+                "stage": "failed" if error else "done",
+                "finished_at": now,
+                "latency": round(now - job["started_at"], 3),
+                "error": error,
+                "tokens": tokens
+            })
+            if error:
+                self.failed += 1
+            else:
+                self.completed += 1
+            self.finished = (self.finished + [job])[-STATUS_HISTORY_SIZE:]
+            self._write()
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = time.time() - self.started_at
+        latencies = [job["latency"] for job in self.finished if not job["error"]]
+        return {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "updated_at": time.time(),
+            "concurrency": self.concurrency,
+            "completed": self.completed,
+            "failed": self.failed,
+            "jobs_per_minute": round((self.completed + self.failed) / elapsed * 60, 3) if elapsed > 0 else 0.0,
+            "avg_latency": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "llm_gateway": get_gateway_stats(),
+            "running": list(self.running.values()),
+            "finished": list(reversed(self.finished))
+        }
+
+    def _write(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f, ensure_ascii=False, indent=2, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"상태 파일 저장 실패: {e}")
+
+
+# --------------------------------------------------------------------------
+# 워커
+# --------------------------------------------------------------------------
+
+def _default_client_factory():
+    from common.test_backendclient import TestBackendClient as BackendClient
+    return BackendClient()
+
+
+class ReportWorker:
+    """큐의 작업을 최대 concurrency개까지 동시에 실행 (작업마다 Generator 인스턴스 생성)"""
+
+    def __init__(
+        self,
+        queue: TaskQueue,
+        status_path: str = DEFAULT_STATUS_PATH,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        client_factory: Callable[[], Any] = _default_client_factory
+    ):
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.client_factory = client_factory
+        self.status = StatusBoard(status_path, self.concurrency)
+        self._clients = threading.local()
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """새 작업 수락 중지 (실행 중인 작업은 끝까지 진행)"""
+        self._stop.set()
+
+    def _client(self) -> Any:
+        # 백엔드 클라이언트는 스레드별로 하나 (작업 스레드 간 세션 공유 없음)
+        client = getattr(self._clients, "client", None)
+        if client is None:
+            client = self.client_factory()
+            self._clients.client = client
+        return client
+
+    def run(self, drain: bool = False) -> Dict[str, Any]:
+        """작업 실행 루프 (drain=True면 큐가 비고 실행 중인 작업이 끝나면 종료)"""
+        recovered = self.queue.requeue_running()
+        if recovered:
+            logger.warning(f"중단된 작업 {recovered}개를 대기열로 복구")
+        logger.info(f"워커 시작: 동시 실행 {self.concurrency}개, 큐 {self.queue.path}")
+
+        running: set[Future] = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="report-worker") as executor:
+            while True:
+                while not self._stop.is_set() and len(running) < self.concurrency:
+                    task = self.queue.claim()
+                    if task is None:
+                        break
+                    running.add(executor.submit(self._run_job, task))
+
+                if not running:
+                    if self._stop.is_set() or drain:
+                        break
+                    self._stop.wait(self.poll_interval)
+                    continue
+
+                _, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+
+        snapshot = self.status.snapshot()
+        logger.info(f"워커 종료: 완료 {snapshot['completed']}개, 실패 {snapshot['failed']}개")
+        return snapshot
+
+    def _run_job(self, task: Dict[str, Any]) -> None:
+        from common.Generator import Generator
+        from workflow.database import collection_name_for_task, drop_collection
+
+        task_id, job_id = task["task_id"], task["job_id"]
+        self.status.start(task)
+        generator = Generator(on_progress=lambda stage: self.status.stage(task_id, stage))
+        error: Optional[str] = None
+        client = None
+        try:
+            client = self._client()
+            job_info = client.load_job_info(task_id, job_id)
+            artifacts = client.load_artifacts(task_id, job_id)
+            generator.generate_report(task_id, job_id, artifacts, job_info, client)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.exception(f"작업 실패 (task_id: {task_id})")
+        finally:
+            # 작업 전용 컬렉션 정리 (디스크 / 메모리 인덱스) - 시나리오 생성 전에 실패한 경우 대비, 이미 정리됐으면 무시
+            try:
+                drop_collection(collection_name_for_task(task_id))
+            except Exception as e:
+                logger.warning(f"컬렉션 정리 실패 (task_id: {task_id}): {e}")
+
+        if client is not None:
+            try:
+                client.send_completion_callback(task_id, success=error is None, error_message=error)
+            except Exception as e:
+                logger.warning(f"완료 콜백 실패 (task_id: {task_id}): {e}")
+        self.queue.finish(task_id, error)
+        self.status.finish(task_id, error, generator.token_summary.get("total"))
+
+
+# --------------------------------------------------------------------------
+# CLI
+# --------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="보고서 생성 워커")
+    parser.add_argument("--queue", default=env_str("WORKER_QUEUE_PATH", DEFAULT_QUEUE_PATH), help="SQLite 큐 파일")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="작업 추가")
+    enqueue.add_argument("task_id")
+    enqueue.add_argument("job_id")
+
+    run = sub.add_parser("run", help="워커 실행")
+    run.add_argument("--concurrency", type=int, default=env_int("WORKER_CONCURRENCY", DEFAULT_CONCURRENCY))
+    run.add_argument("--status", default=env_str("WORKER_STATUS_PATH", DEFAULT_STATUS_PATH), help="상태 파일 경로")
+    run.add_argument("--poll-interval", type=float, default=env_float("WORKER_POLL_INTERVAL", DEFAULT_POLL_INTERVAL))
+    run.add_argument("--drain", action="store_true", help="큐가 비면 종료")
+
+    sub.add_parser("status", help="큐 상태 출력")
+
+    args = parser.parse_args(argv)
+    queue = TaskQueue(args.queue)
+
+    if args.command == "enqueue":
+        added = queue.enqueue(args.task_id, args.job_id)
+        print(f"{'✅ 작업 추가' if added else 'ℹ️  이미 대기/실행 중'}: {args.task_id}")
+        return 0
+
+    if args.command == "status":
+        print(json.dumps(queue.counts(), ensure_ascii=False))
+        return 0
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(name)s %(levelname)s %(message)s")
+    worker = ReportWorker(queue, args.status, args.concurrency, args.poll_interval)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: worker.stop())
+    snapshot = worker.run(drain=args.drain)
+    return 1 if snapshot["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
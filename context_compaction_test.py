@@ -0,0 +1,71 @@
+from unittest import mock
+import os
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from workflow.context_compaction import (
+    DEFAULT_KEEP_TURNS,
+    DEFAULT_MIN_MESSAGE_TOKENS,
+    DEFAULT_TRIGGER_TOKENS,
+    ContextCompactor
+)
+from workflow.tool_digest import DIGEST_HEADER
+
+
+def _tool_result(call_id: str, rows: int = 80) -> ToolMessage:
+    table = "\n".join(f"| art_{call_id}_{i} | usb | {'x' * 40} |" for i in range(rows))
+    content = f"✅ {rows}개 검색 완료\n| id | artifact_type | detail |\n|---|---|---|\n{table}"
+    return ToolMessage(content=content, tool_call_id=call_id, name="artifact_search")
+
+
+def _history(turns: int):
+    messages = [SystemMessage(content="system"), HumanMessage(content="요구사항")]
+    for turn in range(turns):
+        call_id = f"c{turn}"
+        messages.append(AIMessage(content="", tool_calls=[{"id": call_id, "name": "artifact_search", "args": {}}]))
+        messages.append(_tool_result(call_id))
+    return messages
+
+
+def test_from_env_empty_values():
+    """.env.template을 그대로 복사한 .env (빈 값)에서도 기본값 사용"""
+    with mock.patch.dict(os.environ, {"AGENT_COMPACTION_TRIGGER_TOKENS": "",
+                                      "AGENT_COMPACTION_KEEP_TURNS": "",
+                                      "AGENT_COMPACTION_MIN_MESSAGE_TOKENS": ""}):
+        compactor = ContextCompactor.from_env()
+    assert compactor.trigger_tokens == DEFAULT_TRIGGER_TOKENS
+    assert compactor.keep_turns == DEFAULT_KEEP_TURNS
+    assert compactor.min_message_tokens == DEFAULT_MIN_MESSAGE_TOKENS
+
+
+def test_from_env_zero_disables():
+    with mock.patch.dict(os.environ, {"AGENT_COMPACTION_TRIGGER_TOKENS": "0"}):
+        assert not ContextCompactor.from_env().enabled
+
+
+def test_old_tool_results_digested():
+    messages = _history(5)
+    compacted, stats = ContextCompactor(trigger_tokens=100, keep_turns=2, min_message_tokens=50).compact(messages)
+
+    assert compacted[:2] == messages[:2]
+    assert compacted[-4:] == messages[-4:]
+    assert stats["compacted"] == 3 and stats["after_tokens"] < stats["before_tokens"]
+    digest = compacted[3].content
+    assert digest.startswith(DIGEST_HEADER) and "art_c0_0" in digest
+
+
+def test_under_trigger_unchanged():
+    messages = _history(5)
+    compacted, stats = ContextCompactor(trigger_tokens=10_000_000).compact(messages)
+    assert compacted == messages and stats["compacted"] == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,80 @@
+from typing import List
+from unittest import mock
+import asyncio
+import os
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+from langchain_core.embeddings import Embeddings
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+import workflow.database as database
+from workflow.database import VectorDBConfig, aembed_query_texts, embed_query_texts, get_embeddings
+from workflow.embedding_cache import DEFAULT_EMBEDDING_CACHE_SIZE, CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls: List[List[str]] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def test_empty_env_values():
+    """.env.template을 그대로 복사한 .env에서도 임베딩 생성 가능"""
+    with mock.patch.dict(os.environ, {"EMBEDDING_CACHE_SIZE": "", "EMBEDDING_CACHE_PATH": ""}):
+        embeddings = get_embeddings(VectorDBConfig(partition_mode="none"))
+        assert isinstance(embeddings, CachedEmbeddings)
+        assert embeddings.max_size == DEFAULT_EMBEDDING_CACHE_SIZE
+        assert embeddings.persist_path is None
+
+
+def test_queries_embedded_once():
+    base = CountingEmbeddings()
+    cache = CachedEmbeddings(base, "test:model", max_size=8)
+    assert cache.embed_query("usb 연결") == cache.embed_query("usb 연결")
+    assert cache.embed_queries(["usb 연결", "웹메일"]) == [[6.0, 1.0], [3.0, 1.0]]
+    assert base.calls == [["usb 연결"], ["웹메일"]]
+
+
+def test_model_key_separates_vectors():
+    base = CountingEmbeddings()
+    CachedEmbeddings(base, "a:model", max_size=8).embed_query("q")
+    CachedEmbeddings(base, "b:model", max_size=8).embed_query("q")
+    assert len(base.calls) == 2
+
+
+def test_uncached_batch_keeps_query_task_type():
+    """캐시를 끈 경우(장부 래퍼만 있음)에도 묶음 쿼리는 단건 embed_query와 같은 task type 사용"""
+    calls = []
+
+    def embed_documents(self, texts, **kwargs):
+        calls.append(kwargs)
+        return [[0.0] for _ in texts]
+
+    async def aembed_documents(self, texts, **kwargs):
+        return embed_documents(self, texts, **kwargs)
+
+    with mock.patch.dict(os.environ, {"EMBEDDING_CACHE_SIZE": "0"}), \
+            mock.patch.dict(database._embeddings_instances, clear=True), \
+            mock.patch.object(GoogleGenerativeAIEmbeddings, "embed_documents", embed_documents), \
+            mock.patch.object(GoogleGenerativeAIEmbeddings, "aembed_documents", aembed_documents):
+        embeddings = get_embeddings(VectorDBConfig(partition_mode="none"))
+        assert not isinstance(embeddings, (CachedEmbeddings, GoogleGenerativeAIEmbeddings))
+        embed_query_texts(embeddings, ["usb", "웹메일"])
+        asyncio.run(aembed_query_texts(embeddings, ["usb", "웹메일"]))
+    assert calls == [{"task_type": "RETRIEVAL_QUERY"}] * 2
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
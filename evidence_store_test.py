@@ -0,0 +1,104 @@
+from unittest import mock
+import os
+import re
+import tempfile
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from workflow.evidence_store import (
+    DEFAULT_MEMORY_CHARS,
+    DEFAULT_SPILL_DIR,
+    EvidenceStore,
+    drop_evidence_store,
+    evidence_handle,
+    expand_recent_evidence,
+    get_evidence_store,
+    resolve_cited_evidence,
+    store_tool_messages
+)
+from workflow.tools import ToolContext
+
+
+def _table(ids):
+    rows = "\n".join(f"| {i} | some long value text here for row {i} padding padding padding |" for i in ids)
+    return f"조회 결과 {len(ids)}건\n[file] {len(ids)}건\n| id | value |\n|---|---|\n{rows}"
+
+
+def _history(turns: int = 6):
+    messages = []
+    for turn in range(turns):
+        call_id = f"c{turn}"
+        messages.append(AIMessage(content="", tool_calls=[{"name": "search", "args": {"q": turn}, "id": call_id}]))
+        messages.append(ToolMessage(content=_table([f"a{turn}_{k}" for k in range(30)]),
+                                    tool_call_id=call_id, name="search"))
+    messages.append(ToolMessage(content="small", tool_call_id="x", name="search"))
+    return messages
+
+
+def _handles(text: str):
+    return re.findall(r"### \[(ev_\d+)\]", text)
+
+
+def test_from_env_empty_values():
+    """.env.template을 그대로 복사한 .env (빈 값)에서도 기본값 사용"""
+    with mock.patch.dict(os.environ, {"EVIDENCE_SPILL_DIR": "", "EVIDENCE_MEMORY_CHARS": "",
+                                      "EVIDENCE_MIN_TOKENS": "", "EVIDENCE_RESOLVE_TOKENS": ""}):
+        store = EvidenceStore.from_env("empty-env")
+        assert store.spill_dir == DEFAULT_SPILL_DIR and store.memory_chars == DEFAULT_MEMORY_CHARS
+        stored = store_tool_messages(_history(1), store)
+        assert resolve_cited_evidence(stored, store) is not None
+
+
+def test_store_spill_and_expand():
+    store = EvidenceStore("spill", spill_dir=tempfile.mkdtemp(), memory_chars=5000)
+    with mock.patch.dict(os.environ, {"EVIDENCE_MIN_TOKENS": "50"}):
+        stored = store_tool_messages(_history(), store)
+
+    tool_messages = [m for m in stored if isinstance(m, ToolMessage)]
+    assert [evidence_handle(m) for m in tool_messages] == [f"ev_{i:04d}" for i in range(1, 7)] + [None]
+    assert "a0_0" in tool_messages[0].content and "padding" not in tool_messages[0].content
+    assert store.get_stats()["spilled"] > 0
+    assert store.get("ev_0001").startswith("조회 결과")  # 디스크에서 읽음
+
+    expanded = expand_recent_evidence(stored, store, keep_turns=2)
+    full = [m for m in expanded if isinstance(m, ToolMessage) and "padding |" in m.content]
+    assert len(full) == 2
+
+    path = store.spill_path
+    assert os.path.exists(path)
+    store.close()
+    assert not os.path.exists(path)
+
+
+def test_resolve_cited_only():
+    store = EvidenceStore("cited", spill_dir=tempfile.mkdtemp())
+    with mock.patch.dict(os.environ, {"EVIDENCE_MIN_TOKENS": "50"}):
+        stored = store_tool_messages(_history(), store)
+    cited = stored + [AIMessage(content="근거 ev_0002 참고", tool_calls=[
+        {"name": "finish_analysis_tool", "args": {"evidence_artifact_ids": ["a4_3"]}, "id": "f"}
+    ])]
+    assert _handles(resolve_cited_evidence(cited, store, 100_000)) == ["ev_0002", "ev_0005"]
+    # 인용이 없으면 최근 결과부터 예산만큼
+    assert _handles(resolve_cited_evidence(stored, store, 700))[-1] == "ev_0006"
+
+
+def test_stores_are_per_run():
+    """같은 컬렉션의 다른 실행은 핸들을 공유하지 않고, 실행 종료 시 삭제"""
+    first, second = get_evidence_store("run-a"), get_evidence_store("run-b")
+    assert first is not second
+    first.put("원문", "search")
+    ToolContext.end_run("run-a")
+    assert get_evidence_store("run-a").handles() == []
+    drop_evidence_store("run-a")
+    drop_evidence_store("run-b")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
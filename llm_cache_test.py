@@ -0,0 +1,113 @@
+from unittest import mock
+import os
+import threading
+import time
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+from workflow.llm_cache import (
+    DEFAULT_INFLIGHT_TIMEOUT,
+    DEFAULT_MAX_ENTRIES,
+    DEFAULT_TTL_SECONDS,
+    LLMResponseCache,
+    cache_key
+)
+from workflow.llm_gateway import GatewayChatModel
+
+
+def _model(cache: LLMResponseCache) -> GatewayChatModel:
+    return GatewayChatModel(tier="small", model="gemini-2.5-flash-lite", temperature=0, cache=cache)
+
+
+def _prompt(call_id: str) -> str:
+    return dumps([
+        HumanMessage(content="usb 조회", id="m1"),
+        AIMessage(content="", tool_calls=[{"id": call_id, "name": "artifact_search", "args": {}}]),
+        ToolMessage(content="결과", tool_call_id=call_id)
+    ])
+
+
+def test_from_env_empty_values():
+    """.env.template을 그대로 복사한 .env (빈 값)에서도 기본값 사용"""
+    with mock.patch.dict(os.environ, {"LLM_CACHE_PATH": "", "LLM_CACHE_MAX_ENTRIES": "",
+                                      "LLM_CACHE_TTL_SECONDS": "", "LLM_CACHE_INFLIGHT_TIMEOUT": ""}):
+        cache = LLMResponseCache.from_env("small")
+    assert cache.path is None
+    assert cache.max_entries == DEFAULT_MAX_ENTRIES
+    assert cache.ttl_seconds == DEFAULT_TTL_SECONDS
+    assert cache.inflight_timeout == DEFAULT_INFLIGHT_TIMEOUT
+
+
+def test_key_ignores_volatile_ids():
+    """도구 호출 id / 메시지 id는 키에 영향 없음, 모델 설정은 영향 있음"""
+    assert cache_key(_prompt("call-a"), "model-1") == cache_key(_prompt("call-b"), "model-1")
+    assert cache_key(_prompt("call-a"), "model-1") != cache_key(_prompt("call-a"), "model-2")
+
+
+def test_hit_skips_model_call():
+    calls = []
+
+    def generate(self, messages, stop=None, run_manager=None, **kwargs):
+        calls.append(messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="답변"))])
+
+    model = _model(LLMResponseCache("small"))
+    with mock.patch.object(ChatGoogleGenerativeAI, "_generate", generate):
+        assert model.invoke("usb 조회").content == "답변"
+        assert model.invoke("usb 조회").content == "답변"
+    assert len(calls) == 1
+    assert model.cache.get_stats()["hits"] == 1
+
+
+def test_failed_call_releases_waiters():
+    """먼저 보낸 호출이 실패하면 같은 요청을 기다리던 호출은 대기 시간 초과 전에 직접 호출"""
+    cache = LLMResponseCache("small", inflight_timeout=30)
+    model = _model(cache)
+    first_started = threading.Event()
+    release_first = threading.Event()
+
+    def generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if not first_started.is_set():
+            first_started.set()
+            release_first.wait(5)
+            raise RuntimeError("quota exceeded")
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="재시도 성공"))])
+
+    results = {}
+
+    def call(name):
+        try:
+            results[name] = model.invoke("usb 조회").content
+        except RuntimeError as e:
+            results[name] = e
+
+    with mock.patch.object(ChatGoogleGenerativeAI, "_generate", generate):
+        owner = threading.Thread(target=call, args=("owner",))
+        owner.start()
+        assert first_started.wait(5)
+        waiter = threading.Thread(target=call, args=("waiter",))
+        waiter.start()
+        time.sleep(0.2)  # 대기 호출이 진행 중인 요청에 합류
+        started = time.monotonic()
+        release_first.set()
+        owner.join(5)
+        waiter.join(5)
+
+    assert isinstance(results["owner"], RuntimeError)
+    assert results["waiter"] == "재시도 성공"
+    assert time.monotonic() - started < 5
+    assert not cache._inflight
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,136 @@
+from unittest import mock
+import asyncio
+import os
+import threading
+import time
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+import workflow.llm_gateway as llm_gateway
+from workflow.llm_gateway import (
+    DEFAULT_RATE_BURST,
+    GatewayChatModel,
+    TierGateway,
+    _create_rate_limiter,
+    resolve_priority
+)
+
+
+def _wait_for_queue(gateway: TierGateway, depth: int) -> None:
+    """대기열 길이가 depth가 될 때까지 대기 (도착 순서 고정용)"""
+    deadline = time.monotonic() + 5
+    while gateway.get_stats()["queue_depth"] < depth:
+        assert time.monotonic() < deadline, "대기열에 들어가지 않음"
+        time.sleep(0.005)
+
+
+def test_rate_limiter_empty_env_values():
+    """.env.template을 그대로 복사한 .env (빈 값)에서는 속도 제한 없음"""
+    with mock.patch.dict(os.environ, {"LLM_RPM_SMALL": "", "LLM_RATE_BURST": ""}):
+        assert _create_rate_limiter("small") is None
+
+
+def test_rate_limiter_default_burst():
+    with mock.patch.dict(os.environ, {"LLM_RPM_SMALL": "120", "LLM_RATE_BURST": ""}):
+        limiter = _create_rate_limiter("small")
+    assert limiter.requests_per_second == 2
+    assert limiter.max_bucket_size == max(1, DEFAULT_RATE_BURST)
+
+
+def test_resolve_priority():
+    assert resolve_priority(None) == "report"
+    assert resolve_priority({"langgraph_node": "agent_reasoner"}) == "interactive"
+    assert resolve_priority({"langgraph_node": "filter_artifacts"}) == "bulk"
+    assert resolve_priority({"langgraph_node": "filter_artifacts", "llm_priority": "interactive"}) == "interactive"
+    assert resolve_priority({"llm_priority": "urgent"}) == "report"
+
+
+def test_waiters_served_by_priority():
+    """자리가 나면 우선순위가 높은 대기 호출부터, 같은 우선순위는 도착 순으로 실행"""
+    gateway = TierGateway("test", max_concurrency=1)
+    holding = threading.Event()
+    release = threading.Event()
+    order = []
+
+    def hold() -> None:
+        with gateway.slot("bulk"):
+            holding.set()
+            release.wait()
+
+    def call(label: str, priority: str) -> None:
+        with gateway.slot(priority):
+            order.append(label)
+
+    threads = [threading.Thread(target=hold)]
+    threads[0].start()
+    holding.wait()
+    for depth, (label, priority) in enumerate(
+        [("bulk-1", "bulk"), ("report", "report"), ("bulk-2", "bulk"), ("interactive", "interactive")], start=1
+    ):
+        thread = threading.Thread(target=call, args=(label, priority))
+        thread.start()
+        threads.append(thread)
+        _wait_for_queue(gateway, depth)
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert order == ["interactive", "report", "bulk-1", "bulk-2"]
+
+    stats = gateway.get_stats()
+    assert stats["in_flight"] == 0 and stats["max_queue_depth"] == 4
+    assert stats["priorities"]["bulk"]["calls"] == 3 and stats["priorities"]["bulk"]["queued"] == 2
+
+
+def test_cancelled_async_waiter_leaves_queue():
+    async def scenario():
+        gateway = TierGateway("test", max_concurrency=1)
+        order = []
+
+        async def call(label: str, priority: str) -> None:
+            async with gateway.aslot(priority):
+                order.append(label)
+
+        async with gateway.aslot("bulk"):
+            report = asyncio.create_task(call("report", "report"))
+            interactive = asyncio.create_task(call("interactive", "interactive"))
+            await asyncio.sleep(0)
+            assert gateway.get_stats()["queue_depth"] == 2
+            interactive.cancel()
+            await asyncio.gather(interactive, return_exceptions=True)
+            assert gateway.get_stats()["queue_depth"] == 1
+        await report
+        return order, gateway.get_stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["report"]
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+
+
+def test_model_calls_use_metadata_priority():
+    """GatewayChatModel의 실제 호출은 호출 metadata의 우선순위로 게이트웨이를 거침"""
+    result = ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+    with mock.patch.dict(llm_gateway._gateways, clear=True), \
+            mock.patch.dict(os.environ, {"LLM_GATEWAY_MAX_CONCURRENCY": "2", "LLM_RPM_SMALL": ""}), \
+            mock.patch.object(ChatGoogleGenerativeAI, "_generate", return_value=result):
+        model = GatewayChatModel("small", model="gemini-2.5-flash-lite", google_api_key="test-key")
+        model.invoke("필터링", config={"metadata": {"langgraph_node": "filter_artifacts"}})
+        model.invoke("질문", config={"metadata": {"llm_priority": "interactive"}})
+        stats = llm_gateway.get_gateway_stats()["small"]
+    assert stats["max_concurrency"] == 2
+    assert {name: value["calls"] for name, value in stats["priorities"].items()} == {
+        "interactive": 1, "report": 0, "bulk": 1
+    }
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,216 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+from workflow.aggregation import aggregate_artifacts
+from workflow.database import VectorDBConfig, artifact_to_document, bump_collection_version
+from workflow.local_index import (
+    FRAME_FILE,
+    STORE_FILE,
+    TIMELINE_FILE,
+    ArtifactStore,
+    BM25Index,
+    EntityIndex,
+    TimelineIndex,
+    build_local_indexes,
+    drop_local_indexes,
+    get_artifact_frame,
+    get_artifact_store,
+    get_bm25_index,
+    get_entity_index,
+    get_timeline_index,
+    local_index_dir
+)
+from workflow.tools import (
+    ToolContext,
+    _fuse_lexical_results,
+    get_artifacts_by_ids,
+    timeline_window,
+    trace_entity
+)
+
+
+COLLECTION = "local_index_test"
+ARTIFACTS = [
+    {
+        "id": "usb_1", "artifact_type": "usb", "source": "registry", "collected_at": "2024-03-01T09:00:00",
+        "data": {"device_id": "USBSTOR\\Disk&Ven_SanDisk&Prod_Cruzer\\4C530001\\0"}
+    },
+    {
+        "id": "lnk_1", "artifact_type": "lnk_files", "source": "lnk", "collected_at": "2024-03-01T09:05:00",
+        "data": {"target_path": "E:\\Work\\Strategy2025.docx"}
+    },
+    {
+        "id": "download_1", "artifact_type": "Chrome.downloads", "source": "chrome",
+        "collected_at": "2024-03-01T10:00:00",
+        "data": {"url": "https://drive.google.com/file", "target_path": "C:\\Users\\kim\\Downloads\\Strategy2025.docx"}
+    },
+    {
+        "id": "lnk_2", "artifact_type": "lnk_files", "source": "lnk",
+        "data": {"target_path": "C:\\Users\\kim\\notes.txt"}
+    },
+]
+
+_directory = None
+
+
+def setup_module(module=None):
+    global _directory
+    _directory = tempfile.mkdtemp()
+
+
+def teardown_module(module=None):
+    shutil.rmtree(_directory, ignore_errors=True)
+
+
+def _build():
+    """저장 시와 같이 인덱스 생성 + 쓰기 버전 증가 (메모리 사본 대신 디스크에서 다시 로드)"""
+    config = VectorDBConfig(persist_directory=_directory)
+    assert build_local_indexes(ARTIFACTS, COLLECTION, config)["status"] == "success"
+    bump_collection_version(COLLECTION)
+    return config
+
+
+def _call_tool(func, *args, **kwargs):
+    token = ToolContext.set_context(COLLECTION, {"persist_directory": _directory})
+    try:
+        return func(*args, **kwargs)
+    finally:
+        ToolContext.reset(token)
+
+
+def test_frame_round_trip():
+    config = _build()
+    assert os.path.exists(os.path.join(local_index_dir(COLLECTION, config), FRAME_FILE))
+
+    frame = get_artifact_frame(COLLECTION, config)
+    assert frame["artifact_id"].tolist() == ["usb_1", "lnk_1", "download_1", "lnk_2"]
+    assert frame["target_path"].tolist()[1] == "E:\\Work\\Strategy2025.docx"
+    assert frame["timestamp"].isna().tolist() == [False, False, False, True]
+    assert get_artifact_frame(COLLECTION, config) is frame  # 같은 쓰기 버전은 메모리 사본 재사용
+
+    result = aggregate_artifacts(frame, group_by=["artifact_type"])
+    assert result["rows"][0] == ["lnk_files", 2]
+    assert result["matched"] == 4
+    result = aggregate_artifacts(frame, group_by=["artifact_type"], time_bucket="hour", artifact_types=["lnk_files"])
+    assert result["rows"] == [["lnk_files", "2024-03-01 09:00", 1]]
+
+
+def test_timeline_round_trip():
+    config = _build()
+    path = os.path.join(local_index_dir(COLLECTION, config), TIMELINE_FILE)
+    timeline = get_timeline_index(COLLECTION, config)
+    reloaded = TimelineIndex.load(path)
+    assert np.array_equal(reloaded.timestamps, timeline.timestamps)
+    assert reloaded.rows.tolist() == [0, 1, 2]  # 시각 없는 lnk_2는 정렬 인덱스에서 제외
+    assert reloaded.timestamp_of("lnk_2") is None
+
+    start = reloaded.timestamp_of("usb_1")
+    assert reloaded.timestamp_of("lnk_1") - start == 300
+    assert reloaded.window(start, start + 600).tolist() == [0, 1]
+    assert reloaded.window(start, start + 3600, ["lnk_files"]).tolist() == [1]
+
+    text = _call_tool(timeline_window, artifact_ids=["usb_1"], minutes_before=0, minutes_after=10)
+    assert "usb_1 *" in text and "lnk_1" in text and "download_1" not in text
+    assert "찾을 수 없는 기준: lnk_2" in _call_tool(timeline_window, artifact_ids=["usb_1", "lnk_2"])
+
+
+def test_artifact_store_round_trip():
+    config = _build()
+    store = get_artifact_store(COLLECTION, config)
+    records = store.get_many(["lnk_1", "missing", "lnk_1", "usb_1"])
+    assert records == {"lnk_1": ARTIFACTS[1], "usb_1": ARTIFACTS[0]}
+
+    reloaded = ArtifactStore(os.path.join(local_index_dir(COLLECTION, config), STORE_FILE))
+    try:
+        assert reloaded.get_many(["download_1"]) == {"download_1": ARTIFACTS[2]}
+    finally:
+        reloaded.close()
+
+    text = _call_tool(get_artifacts_by_ids, ["lnk_1", "missing"])
+    assert '"id": "lnk_1"' in text and "찾을 수 없는 ID: missing" in text
+
+
+def test_bm25_round_trip():
+    config = _build()
+    bm25 = get_bm25_index(COLLECTION, config)
+    reloaded = BM25Index.load(local_index_dir(COLLECTION, config))
+    assert reloaded.terms == bm25.terms
+    assert np.array_equal(reloaded.indptr, bm25.indptr)
+
+    # 전체 토큰과 구분자 기준 하위 토큰 모두 일치 (짧은 문서가 앞)
+    assert [row for row, _ in reloaded.search("strategy2025.docx", k=5)] == [1, 2]
+    assert [row for row, _ in reloaded.search("SanDisk", k=5)] == [0]
+    assert [row for row, _ in reloaded.search("strategy2025", k=1)] == [1]
+    assert reloaded.search("unknown-token", k=5) == []
+    mask = np.array([True, False, True, True])
+    assert [row for row, _ in reloaded.search("strategy2025.docx", k=5, mask=mask)] == [2]
+
+
+def test_lexical_fusion_restores_keyword_only_hits():
+    """벡터 후보에 없는 키워드 일치 결과는 원본 저장소에서 복원되어 RRF 순위에 합류"""
+    config = _build()
+    vector_hit = (artifact_to_document(ARTIFACTS[0], 0), 0.3)
+    fused, added = _fuse_lexical_results(
+        {"query_text": "Strategy2025.docx", "filter_artifact_types": ["lnk_files", "usb"]},
+        [vector_hit], [vector_hit], COLLECTION, config, k=5
+    )
+    assert added == 1
+    assert [doc.metadata["artifact_id"] for doc, _, _ in fused] == ["usb_1", "lnk_1"]
+    assert fused[0][1] == 0.3 and fused[1][1] is None
+
+
+def test_entity_round_trip():
+    config = _build()
+    index = get_entity_index(COLLECTION, config)
+    reloaded = EntityIndex.load(local_index_dir(COLLECTION, config))
+    assert reloaded.keys == index.keys
+    assert "serial:4C530001" in reloaded.keys
+
+    # 파일명 키는 위치가 다른 기록까지 연결, 경로 키는 해당 위치만
+    assert reloaded.lookup(["file:strategy2025.docx"]) == {1: ["file:strategy2025.docx"], 2: ["file:strategy2025.docx"]}
+    assert list(reloaded.lookup(["path:e:\\work\\strategy2025.docx"])) == [1]
+    assert reloaded.lookup(["file:missing.docx"]) == {}
+    assert set(reloaded.row_entities(1)) == {"drive:e", "file:strategy2025.docx", "path:e:\\work\\strategy2025.docx"}
+    related = dict(reloaded.co_occurring([1, 2], exclude=["file:strategy2025.docx"]))
+    assert related["drive:e"] == 1 and "domain:drive.google.com" in related
+    assert "file:strategy2025.docx" not in related
+
+
+def test_trace_entity_tool():
+    _build()
+    text = _call_tool(trace_entity, "Strategy2025.docx")
+    assert "2개 아티팩트" in text
+    assert text.index("lnk_1") < text.index("download_1")  # 시간순
+    assert "domain:drive.google.com" in text
+
+    text = _call_tool(trace_entity, "Strategy2025.docx", artifact_types=["Chrome.downloads"])
+    assert "1개 아티팩트" in text and "lnk_1" not in text
+    assert "관련 아티팩트 없음" in _call_tool(trace_entity, "4C530002", kind="serial")
+    assert "usb_1" in _call_tool(trace_entity, "4c530001", kind="serial")
+
+
+def test_drop_local_indexes():
+    config = _build()
+    assert get_artifact_store(COLLECTION, config) is not None
+    drop_local_indexes(COLLECTION, config)
+    assert not os.path.exists(local_index_dir(COLLECTION, config))
+    assert get_artifact_store(COLLECTION, config) is None
+    assert "저장소가 없습니다" in _call_tool(get_artifacts_by_ids, ["lnk_1"])
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        for name, test in list(globals().items()):
+            if name.startswith("test_"):
+                test()
+                print(f"✅ {name}")
+    finally:
+        teardown_module()
@@ -0,0 +1,78 @@
+from unittest import mock
+import os
+import tempfile
+
+from workflow.query_cache import (
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_SEMANTIC_CACHE_SIZE,
+    DEFAULT_SIMILARITY_CUTOFF,
+    QueryPlanCache,
+    metadata_fingerprint,
+    normalize_goal
+)
+
+
+METADATA = {"artifact_types": ["usb", "file"], "datetime_range": {"start": "2025-09-01"}, "total_count": 10}
+
+
+def test_from_env_empty_values():
+    """.env.template을 그대로 복사한 .env (빈 값)도 기본값으로 동작"""
+    empty = {key: "" for key in (
+        "QUERY_PLAN_CACHE_SIZE", "QUERY_PLAN_SEMANTIC_CACHE_SIZE",
+        "QUERY_PLAN_SEMANTIC_CUTOFF", "QUERY_PLAN_SEMANTIC_CACHE", "QUERY_PLAN_CACHE_PATH"
+    )}
+    with mock.patch.dict(os.environ, empty):
+        cache = QueryPlanCache.from_env()
+    assert cache.max_size == DEFAULT_CACHE_SIZE
+    assert cache.semantic_max_size == DEFAULT_SEMANTIC_CACHE_SIZE
+    assert cache.similarity_cutoff == DEFAULT_SIMILARITY_CUTOFF
+    assert not cache.enable_semantic
+    assert cache.persist_path is None
+
+
+def test_exact_key_normalizes_goal():
+    cache = QueryPlanCache()
+    fingerprint = metadata_fingerprint(METADATA)
+    cache.put("USB  연결 기록 찾기.", fingerprint, {"query_text": "usb"})
+
+    assert normalize_goal("USB  연결 기록 찾기.") == "usb 연결 기록 찾기"
+    assert cache.get_exact("usb 연결 기록 찾기", fingerprint) == {"query_text": "usb"}
+
+
+def test_exact_key_includes_metadata_fingerprint():
+    """컬렉션 내용(메타데이터 요약)이 바뀌면 이전 계획을 재사용하지 않음"""
+    cache = QueryPlanCache()
+    cache.put("usb 연결", metadata_fingerprint(METADATA), {"query_text": "usb"})
+
+    changed = dict(METADATA, total_count=11)
+    assert metadata_fingerprint(changed) != metadata_fingerprint(METADATA)
+    assert cache.get_exact("usb 연결", metadata_fingerprint(changed)) is None
+
+
+def test_semantic_cutoff():
+    cache = QueryPlanCache(enable_semantic=True, similarity_cutoff=0.9)
+    fingerprint = metadata_fingerprint(METADATA)
+    cache.put("usb 연결", fingerprint, {"query_text": "usb"}, embedding=[1.0, 0.0])
+
+    assert cache.get_semantic([0.99, 0.05], fingerprint) == {"query_text": "usb"}
+    assert cache.get_semantic([0.0, 1.0], fingerprint) is None
+    assert cache.get_semantic([0.99, 0.05], "other") is None
+
+
+def test_lru_eviction_and_persist():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "plans.json")
+        cache = QueryPlanCache(max_size=2, persist_path=path)
+        for goal in ("a", "b", "c"):
+            cache.put(goal, "fp", {"query_text": goal})
+        assert cache.get_exact("a", "fp") is None
+
+        restored = QueryPlanCache(max_size=2, persist_path=path)
+        assert restored.get_exact("c", "fp") == {"query_text": "c"}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
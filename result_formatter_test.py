@@ -0,0 +1,44 @@
+from unittest import mock
+import os
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+from workflow.result_formatter import (
+    DEFAULT_MAX_RESULT_TOKENS,
+    MIN_RESULT_TOKENS,
+    derive_token_budget,
+    format_search_result
+)
+
+
+def test_budget_reads_env_at_call_time():
+    """.env 값은 모듈 import 이후에 로드되어도 반영됨"""
+    with mock.patch.dict(os.environ, {"SEARCH_RESULT_MAX_TOKENS": "3000"}):
+        assert derive_token_budget() == 3000
+    with mock.patch.dict(os.environ, {"AGENT_CONTEXT_WINDOW_TOKENS": "50000"}):
+        assert derive_token_budget() == 5000
+
+
+def test_budget_empty_env_values():
+    with mock.patch.dict(os.environ, {"SEARCH_RESULT_MAX_TOKENS": "", "AGENT_CONTEXT_WINDOW_TOKENS": ""}):
+        assert derive_token_budget() == DEFAULT_MAX_RESULT_TOKENS
+        assert derive_token_budget(used_tokens=10_000_000) == MIN_RESULT_TOKENS
+
+
+def test_rows_dropped_to_fit_budget():
+    artifacts = [
+        {"id": f"a{i}", "artifact_type": "usb", "similarity": 1 - i / 100, "detail": "x" * 70 + str(i)}
+        for i in range(60)
+    ]
+    text = format_search_result({"artifacts": artifacts, "message": "60건"}, token_budget=MIN_RESULT_TOKENS)
+    assert "| a0 |" in text
+    assert "| a59 |" not in text
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,75 @@
+from datetime import datetime
+from unittest import mock
+import os
+
+from workflow.rule_planner import (
+    DEFAULT_MIN_CONFIDENCE,
+    RuleBasedPlanner,
+    extract_artifact_types,
+    extract_datetime_range
+)
+
+
+METADATA = {
+    "artifact_types": ["usb", "browser_history", "prefetch"],
+    "datetime_range": {"latest": "2025-09-30T12:00:00"},
+}
+
+
+def test_from_env_empty_value():
+    with mock.patch.dict(os.environ, {"RULE_PLANNER_MIN_CONFIDENCE": ""}):
+        assert RuleBasedPlanner.from_env().min_confidence == DEFAULT_MIN_CONFIDENCE
+
+
+def test_iso_range_strips_separator():
+    """두 날짜 사이의 범위 기호는 검색어에 남지 않음"""
+    plan = RuleBasedPlanner().analyze("usb 연결 2025-09-23 ~ 2025-09-25", METADATA)
+    assert plan.query.filter_datetime_start == "2025-09-23T00:00:00"
+    assert plan.query.filter_datetime_end == "2025-09-25T23:59:59"
+    assert "~" not in plan.query.query_text
+
+    plan = RuleBasedPlanner().analyze("usb 연결 2025-09-23~2025-09-25 기록", METADATA)
+    assert plan.query.query_text == "연결 기록"
+
+
+def test_iso_time_window_matches_precision():
+    """시각까지 적은 ISO 날짜는 폭이 0인 구간이 아니라 그 분 전체"""
+    reference = datetime(2025, 9, 30)
+    assert extract_datetime_range("2025-09-23 14:30 usb", reference)[:2] == \
+        ("2025-09-23T14:30:00", "2025-09-23T14:30:59")
+    assert extract_datetime_range("2025-09-23T14:30:15 usb", reference)[:2] == \
+        ("2025-09-23T14:30:15", "2025-09-23T14:30:15")
+    assert extract_datetime_range("2025-09-23 14:30 이후", reference)[:2] == ("2025-09-23T14:30:00", None)
+
+    plan = RuleBasedPlanner().analyze("usb 연결 2025-09-23 14:30", METADATA)
+    assert (plan.query.filter_datetime_start, plan.query.filter_datetime_end) == \
+        ("2025-09-23T14:30:00", "2025-09-23T14:30:59")
+
+
+def test_direction_markers():
+    reference = datetime(2025, 9, 30)
+    assert extract_datetime_range("2025-09-23 이후 usb", reference)[:2] == ("2025-09-23T00:00:00", None)
+    assert extract_datetime_range("2025년 9월 까지", reference)[:2] == (None, "2025-09-30T23:59:59")
+    start, end, _ = extract_datetime_range("최근 7일", reference)
+    assert (start, end) == ("2025-09-23T00:00:00", "2025-09-30T00:00:00")
+
+
+def test_type_matching():
+    types, explicit, _ = extract_artifact_types("browser_history 기록", METADATA["artifact_types"])
+    assert (types, explicit) == (["browser_history"], True)
+    types, explicit, _ = extract_artifact_types("외장 저장장치 연결", METADATA["artifact_types"])
+    assert (types, explicit) == (["usb"], False)
+
+
+def test_low_confidence_falls_back_to_llm():
+    planner = RuleBasedPlanner()
+    assert planner.plan("의심스러운 활동과 연관된 기록 분석", METADATA) is None
+    assert planner.plan("usb 2025-09-23 이후", METADATA) is not None
+    assert planner.get_stats() == {"rule_hits": 1, "llm_fallbacks": 1, "hit_rate": 0.5}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
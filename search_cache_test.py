@@ -0,0 +1,75 @@
+from unittest import mock
+import os
+import subprocess
+import sys
+import tempfile
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+import workflow.database as database
+from workflow.database import VectorDBConfig, get_chroma_client, get_data_version
+from workflow.search_cache import DEFAULT_SEARCH_CACHE_SIZE, SearchResultCache, search_cache_key
+
+
+QUERY = {"query_text": "usb  연결", "filter_artifact_types": ["usb", "file"],
+         "filter_datetime_start": "2025-09-23T00:00:00", "max_results": 10}
+
+# 다른 프로세스(노트북 / 워커)의 저장을 흉내 냄
+_OTHER_PROCESS_WRITE = """
+import sys, chromadb
+client = chromadb.PersistentClient(path=sys.argv[1])
+collection = client.get_or_create_collection("cache_test")
+start = collection.count()
+collection.add(ids=[f"d{start}"], embeddings=[[0.1, 0.2, 0.3]], documents=["new"])
+"""
+
+
+def test_from_env_empty_value():
+    with mock.patch.dict(os.environ, {"SEARCH_RESULT_CACHE_SIZE": ""}):
+        assert SearchResultCache.from_env().max_size == DEFAULT_SEARCH_CACHE_SIZE
+
+
+def test_key_normalizes_query():
+    """공백 / 날짜 표기 / 타입 순서 / 결과 개수는 키에 영향 없음"""
+    key = search_cache_key("c", "v1", "./chroma", QUERY)
+    same = dict(QUERY, query_text="usb 연결 ", filter_artifact_types=["file", "usb"],
+                filter_datetime_start="2025-09-23 00:00:00", max_results=50)
+    assert search_cache_key("c", "v1", "./chroma", same) == key
+    assert search_cache_key("c", "v2", "./chroma", QUERY) != key
+    assert search_cache_key("c", "v1", "./chroma", dict(QUERY, query_text="usb")) != key
+
+
+def test_cached_list_must_cover_request():
+    cache = SearchResultCache(max_size=4)
+    cache.put("k", [("doc1", 0.1), ("doc2", 0.2)], k=2)
+    assert cache.get("k", needed=1, distance_threshold=0.5) == [("doc1", 0.1), ("doc2", 0.2)]
+    # k개를 꽉 채워 가져온 목록으로는 더 많은 결과 요청에 답할 수 없음
+    assert cache.get("k", needed=5, distance_threshold=0.5) is None
+    cache.put("short", [("doc1", 0.1)], k=10)
+    assert cache.get("short", needed=5, distance_threshold=0.5) == [("doc1", 0.1)]
+
+
+def test_data_version_sees_other_process_writes():
+    """버전은 저장된 데이터에서 계산 → 다른 프로세스의 저장 후 이전 캐시 키가 쓰이지 않음"""
+    # 전역 클라이언트가 이미 다른 경로(./chroma)로 열려 있으면 그 클라이언트를 돌려주므로 이 테스트 동안 비움
+    with tempfile.TemporaryDirectory() as directory, \
+            mock.patch.multiple(database, _global_chroma_client=None, _global_client_path=None):
+        config = VectorDBConfig(persist_directory=directory, partition_mode="none")
+        get_chroma_client(config).get_or_create_collection("cache_test")
+        before = get_data_version("cache_test", config)
+        assert get_data_version("cache_test", config) == before
+
+        subprocess.run([sys.executable, "-c", _OTHER_PROCESS_WRITE, directory], check=True)
+        after = get_data_version("cache_test", config)
+        assert after != before
+        assert search_cache_key("cache_test", after, directory, QUERY) != \
+            search_cache_key("cache_test", before, directory, QUERY)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
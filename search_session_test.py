@@ -0,0 +1,80 @@
+from unittest import mock
+import os
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+from workflow.classes import create_initial_state
+from workflow.search_session import SearchSession, get_search_session
+from workflow.result_formatter import MIN_RESULT_TOKENS
+from workflow.tools import ToolContext, present_search_result, render_search_result
+
+
+ARTIFACTS = [{"id": "a1", "artifact_type": "usb"}, {"id": "a2", "artifact_type": "usb"}]
+
+
+def _present(run_id, artifacts=ARTIFACTS):
+    """검색 도구와 같은 순서로 정리 + 렌더링 (표에 들어간 행만 표시 완료로 기록)"""
+    token = ToolContext.set_context("shared_collection", run_id=run_id)
+    try:
+        presented = present_search_result({"artifacts": list(artifacts), "message": "결과"}, {"query_text": "usb"})
+        presented["text"] = render_search_result(presented)
+        return presented
+    finally:
+        ToolContext.reset(token)
+
+
+def test_split_new():
+    session = SearchSession("s")
+    assert session.split_new(ARTIFACTS) == (ARTIFACTS, [])
+    assert session.split_new(ARTIFACTS) == (ARTIFACTS, [])  # 분리만으로는 기록하지 않음
+    session.mark_shown(["a1", "a2"])
+    assert session.split_new(ARTIFACTS + [{"id": "a3"}]) == ([{"id": "a3"}], ["a1", "a2"])
+
+
+def test_sessions_are_per_run():
+    """같은 컬렉션의 다른 실행은 이전 실행이 본 아티팩트를 ID로만 받지 않음"""
+    first = _present("run-first")
+    again = _present("run-first")
+    second = _present("run-second")
+
+    assert len(first["artifacts"]) == 2
+    assert again["artifacts"] == [] and again["already_shown_ids"] == ["a1", "a2"]
+    assert len(second["artifacts"]) == 2 and "already_shown_ids" not in second
+
+
+def test_rows_cut_by_budget_not_marked_shown():
+    """토큰 예산 초과로 생략된 행은 ID가 안내되고, 다시 검색하면 원문으로 돌아옴"""
+    artifacts = [
+        {"id": f"b{i}", "artifact_type": "usb", "similarity": 1 - i / 100, "detail": "x" * 70 + str(i)}
+        for i in range(60)
+    ]
+    with mock.patch.object(ToolContext, "get_result_token_budget", return_value=MIN_RESULT_TOKENS):
+        first = _present("run-budget", artifacts)
+    assert "| b59 |" not in first["text"] and "b59" in first["text"].splitlines()[-1]
+
+    again = _present("run-budget", artifacts)
+    assert "b59" in [artifact["id"] for artifact in again["artifacts"]]
+    assert "b0" in again["already_shown_ids"] and "b59" not in again["already_shown_ids"]
+
+
+def test_end_run_drops_session():
+    _present("run-ended")
+    ToolContext.end_run("run-ended")
+    assert get_search_session("run-ended").get_stats()["shown_count"] == 0
+
+
+def test_initial_state_has_run_id():
+    states = [create_initial_state(job_id="j", task_id="t", job_info={}, artifact_chunks=[],
+                                   intermediate_results=[], filter_iteration=0,
+                                   target_artifact_count=1, current_strictness="strict")
+              for _ in range(2)]
+    assert states[0]["run_id"] != states[1]["run_id"]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,156 @@
+from typing import TypedDict
+import json
+import os
+import tempfile
+import threading
+from unittest import mock
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+from langchain_core.embeddings import Embeddings, FakeEmbeddings
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from langgraph.graph import END, StateGraph
+
+import workflow.database as database
+from workflow.database import VectorDBConfig, get_embeddings
+from workflow.token_ledger import LedgerEmbeddings, estimate_cost, ledger_stage, track_tokens
+from workflow.tool_digest import estimate_tokens
+
+
+MODEL_METADATA = {"metadata": {"ls_model_name": "models/gemini-2.5-flash"}}
+
+
+def _fake_llm(count: int = 1) -> GenericFakeChatModel:
+    usage = {"input_tokens": 120, "output_tokens": 30, "total_tokens": 150}
+    return GenericFakeChatModel(messages=iter([AIMessage(content="ok", usage_metadata=usage)] * count))
+
+
+class FailingEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        raise RuntimeError("quota")
+
+    def embed_query(self, text):
+        raise RuntimeError("quota")
+
+
+def test_llm_usage_recorded_by_stage():
+    llm = _fake_llm()
+    with track_tokens("task-llm") as ledger:
+        with ledger_stage("report"):
+            llm.invoke("보고서 작성", config=MODEL_METADATA)
+            try:
+                llm.invoke("응답 없음")  # 준비된 응답 소진 → 오류 호출로 기록
+            except Exception:
+                pass
+    llm_ok, llm_error = ledger.entries
+    assert llm_ok["model"] == "gemini-2.5-flash" and llm_ok["tier"] == "medium"
+    assert (llm_ok["node"], llm_ok["input_tokens"], llm_ok["output_tokens"]) == ("report", 120, 30)
+    assert llm_ok["cost"] == estimate_cost("gemini-2.5-flash", 120, 30)
+    assert llm_error["error"] and llm_error["node"] == "report"
+
+    summary = ledger.summary()
+    assert summary["total"]["calls"] == 2 and summary["total"]["errors"] == 1
+    assert summary["by_tier"]["medium"]["input_tokens"] == 120
+
+
+def test_llm_calls_tagged_with_graph_node():
+    class State(TypedDict):
+        text: str
+
+    llm = _fake_llm(2)
+    graph = StateGraph(State)
+    graph.add_node("plan", lambda state: {"text": llm.invoke(state["text"], config=MODEL_METADATA).content})
+    graph.add_node("answer", lambda state: {"text": llm.invoke(state["text"]).content})
+    graph.set_entry_point("plan")
+    graph.add_edge("plan", "answer")
+    graph.add_edge("answer", END)
+
+    with track_tokens("task-graph") as ledger:
+        graph.compile().invoke({"text": "질문"})
+    assert [entry["node"] for entry in ledger.entries] == ["plan", "answer"]
+    assert set(ledger.summary()["by_node"]) == {"plan", "answer"}
+
+
+def test_embedding_usage_recorded():
+    texts = ["USB 연결 기록", "Strategy2025.docx"]
+    embeddings = LedgerEmbeddings(FakeEmbeddings(size=4), "gemini-embedding-001")
+    with track_tokens("task-embedding") as ledger:
+        with ledger_stage("search"):
+            embeddings.embed_documents(texts)
+            embeddings.embed_query("usb")
+        try:
+            LedgerEmbeddings(FailingEmbeddings(), "gemini-embedding-001").embed_query("usb")
+        except RuntimeError:
+            pass
+    documents, query, failed = ledger.entries
+    assert documents["items"] == 2 and documents["node"] == "search"
+    assert documents["input_tokens"] == sum(estimate_tokens(text) for text in texts)
+    assert documents["tier"] == "embedding" and documents["output_tokens"] == 0
+    assert documents["cost"] == estimate_cost("gemini-embedding-001", documents["input_tokens"], 0)
+    assert query["items"] == 1
+    assert failed["error"] and failed["node"] == "unknown"
+
+
+def test_query_cache_hits_not_recorded():
+    """get_embeddings의 장부 래퍼는 쿼리 캐시 안쪽 → 실제 API 호출만 기록"""
+    with mock.patch.dict(os.environ, {"EMBEDDING_CACHE_SIZE": "8"}), \
+            mock.patch.dict(database._embeddings_instances, clear=True), \
+            mock.patch.object(GoogleGenerativeAIEmbeddings, "embed_query", lambda self, text, **kwargs: [0.0]):
+        embeddings = get_embeddings(VectorDBConfig(partition_mode="none"))
+        with track_tokens("task-cache") as ledger:
+            for _ in range(3):
+                embeddings.embed_query("usb")
+    assert len(ledger.entries) == 1
+    assert ledger.entries[0]["model"] == "gemini-embedding-001"
+
+
+def test_no_ledger_outside_task():
+    embeddings = LedgerEmbeddings(FakeEmbeddings(size=4), "gemini-embedding-001")
+    with track_tokens("task-outside") as ledger:
+        pass
+    embeddings.embed_query("usb")
+    _fake_llm().invoke("질문")
+    assert ledger.entries == []
+
+
+def test_concurrent_tasks_kept_apart():
+    ledgers = {}
+
+    def run(task_id: str, calls: int) -> None:
+        embeddings = LedgerEmbeddings(FakeEmbeddings(size=4), "gemini-embedding-001")
+        with track_tokens(task_id) as ledger:
+            for _ in range(calls):
+                embeddings.embed_query(task_id)
+        ledgers[task_id] = ledger
+
+    threads = [threading.Thread(target=run, args=(f"task-{calls}", calls)) for calls in (1, 3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(ledgers["task-1"].entries) == 1
+    assert len(ledgers["task-3"].entries) == 3
+
+
+def test_write_round_trip():
+    with track_tokens("task/../write") as ledger:
+        with ledger_stage("report"):
+            _fake_llm().invoke("보고서", config=MODEL_METADATA)
+    with tempfile.TemporaryDirectory() as directory:
+        path = ledger.write(directory)
+        assert os.path.dirname(path) == directory  # task_id의 경로 구분자는 파일 이름에서 치환
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    assert saved["entries"] == ledger.entries
+    assert saved["summary"]["by_node"]["report"]["output_tokens"] == 30
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,51 @@
+from unittest import mock
+import os
+
+from workflow.utils import env_flag, env_float, env_int, env_str
+
+
+def test_empty_values_use_default():
+    """.env.template을 그대로 복사한 .env (빈 값)는 미설정과 같음"""
+    with mock.patch.dict(os.environ, {"TEST_SETTING": ""}):
+        assert env_str("TEST_SETTING", "default") == "default"
+        assert env_str("TEST_SETTING") is None
+        assert env_int("TEST_SETTING", 3) == 3
+        assert env_float("TEST_SETTING", 0.5) == 0.5
+        assert env_flag("TEST_SETTING", default=True) is True
+    with mock.patch.dict(os.environ, {"TEST_SETTING": "  "}):
+        assert env_int("TEST_SETTING", 3) == 3
+
+
+def test_values_read_at_call():
+    with mock.patch.dict(os.environ, {"TEST_SETTING": "7"}):
+        assert env_int("TEST_SETTING", 3) == 7
+        assert env_float("TEST_SETTING", 0.5) == 7.0
+        assert env_str("TEST_SETTING") == "7"
+    os.environ.pop("TEST_SETTING", None)
+    assert env_int("TEST_SETTING", 3) == 3
+
+
+def test_flag_values():
+    for value, expected in (("1", True), ("true", True), ("YES", True), ("on", True), ("0", False), ("no", False)):
+        with mock.patch.dict(os.environ, {"TEST_SETTING": value}):
+            assert env_flag("TEST_SETTING", default=not expected) is expected
+
+
+def test_utils_import_is_leaf():
+    """DB / 모델 계층이 import해도 순환이 생기지 않도록 utils는 다른 workflow 모듈을 불러오지 않음"""
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, workflow.utils; "
+        "sys.exit(len([m for m in sys.modules if m.startswith('workflow.') and m != 'workflow.utils']))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,46 @@
+from unittest import mock
+import os
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+from workflow.database import DEFAULT_DB_CONFIG, VectorDBConfig, normalize_config
+
+
+def test_empty_partition_mode_is_none():
+    """.env.template을 그대로 복사한 .env (빈 값)에서도 설정 생성 가능"""
+    with mock.patch.dict(os.environ, {"VECTOR_DB_PARTITION_MODE": ""}):
+        assert VectorDBConfig().get_partition_mode() == "none"
+        assert VectorDBConfig(partition_mode="").get_partition_mode() == "none"
+
+
+def test_partition_mode_read_at_use():
+    """import 이후에 로드된 .env 값도 기본 설정에 반영"""
+    with mock.patch.dict(os.environ, {"VECTOR_DB_PARTITION_MODE": "type"}):
+        assert DEFAULT_DB_CONFIG.get_partition_mode() == "type"
+        assert normalize_config({"persist_directory": "./other"}).get_partition_mode() == "type"
+    with mock.patch.dict(os.environ, {"VECTOR_DB_PARTITION_MODE": "group"}):
+        assert DEFAULT_DB_CONFIG.get_partition_mode() == "group"
+
+
+def test_explicit_partition_mode_wins():
+    with mock.patch.dict(os.environ, {"VECTOR_DB_PARTITION_MODE": "type"}):
+        assert VectorDBConfig(partition_mode="none").get_partition_mode() == "none"
+
+
+def test_unknown_partition_mode():
+    for make in (lambda: VectorDBConfig(partition_mode="bogus"), VectorDBConfig().get_partition_mode):
+        with mock.patch.dict(os.environ, {"VECTOR_DB_PARTITION_MODE": "bogus"}):
+            try:
+                make()
+            except ValueError:
+                continue
+        raise AssertionError("ValueError가 발생해야 함")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
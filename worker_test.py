@@ -0,0 +1,71 @@
+from contextlib import redirect_stdout
+from unittest import mock
+import io
+import json
+import os
+import tempfile
+
+# 모델 객체 생성에만 필요 (테스트는 외부 API를 호출하지 않음)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+os.environ.setdefault("TAVILY_API_KEY", "test-key")
+
+from common.worker import TaskQueue, main
+
+
+def _queue() -> TaskQueue:
+    return TaskQueue(os.path.join(tempfile.mkdtemp(), "queue.sqlite"))
+
+
+def test_claim_oldest_once():
+    queue = _queue()
+    assert queue.enqueue("t1", "j1") and queue.enqueue("t2", "j2")
+    assert not queue.enqueue("t1", "j1")  # 대기 중인 작업은 다시 추가되지 않음
+
+    first, second = queue.claim(), queue.claim()
+    assert (first["task_id"], first["attempts"]) == ("t1", 1)
+    assert second["task_id"] == "t2"
+    assert queue.claim() is None
+    assert queue.counts() == {"running": 2}
+
+
+def test_failed_task_retried():
+    queue = _queue()
+    queue.enqueue("t1", "j1")
+    queue.claim()
+    assert not queue.enqueue("t1", "j1")  # 실행 중
+    queue.finish("t1", error="RuntimeError: boom")
+    assert queue.counts() == {"failed": 1}
+
+    assert queue.enqueue("t1", "j1")
+    retry = queue.claim()
+    assert retry["attempts"] == 2
+    queue.finish("t1")
+    assert queue.counts() == {"done": 1}
+
+
+def test_requeue_running():
+    """비정상 종료한 워커의 실행 중 작업은 다음 워커 시작 시 다시 실행"""
+    queue = _queue()
+    queue.enqueue("t1", "j1")
+    queue.claim()
+    assert queue.requeue_running() == 1
+    assert queue.claim()["attempts"] == 2
+
+
+def test_cli_empty_env_values():
+    """.env.template을 그대로 복사한 .env (빈 값)에서도 CLI 인자 기본값 사용"""
+    path = os.path.join(tempfile.mkdtemp(), "queue.sqlite")
+    with mock.patch.dict(os.environ, {"WORKER_QUEUE_PATH": "", "WORKER_STATUS_PATH": "",
+                                      "WORKER_CONCURRENCY": "", "WORKER_POLL_INTERVAL": ""}):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            assert main(["--queue", path, "enqueue", "t1", "j1"]) == 0
+            assert main(["--queue", path, "status"]) == 0
+    assert json.loads(output.getvalue().splitlines()[-1]) == {"queued": 1}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
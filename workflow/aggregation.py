@@ -0,0 +1,193 @@
+"""
+아티팩트 집계 (로컬 컬럼 프레임 대상)
+- group-by + count / nunique / min / max
+- 시간 버킷(hour/day/week/month) 히스토그램
+- 파생 컬럼: "<필드>:domain" (URL 호스트), "<필드>:ext" (파일 확장자)
+- 원본 행을 컨텍스트로 가져오지 않고 작은 표만 반환
+"""
+from typing import Dict, List, Optional
+import logging
+
+import pandas as pd
+
+from workflow.database import datetime_to_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+METRICS = ("count", "nunique", "min", "max")
+TIME_BUCKETS = {"hour": "h", "day": "D", "week": "W", "month": "M"}
+DEFAULT_TOP_N = 20
+MAX_TOP_N = 100
+
+
+class AggregationError(ValueError):
+    """잘못된 집계 요청 (컬럼/지표 이름 오류 등)"""
+    pass
+
+
+# --------------------------------------------------------------------------
+# 파생 컬럼
+# --------------------------------------------------------------------------
+
+def _derive_column(frame: pd.DataFrame, spec: str) -> pd.Series:
+    """컬럼 지정 문자열을 Series로 변환 (파생 컬럼 지원)"""
+    column, _, derive = spec.partition(":")
+    if column not in frame.columns:
+        raise AggregationError(f"알 수 없는 컬럼: {column}")
+
+    series = frame[column]
+    if not derive:
+        return series
+
+    text = series.astype("string")
+    if derive == "domain":
+        # scheme://host[:port]/... → host (www. 제거)
+        host = text.str.extract(r"^(?:[a-zA-Z][\w+.-]*://)?([^/:?#\s]+)", expand=False)
+        return host.str.lower().str.replace(r"^www\.", "", regex=True)
+    if derive == "ext":
+        ext = text.str.extract(r"\.([A-Za-z0-9]{1,8})$", expand=False)
+        return ext.str.lower()
+    raise AggregationError(f"알 수 없는 파생 컬럼: {derive} (domain, ext 지원)")
+
+
+def _time_bucket(frame: pd.DataFrame, bucket: str) -> pd.Series:
+    if bucket not in TIME_BUCKETS:
+        raise AggregationError(f"알 수 없는 시간 버킷: {bucket} ({', '.join(TIME_BUCKETS)} 지원)")
+    periods = frame["datetime"].dt.to_period(TIME_BUCKETS[bucket])
+    if bucket == "week":
+        return periods.dt.start_time.dt.strftime("%Y-%m-%d(주)")
+    formats = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d", "month": "%Y-%m"}
+    return periods.dt.start_time.dt.strftime(formats[bucket])
+
+
+def _min_max_values(series: pd.Series) -> pd.Series:
+    """min/max 대상 값 변환 (숫자로 해석 가능하면 숫자, 아니면 문자열 비교)"""
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    numeric = pd.to_numeric(series, errors="coerce")
+    if numeric.notna().sum() == series.notna().sum():
+        return numeric
+    return series.astype("string")
+
+
+# --------------------------------------------------------------------------
+# 집계
+# --------------------------------------------------------------------------
+
+def aggregate_artifacts(
+    frame: pd.DataFrame,
+    group_by: Optional[List[str]] = None,
+    metric: str = "count",
+    field: Optional[str] = None,
+    artifact_types: Optional[List[str]] = None,
+    datetime_start: Optional[str] = None,
+    datetime_end: Optional[str] = None,
+    time_bucket: Optional[str] = None,
+    contains: Optional[Dict[str, str]] = None,
+    top_n: int = DEFAULT_TOP_N
+) -> Dict:
+    """
+    아티팩트 프레임 집계
+
+    Args:
+        group_by: 그룹 컬럼 목록 (파생 컬럼 "url:domain" 등 가능)
+        metric: count | nunique | min | max
+        field: nunique/min/max 대상 컬럼
+        artifact_types, datetime_start, datetime_end: 사전 필터
+        time_bucket: hour | day | week | month (시간 구간 그룹 추가)
+        contains: {컬럼: 부분 문자열} 필터 (대소문자 무시)
+        top_n: 반환할 최대 그룹 수
+
+    Returns:
+        {"columns", "rows", "total_groups", "matched", "truncated"}
+
+    Raises:
+        AggregationError: 잘못된 컬럼/지표/버킷
+    """
+    if metric not in METRICS:
+        raise AggregationError(f"알 수 없는 지표: {metric} ({', '.join(METRICS)} 지원)")
+    if metric != "count" and not field:
+        raise AggregationError(f"{metric} 지표에는 field가 필요합니다")
+    top_n = max(1, min(top_n or DEFAULT_TOP_N, MAX_TOP_N))
+
+    # 사전 필터
+    mask = pd.Series(True, index=frame.index)
+    if artifact_types:
+        mask &= frame["artifact_type"].isin(artifact_types)
+    start_ts = datetime_to_timestamp(datetime_start) if datetime_start else None
+    end_ts = datetime_to_timestamp(datetime_end) if datetime_end else None
+    if start_ts is not None:
+        mask &= frame["timestamp"] >= start_ts
+    if end_ts is not None:
+        mask &= frame["timestamp"] <= end_ts
+    for column, needle in (contains or {}).items():
+        values = _derive_column(frame, column).astype("string")
+        mask &= values.str.contains(str(needle), case=False, regex=False).fillna(False).astype(bool)
+    filtered = frame[mask]
+
+    # 그룹 키 구성
+    keys: Dict[str, pd.Series] = {}
+    for spec in group_by or []:
+        keys[spec] = _derive_column(filtered, spec)
+    if time_bucket:
+        keys[f"{time_bucket}_bucket"] = _time_bucket(filtered, time_bucket)
+
+    metric_name = metric if metric == "count" else f"{metric}({field})"
+    target = _derive_column(filtered, field) if field else None
+    if target is not None and metric in ("min", "max"):
+        target = _min_max_values(target)
+
+    # 그룹 없이 전체 집계
+    if not keys:
+        if metric == "count":
+            value = len(filtered)
+        else:
+            value = getattr(target, metric)() if len(filtered) else None
+        return {
+            "columns": [metric_name],
+            "rows": [[value]],
+            "total_groups": 1,
+            "matched": len(filtered),
+            "truncated": False
+        }
+
+    grouped_frame = pd.DataFrame(keys)
+    if target is not None:
+        grouped_frame["__target"] = target
+    grouped = grouped_frame.groupby(list(keys), dropna=True)
+    if metric == "count":
+        result = grouped.size()
+    else:
+        result = getattr(grouped["__target"], metric)()
+
+    result = result.rename(metric_name).reset_index()
+    if time_bucket and metric == "count" and len(keys) == 1:
+        # 시간 히스토그램은 시간순
+        result = result.sort_values(list(keys))
+    elif metric in ("count", "nunique"):
+        result = result.sort_values(metric_name, ascending=False, kind="stable")
+
+    total_groups = len(result)
+    result = result.head(top_n)
+    return {
+        "columns": list(result.columns),
+        "rows": result.astype(object).where(result.notna(), None).values.tolist(),
+        "total_groups": total_groups,
+        "matched": len(filtered),
+        "truncated": total_groups > top_n
+    }
+
+
+def format_aggregate_result(result: Dict) -> str:
+    """집계 결과를 작은 마크다운 표로 변환"""
+    lines = [
+        f"✅ 집계 완료: 대상 {result['matched']}개, 그룹 {result['total_groups']}개"
+        + (f" (상위 {len(result['rows'])}개 표시)" if result.get("truncated") else "")
+    ]
+    lines.append("| " + " | ".join(result["columns"]) + " |")
+    lines.append("|" + "---|" * len(result["columns"]))
+    for row in result["rows"]:
+        cells = ["" if value is None else str(value).replace("|", "/") for value in row]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+오프라인 종단 간 벤치마크 (필터링 → 저장 → 에이전트 → 보고서)
+
+실제 API로 한 번 기록한 뒤, 같은 작업을 외부 호출 없이 반복 재생하며 노드별 성능을 측정합니다.
+
+사용 방법:
+    # 1. 기록 (실제 Gemini / 임베딩 / Tavily 호출)
+    python -m workflow.benchmark record --artifacts artifacts.json --fixtures fixtures/job1
+
+    # 2. 재생 (외부 호출 없음, 기록된 지연 시간 그대로 주입, 3회 반복)
+    python -m workflow.benchmark run --fixtures fixtures/job1 --latency recorded --repeat 3
+
+측정 항목 (노드별): 실행 횟수, 벽시계 시간, CPU 시간, 최대 메모리 증가량(tracemalloc), 토큰 사용량
+- CPU 시간은 노드가 시작된 스레드 기준 (도구 노드가 내부에서 띄운 작업 스레드는 제외)
+- 동시에 실행된 노드(보고서 생성 / 결과 분류 등)의 메모리 최대치는 서로 겹쳐 집계될 수 있음
+"""
+from typing import Any, Dict, List, Optional
+from collections import defaultdict
+from pathlib import Path
+from uuid import UUID
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+# --------------------------------------------------------------------------
+# 노드별 측정
+# --------------------------------------------------------------------------
+
+class NodeProfiler(BaseCallbackHandler):
+    """LangGraph 노드 실행 구간의 벽시계/CPU 시간과 메모리 최대치 수집"""
+
+    def __init__(self):
+        self._active: Dict[UUID, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.records: List[Dict[str, Any]] = []
+
+    def on_chain_start(self, serialized: Optional[Dict[str, Any]], inputs: Any, *, run_id: UUID,
+                       metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        node = (metadata or {}).get("langgraph_node")
+        # 노드 자체 실행만 측정 (노드 안의 체인/모델 호출은 같은 메타데이터를 가지므로 이름으로 구분)
+        if not node or kwargs.get("name") != node:
+            return
+        with self._lock:
+            if not self._active and tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            self._active[run_id] = {
+                "node": node,
+                "wall": time.perf_counter(),
+                "cpu": time.thread_time(),
+                "thread": threading.get_ident(),
+                "memory": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+            }
+
+    def _finish(self, run_id: UUID, error: bool) -> None:
+        with self._lock:
+            started = self._active.pop(run_id, None)
+        if started is None:
+            return
+        same_thread = started["thread"] == threading.get_ident()
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+        self.records.append({
+            "node": started["node"],
+            "wall": time.perf_counter() - started["wall"],
+            "cpu": time.thread_time() - started["cpu"] if same_thread else None,
+            "peak_memory": max(0, peak - started["memory"]),
+            "error": error
+        })
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error=False)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error=True)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        nodes: Dict[str, Dict[str, Any]] = defaultdict(
+            lambda: {"calls": 0, "errors": 0, "wall_total": 0.0, "wall_max": 0.0, "cpu_total": 0.0, "peak_memory": 0}
+        )
+        for record in self.records:
+            node = nodes[record["node"]]
+            node["calls"] += 1
+            node["errors"] += int(record["error"])
+            node["wall_total"] += record["wall"]
+            node["wall_max"] = max(node["wall_max"], record["wall"])
+            node["cpu_total"] += record["cpu"] or 0.0
+            node["peak_memory"] = max(node["peak_memory"], record["peak_memory"])
+        return dict(nodes)
+
+
+# --------------------------------------------------------------------------
+# 실행
+# --------------------------------------------------------------------------
+
+def _configure(mode: str, fixtures: str, latency: str, seed: Optional[int]) -> None:
+    """워크플로우 모듈 import 전에 기록/재생 환경 설정 (모델은 import 시점에 생성됨)"""
+    os.environ["LLM_MODE"] = mode
+    os.environ["LLM_FIXTURE_DIR"] = fixtures
+    os.environ["LLM_REPLAY_LATENCY"] = latency
+    if seed is not None:
+        os.environ["LLM_REPLAY_SEED"] = str(seed)
+    # 재생 결과가 이전 실행의 응답 캐시에 가려지지 않도록
+    os.environ["LLM_CACHE_TIERS"] = ""
+
+
+def _initial_state(job: Dict) -> Dict:
+    from workflow.classes import create_initial_state
+    from workflow.prompts import RAW_REQUIREMENTS
+
+    return create_initial_state(
+        job_id=job["job_id"],
+        task_id=job["task_id"],
+        job_info=job.get("job_info", {}),
+        artifact_chunks=[job["artifacts"]],
+        intermediate_results=[],
+        filter_iteration=0,
+        target_artifact_count=100_000,
+        current_strictness="very_strict",
+        raw_user_requirements=job.get("raw_user_requirements") or RAW_REQUIREMENTS
+    )
+
+
+def run_pipeline(job: Dict) -> Dict[str, Any]:
+    """전체 그래프 1회 실행 후 노드별 측정 결과 반환"""
+    from workflow.rag_agent_workflow import app
+    from workflow.token_ledger import track_tokens
+    from workflow.tools import ToolContext
+
+    profiler = NodeProfiler()
+    tracemalloc.start()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    error = None
+    initial_state = _initial_state(job)
+    with track_tokens(job["task_id"]) as ledger:
+        try:
+            final_state = app.invoke(initial_state, config={"recursion_limit": 80, "callbacks": [profiler]})
+        except Exception as e:
+            final_state, error = {}, repr(e)
+        finally:
+            ToolContext.end_run(initial_state["run_id"])
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report = final_state.get("final_report")
+    return {
+        "wall": wall,
+        "cpu": cpu,
+        "peak_memory": peak,
+        "error": error,
+        "steps": len(report.steps) if report is not None else None,
+        "nodes": profiler.summary(),
+        "tokens": ledger.summary()
+    }
+
+
+def _replay_stats() -> Dict[str, Any]:
+    """재생 적중 통계 (모델별 키 일치 / 순서 대체 / 누락, 임베딩 적중)"""
+    from workflow import utils
+    from workflow.database import DEFAULT_DB_CONFIG, get_embeddings
+
+    stats: Dict[str, Any] = {}
+    for tier in ("small", "medium", "large"):
+        cache = getattr(getattr(utils, f"llm_{tier}"), "cache", None)
+        if hasattr(cache, "stats"):
+            stats[tier] = dict(cache.stats)
+    # 캐시 / 장부 래퍼 안쪽의 재생 임베딩까지 찾아감
+    embeddings = get_embeddings(DEFAULT_DB_CONFIG)
+    while not hasattr(embeddings, "stats") and hasattr(embeddings, "base"):
+        embeddings = embeddings.base
+    if hasattr(embeddings, "stats") and not hasattr(embeddings, "get_stats"):
+        stats["embeddings"] = dict(embeddings.stats)
+    return stats
+
+
+def _print_run(index: int, result: Dict[str, Any]) -> None:
+    print(f"\n📊 실행 {index}: 벽시계 {result['wall']:.2f}s / CPU {result['cpu']:.2f}s / "
+          f"최대 메모리 {result['peak_memory'] / 1024 / 1024:.1f}MB"
+          + (f" / ❌ {result['error']}" if result["error"] else ""))
+    print(f"  {'노드':<22}{'횟수':>6}{'벽시계(s)':>12}{'최대(s)':>10}{'CPU(s)':>10}{'메모리(MB)':>12}")
+    nodes = sorted(result["nodes"].items(), key=lambda item: -item[1]["wall_total"])
+    for name, node in nodes:
+        print(f"  {name:<22}{node['calls']:>6}{node['wall_total']:>12.2f}{node['wall_max']:>10.2f}"
+              f"{node['cpu_total']:>10.2f}{node['peak_memory'] / 1024 / 1024:>12.1f}")
+
+
+def _load_artifacts(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data["artifacts"] if isinstance(data, dict) else data
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="오프라인 종단 간 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="실제 API 호출을 기록")
+    record.add_argument("--artifacts", required=True, help="아티팩트 JSON 파일 (리스트 또는 {'artifacts': [...]})")
+    record.add_argument("--fixtures", required=True, help="기록 디렉토리")
+    record.add_argument("--task-id", default="benchmark-task")
+    record.add_argument("--job-id", default="benchmark-job")
+
+    run = sub.add_parser("run", help="기록을 재생하며 측정")
+    run.add_argument("--fixtures", required=True, help="기록 디렉토리")
+    run.add_argument("--latency", default="none", help="none | recorded[:배율] | fixed:초 | lognormal:중앙값:시그마")
+    run.add_argument("--seed", type=int, default=None, help="지연 시간 난수 시드")
+    run.add_argument("--repeat", type=int, default=1)
+    run.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+
+    for command in (record, run):
+        command.add_argument("--workdir", default=None, help="벡터 DB 작업 디렉토리 (기본: 임시 디렉토리)")
+
+    args = parser.parse_args(argv)
+    fixtures = os.path.abspath(args.fixtures)
+    output = os.path.abspath(args.output) if getattr(args, "output", None) else None
+
+    if args.command == "record":
+        job = {
+            "task_id": args.task_id,
+            "job_id": args.job_id,
+            "job_info": {},
+            "artifacts": _load_artifacts(args.artifacts)
+        }
+        _configure("record", fixtures, "none", None)
+    else:
+        with open(os.path.join(fixtures, "job.json"), encoding="utf-8") as f:
+            job = json.load(f)
+        _configure("replay", fixtures, args.latency, args.seed)
+
+    # 벡터 DB(./chroma)가 기존 작업 데이터와 섞이지 않도록 별도 작업 디렉토리에서 실행
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="benchmark-")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    print(f"📁 작업 디렉토리: {workdir}")
+    print(f"📦 아티팩트: {len(job['artifacts']):,}개 / 기록: {fixtures}")
+
+    if args.command == "record":
+        os.makedirs(fixtures, exist_ok=True)
+        with open(os.path.join(fixtures, "job.json"), "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False, default=str)
+        result = run_pipeline(job)
+        _print_run(1, result)
+        print(f"\n✅ 기록 완료: {fixtures}")
+        return 1 if result["error"] else 0
+
+    results = []
+    for index in range(1, args.repeat + 1):
+        result = run_pipeline(job)
+        results.append(result)
+        _print_run(index, result)
+
+    replay = _replay_stats()
+    print(f"\n🔁 재생 통계: {json.dumps(replay, ensure_ascii=False)}")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"latency": args.latency, "runs": results, "replay": replay}, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {output}")
+    return 1 if any(result["error"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
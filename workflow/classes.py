@@ -5,6 +5,7 @@
 from typing import List, TypedDict, Annotated, Optional, Dict, Any, get_type_hints, get_origin
 from pydantic import BaseModel, Field
 import operator
+import uuid
 
 from common.models import ScenarioCreate, ScenarioStepCreate
 
@@ -56,6 +57,7 @@ class AgentState(TypedDict, total=False):
     data_save_status: Optional[str]  # 데이터 저장 상태 (success/failure)
     collection_name: Optional[str]  # 벡터 DB 컬렉션 이름 (RAG tool에서 사용)
     db_config: Optional[Dict[str, Any]]  # 벡터 DB 설정 (RAG tool이 DB 재생성에 필요)
+    run_id: Optional[str]  # 그래프 실행 ID (검색 세션 등 실행 단위 상태의 키)
     
     # -- 요구사항 분석 --
     analyzed_user_requirements: Optional[str]  # 분석된 사용자 요구사항
@@ -63,6 +65,7 @@ class AgentState(TypedDict, total=False):
     
     # -- 2단계: 에이전트 분석 --
     messages: Annotated[Optional[List[Any]], operator.add]  # 에이전트 대화 히스토리
+    context_tokens: Optional[int]  # LLM 입력 기준 히스토리 추정 토큰 수 (도구 결과 예산 산정용)
     analysis_failed: Optional[bool]  # 에이전트 분석 실패 여부 (오류 발생 시 True)
     
     # -- 3단계: 최종 결과 --
@@ -123,6 +126,20 @@ class StructuredQuery(BaseModel):
         le=1.0,
         description="유사도 임계값 (0.0~1.0, 낮을수록 더 엄격한 필터링)"
     )
+    
+    # 2차 검색: 키워드(BM25) 융합
+    hybrid_search: Optional[bool] = Field(
+        default=True,
+        description="파일명, USB 시리얼, 도메인 같은 정확한 토큰을 키워드 검색(BM25)으로도 찾아 벡터 검색 순위와 융합(RRF)할지 여부"
+    )
+
+    # 3차 정렬: 다양성 재정렬 (MMR)
+    diversity: Optional[float] = Field(
+        default=0.0,
+        ge=0.0,
+        le=0.9,
+        description="결과 다양성 (0.0~0.9, 0이면 관련도 순서 그대로). 같은 파일/도메인의 거의 같은 기록이 반복될 때 0.3~0.5로 올리면 서로 다른 결과가 먼저 나옴"
+    )
 
 
 # 수정된 보고서를 직접 받기 위한 스키마
@@ -135,9 +152,14 @@ class ReviewedScenario(BaseModel):
     review_summary: str = Field(description="수정 사항 요약")
 
 
+def new_run_id() -> str:
+    """그래프 실행 ID 생성"""
+    return f"run-{uuid.uuid4().hex[:16]}"
+
+
 def create_initial_state(**kwargs) -> dict:
     """
-    AgentState의 필수 필드를 자동으로 검증하여 초기 상태 생성
+    AgentState의 필수 필드를 자동으로 검증하여 초기 상태 생성 (run_id 미지정 시 새로 발급)
     
     사용 예:
         initial_state = create_initial_state(
@@ -161,7 +183,7 @@ def create_initial_state(**kwargs) -> dict:
     if not_allowed_keys:
         raise ValueError(f"허용되지 않은 키 입력: {not_allowed_keys}")
     
-    return dict(kwargs)
+    return {"run_id": new_run_id(), **kwargs}
 
 
 class BooleanResponse(BaseModel):
@@ -0,0 +1,160 @@
+"""
+에이전트 대화 히스토리 압축 (턴마다 전체 히스토리를 다시 보내는 비용 억제)
+- 시스템 프롬프트, 최초 요구사항, 최근 N턴은 원문 유지
+- 그 이전 ToolMessage는 규칙 기반 요약으로 교체 (메시지 첫 줄 + 타입별 아티팩트 ID 목록, workflow/tool_digest.py)
+- tool_call_id / name은 그대로 유지 → AIMessage의 도구 호출과 짝이 맞음
+- 추정 토큰이 임계값을 넘을 때만 적용, 요약은 tool_call_id별로 캐시 (매 턴 재계산 없음)
+- state의 messages는 그대로 두고 LLM에 보내는 목록만 압축
+- 근거 저장소로 옮겨진 결과(이미 요약 + 핸들)는 다시 요약하지 않음 (workflow/evidence_store.py)
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import logging
+import threading
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from workflow.evidence_store import evidence_handle
+from workflow.tool_digest import MAX_AI_TEXT_CHARS, digest_tool_content, estimate_tokens
+from workflow.utils import env_int
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_TRIGGER_TOKENS = 30_000  # 히스토리 추정 토큰이 이 값을 넘으면 압축
+DEFAULT_KEEP_TURNS = 3  # 원문으로 유지할 최근 에이전트 턴 수 (AIMessage + 도구 결과)
+DEFAULT_MIN_MESSAGE_TOKENS = 300  # 이보다 작은 ToolMessage는 그대로 유지
+
+
+# --------------------------------------------------------------------------
+# 히스토리 압축
+# --------------------------------------------------------------------------
+
+class ContextCompactor:
+    """최근 N턴 원문 유지 + 이전 도구 결과 요약"""
+
+    def __init__(
+        self,
+        trigger_tokens: int = DEFAULT_TRIGGER_TOKENS,
+        keep_turns: int = DEFAULT_KEEP_TURNS,
+        min_message_tokens: int = DEFAULT_MIN_MESSAGE_TOKENS,
+        cache_size: int = 2048
+    ):
+        self.trigger_tokens = trigger_tokens
+        self.keep_turns = keep_turns
+        self.min_message_tokens = min_message_tokens
+        self.cache_size = cache_size
+        self._digests: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ContextCompactor":
+        """환경 변수 기반 생성 (AGENT_COMPACTION_TRIGGER_TOKENS=0이면 압축 비활성화)"""
+        return cls(
+            trigger_tokens=env_int("AGENT_COMPACTION_TRIGGER_TOKENS", DEFAULT_TRIGGER_TOKENS),
+            keep_turns=env_int("AGENT_COMPACTION_KEEP_TURNS", DEFAULT_KEEP_TURNS),
+            min_message_tokens=env_int("AGENT_COMPACTION_MIN_MESSAGE_TOKENS", DEFAULT_MIN_MESSAGE_TOKENS)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.trigger_tokens > 0
+
+    def _digest(self, message: ToolMessage) -> str:
+        if not message.tool_call_id:
+            return digest_tool_content(message.content)
+        key = f"{message.tool_call_id}:{message.name}"
+        with self._lock:
+            digest = self._digests.get(key)
+            if digest is not None:
+                self._digests.move_to_end(key)
+                return digest
+        digest = digest_tool_content(message.content)
+        with self._lock:
+            self._digests[key] = digest
+            while len(self._digests) > self.cache_size:
+                self._digests.popitem(last=False)
+        return digest
+
+    def _protected_prefix(self, messages: List[BaseMessage]) -> int:
+        """앞쪽 시스템 프롬프트 + 최초 요구사항 메시지 수"""
+        count = 0
+        for message in messages:
+            if isinstance(message, (SystemMessage, HumanMessage)) and count < 2:
+                count += 1
+            else:
+                break
+        return count
+
+    def compact(self, messages: List[BaseMessage]) -> Tuple[List[BaseMessage], Dict]:
+        """
+        LLM에 보낼 메시지 목록 압축
+
+        Returns:
+            (압축된 메시지 목록, {"before_tokens", "after_tokens", "compacted", "kept_turns"})
+        """
+        before = sum(estimate_tokens(getattr(m, "content", "")) for m in messages)
+        stats = {"before_tokens": before, "after_tokens": before, "compacted": 0, "kept_turns": self.keep_turns}
+        if not self.enabled or before <= self.trigger_tokens:
+            return list(messages), stats
+
+        # 최근 N개 AIMessage부터는 원문 유지
+        ai_positions = [i for i, m in enumerate(messages) if isinstance(m, AIMessage)]
+        if len(ai_positions) <= self.keep_turns:
+            return list(messages), stats
+        boundary = ai_positions[-self.keep_turns] if self.keep_turns > 0 else len(messages)
+        prefix = self._protected_prefix(messages)
+
+        compacted: List[BaseMessage] = []
+        count = 0
+        for i, message in enumerate(messages):
+            if i < prefix or i >= boundary:
+                compacted.append(message)
+                continue
+            if isinstance(message, ToolMessage) and not evidence_handle(message) \
+                    and estimate_tokens(message.content) >= self.min_message_tokens:
+                compacted.append(message.model_copy(update={"content": self._digest(message)}))
+                count += 1
+            elif isinstance(message, AIMessage) and isinstance(message.content, str) \
+                    and len(message.content) > MAX_AI_TEXT_CHARS:
+                # 도구 호출(tool_calls)은 유지하고 추론 텍스트만 줄임
+                trimmed = message.content[:MAX_AI_TEXT_CHARS]
+                compacted.append(message.model_copy(
+                    update={"content": f"{trimmed}…(+{len(message.content) - len(trimmed)}자 생략)"}
+                ))
+                count += 1
+            else:
+                compacted.append(message)
+
+        stats["after_tokens"] = sum(estimate_tokens(getattr(m, "content", "")) for m in compacted)
+        stats["compacted"] = count
+        logger.info(
+            "컨텍스트 압축: %d → %d 토큰 (메시지 %d개 요약, 최근 %d턴 유지)",
+            before, stats["after_tokens"], count, self.keep_turns
+        )
+        return compacted, stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._digests.clear()
+
+
+# --------------------------------------------------------------------------
+# 전역 압축기
+# --------------------------------------------------------------------------
+
+_global_compactor: Optional[ContextCompactor] = None
+_compactor_lock = threading.Lock()
+
+
+def get_context_compactor() -> ContextCompactor:
+    """전역 히스토리 압축기 반환 (최초 호출 시 환경 변수로 생성)"""
+    global _global_compactor
+
+    if _global_compactor is not None:
+        return _global_compactor
+
+    with _compactor_lock:
+        if _global_compactor is None:
+            _global_compactor = ContextCompactor.from_env()
+        return _global_compactor
@@ -4,7 +4,7 @@
 - Factory Pattern으로 쉽게 DB 교체 가능
 - 검색 성능 최적화를 위해 메타데이터 최소화
 """
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime, date
 from langchain_chroma import Chroma
@@ -13,8 +13,16 @@ from langchain_core.vectorstores import VectorStore
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from chromadb.config import Settings as ChromaSettings
 import chromadb
+import hashlib
+import json
 import threading
 import logging
+import os
+import re
+
+from workflow.embedding_cache import CachedEmbeddings, configured_cache_size
+from workflow.token_ledger import LedgerEmbeddings
+from workflow.utils import env_str
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +80,9 @@ def datetime_to_timestamp(dt: Any) -> Optional[float]:
 # 데이터베이스 설정 (한 곳에서만 수정하면 전체 적용)
 # --------------------------------------------------------------------------
 
+PARTITION_MODES = ("none", "type", "group")
+
+
 @dataclass
 class VectorDBConfig:
     """벡터 DB 설정 - 한 곳에서 DB 교체 가능"""
@@ -79,6 +90,9 @@ class VectorDBConfig:
     embedding_model: str = "gemini-embedding-001"
     embedding_provider: str = "google"
     persist_directory: str = "./chroma"
+    # 컬렉션 분할: "none" (단일 컬렉션), "type" (artifact_type별), "group" (타입 계열별, 예: Chrome.*)
+    # None(빈 값)이면 사용 시점에 VECTOR_DB_PARTITION_MODE를 읽음 (.env는 이 모듈 import 이후에 로드됨)
+    partition_mode: Optional[str] = None
     chroma_settings: ChromaSettings = field(default_factory=lambda: ChromaSettings(
         anonymized_telemetry=False,
         is_persistent=True
@@ -86,6 +100,19 @@ class VectorDBConfig:
     
     def __post_init__(self):
         self.chroma_settings.persist_directory = self.persist_directory
+        self.partition_mode = self.partition_mode or None
+        if self.partition_mode is not None:
+            _check_partition_mode(self.partition_mode)
+    
+    def get_partition_mode(self) -> str:
+        """분할 방식 (설정값 → VECTOR_DB_PARTITION_MODE → none)"""
+        return _check_partition_mode(self.partition_mode or env_str("VECTOR_DB_PARTITION_MODE", "none"))
+
+
+def _check_partition_mode(mode: str) -> str:
+    if mode not in PARTITION_MODES:
+        raise ValueError(f"Unknown partition_mode: {mode} ({', '.join(PARTITION_MODES)} 지원)")
+    return mode
 
 
 # --------------------------------------------------------------------------
@@ -96,6 +123,18 @@ MAX_SEARCH_RESULTS = 300  # 최대 검색 결과 개수
 
 DEFAULT_DB_CONFIG = VectorDBConfig()
 
+DEFAULT_COLLECTION_NAME = "artifacts_collection"
+
+
+def collection_name_for_task(task_id: Optional[str]) -> str:
+    """작업별 컬렉션 이름 (같은 프로세스의 동시 작업이 서로의 컬렉션을 지우거나 덮어쓰지 않도록 분리)"""
+    if not task_id:
+        return DEFAULT_COLLECTION_NAME
+    task_id = str(task_id)
+    slug = re.sub(r"[^a-zA-Z0-9_-]+", "_", task_id).strip("_-")[:32]
+    digest = hashlib.sha1(task_id.encode("utf-8")).hexdigest()[:8]
+    return f"{DEFAULT_COLLECTION_NAME}_{slug}_{digest}" if slug else f"{DEFAULT_COLLECTION_NAME}_{digest}"
+
 
 # --------------------------------------------------------------------------
 # Config 정규화
@@ -116,6 +155,7 @@ def normalize_config(config: Union[None, dict, VectorDBConfig]) -> VectorDBConfi
                 embedding_model=config.get("embedding_model", DEFAULT_DB_CONFIG.embedding_model),
                 embedding_provider=config.get("embedding_provider", DEFAULT_DB_CONFIG.embedding_provider),
                 persist_directory=config.get("persist_directory", DEFAULT_DB_CONFIG.persist_directory),
+                partition_mode=config.get("partition_mode", DEFAULT_DB_CONFIG.partition_mode),
                 chroma_settings=config.get("chroma_settings", DEFAULT_DB_CONFIG.chroma_settings)
             )
         except Exception as e:
@@ -143,8 +183,8 @@ def parse_document_content(page_content: str) -> Dict[str, str]:
 # 임베딩 모델
 # --------------------------------------------------------------------------
 
-def get_embeddings(config: VectorDBConfig = DEFAULT_DB_CONFIG):
-    """설정에 따라 임베딩 모델을 반환합니다."""
+def _create_embeddings(config: VectorDBConfig) -> Any:
+    """설정에 따라 임베딩 모델을 생성합니다."""
     if config.embedding_provider == "google":
         return GoogleGenerativeAIEmbeddings(model=config.embedding_model)
     elif config.embedding_provider == "openai":
@@ -154,6 +194,83 @@ def get_embeddings(config: VectorDBConfig = DEFAULT_DB_CONFIG):
         raise ValueError(f"Unknown embedding provider: {config.embedding_provider}")
 
 
+_embeddings_instances: Dict[Tuple[str, str], Any] = {}
+_embeddings_lock = threading.Lock()
+
+
+def get_embeddings(config: VectorDBConfig = DEFAULT_DB_CONFIG):
+    """
+    설정에 따라 임베딩 모델을 반환합니다.
+    
+    모델(provider, model)별로 인스턴스를 재사용하며, 쿼리 임베딩 캐시(CachedEmbeddings)로 감쌉니다.
+    EMBEDDING_CACHE_SIZE=0이면 캐시 없이 원본 모델을 반환합니다.
+    """
+    key = (config.embedding_provider, config.embedding_model)
+    
+    # Fast path: 락 없이 빠른 체크
+    embeddings = _embeddings_instances.get(key)
+    if embeddings is not None:
+        return embeddings
+    
+    with _embeddings_lock:
+        embeddings = _embeddings_instances.get(key)
+        if embeddings is None:
+            from workflow.replay import (
+                RecordingEmbeddings, ReplayEmbeddings, get_fixture_store, get_llm_mode, get_replay_latency
+            )
+            mode = get_llm_mode()
+            if mode == "replay":
+                # 기록된 벡터 재생 (검색 쿼리 묶음 호출은 task_type 인자로 구분)
+                embeddings = ReplayEmbeddings(f"{key[0]}:{key[1]}", get_fixture_store(), get_replay_latency())
+            else:
+                embeddings = _create_embeddings(config)
+                if mode == "record":
+                    embeddings = RecordingEmbeddings(embeddings, f"{key[0]}:{key[1]}", get_fixture_store())
+            # 실제(또는 재생) 호출만 작업별 토큰 장부에 기록 (캐시 적중은 제외)
+            embeddings = LedgerEmbeddings(embeddings, config.embedding_model)
+            if configured_cache_size() > 0:
+                embeddings = CachedEmbeddings.from_env(
+                    embeddings, f"{key[0]}:{key[1]}", query_batch_kwargs(embeddings)
+                )
+            _embeddings_instances[key] = embeddings
+        return embeddings
+
+
+def query_batch_kwargs(embeddings: Any) -> Dict[str, Any]:
+    """
+    검색 쿼리 묶음(embed_documents) 호출 인자 - 래퍼(.base: 장부 / 기록)를 벗긴 원본 모델 기준
+
+    Google은 embed_query 기본값과 같은 검색 쿼리용 task type을 넘겨 단건 / 묶음 벡터를 일치시킵니다.
+    """
+    from workflow.replay import ReplayEmbeddings
+
+    while embeddings is not None:
+        if isinstance(embeddings, GoogleGenerativeAIEmbeddings):
+            return {"task_type": "RETRIEVAL_QUERY"}
+        if isinstance(embeddings, ReplayEmbeddings):
+            return {"task_type": "RETRIEVAL_QUERY"} if embeddings.model_key.startswith("google:") else {}
+        embeddings = getattr(embeddings, "base", None)
+    return {}
+
+
+def embed_query_texts(embeddings: Any, texts: List[str]) -> List[List[float]]:
+    """여러 검색 쿼리를 한 번의 호출로 임베딩 (Google은 검색 쿼리용 task type 유지)"""
+    if not texts:
+        return []
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.embed_queries(texts)
+    return embeddings.embed_documents(texts, **query_batch_kwargs(embeddings))
+
+
+async def aembed_query_texts(embeddings: Any, texts: List[str]) -> List[List[float]]:
+    """embed_query_texts의 비동기 버전 (이벤트 루프를 막지 않음)"""
+    if not texts:
+        return []
+    if isinstance(embeddings, CachedEmbeddings):
+        return await embeddings.aembed_queries(texts)
+    return await embeddings.aembed_documents(texts, **query_batch_kwargs(embeddings))
+
+
 # --------------------------------------------------------------------------
 # 전역 ChromaDB 클라이언트 (스레드 안전)
 # --------------------------------------------------------------------------
@@ -199,6 +316,203 @@ def get_chroma_client(config: VectorDBConfig = DEFAULT_DB_CONFIG) -> Any:
             raise ValueError(f"ChromaDB 클라이언트 생성 실패: {e}") from e
 
 
+# --------------------------------------------------------------------------
+# 컬렉션 쓰기 버전 (이 프로세스의 로컬 인덱스 메모리 사본 무효화용)
+# - 검색 결과 캐시는 다른 프로세스의 저장도 반영해야 하므로 get_data_version 사용
+# --------------------------------------------------------------------------
+
+_collection_versions: Dict[str, int] = {}
+_version_lock = threading.Lock()
+
+
+def get_collection_version(collection_name: str) -> int:
+    """컬렉션 쓰기 버전 반환 (저장/삭제 시마다 증가)"""
+    with _version_lock:
+        return _collection_versions.get(collection_name, 0)
+
+
+def bump_collection_version(collection_name: str) -> int:
+    """컬렉션 내용 변경 기록 (이전 버전으로 캐시된 검색 결과는 더 이상 조회되지 않음)"""
+    with _version_lock:
+        version = _collection_versions.get(collection_name, 0) + 1
+        _collection_versions[collection_name] = version
+    logger.debug("컬렉션 '%s' 쓰기 버전: %d", collection_name, version)
+    return version
+
+
+# --------------------------------------------------------------------------
+# 컬렉션 분할 (artifact_type별 파티션)
+# - 타입 필터가 있는 검색은 해당 파티션(작은 HNSW 인덱스)만 조회
+# - 파티션 구성은 저장 시 매니페스트 파일에 기록 → 검색은 설정이 아닌 매니페스트 기준으로 라우팅
+# --------------------------------------------------------------------------
+
+def partition_key(artifact_type: str, mode: str) -> str:
+    """아티팩트 타입의 파티션 키 (group: 첫 '.' 앞부분, 예: Chrome.history → Chrome)"""
+    if mode == "group":
+        return artifact_type.split(".", 1)[0]
+    return artifact_type
+
+
+def partition_collection_name(collection_name: str, key: str) -> str:
+    """파티션 컬렉션 이름 (Chroma 이름 규칙에 맞게 정리, 대소문자/기호만 다른 키 충돌 방지용 해시 포함)"""
+    slug = re.sub(r"[^a-z0-9_-]+", "_", key.lower()).strip("_-")[:40] or "unknown"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:6]
+    return f"{collection_name}__{slug}_{digest}"
+
+
+def _partition_manifest_path(collection_name: str, config: VectorDBConfig) -> str:
+    return os.path.join(config.persist_directory, "partitions", f"{collection_name}.json")
+
+
+_partition_maps: Dict[Tuple[str, str], Tuple[Any, Optional[Dict[str, List[str]]]]] = {}
+_partition_lock = threading.Lock()
+
+
+def _write_partition_manifest(
+    collection_name: str,
+    partitions: Optional[Dict[str, List[str]]],
+    mode: str,
+    config: VectorDBConfig
+) -> None:
+    """파티션 매니페스트 기록 (partitions가 None이면 삭제 → 단일 컬렉션)"""
+    path = _partition_manifest_path(collection_name, config)
+    if partitions is None:
+        if os.path.exists(path):
+            os.remove(path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"mode": mode, "partitions": partitions}, f, ensure_ascii=False, indent=2)
+    with _partition_lock:
+        _partition_maps.pop((config.persist_directory, collection_name), None)
+
+
+def get_partition_map(
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> Optional[Dict[str, List[str]]]:
+    """
+    파티션 컬렉션 이름 → 포함된 artifact_type 목록 (분할 저장되지 않았으면 None)
+    
+    매니페스트 파일의 수정 시각/크기가 같은 동안 메모리 사본을 사용합니다 (다른 프로세스의 저장도 반영).
+    """
+    cache_key = (config.persist_directory, collection_name)
+    path = _partition_manifest_path(collection_name, config)
+    try:
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = None
+    with _partition_lock:
+        cached = _partition_maps.get(cache_key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    
+    partitions = None
+    if signature is not None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                partitions = json.load(f).get("partitions")
+        except (OSError, ValueError) as e:
+            logger.warning("파티션 매니페스트 읽기 실패 (단일 컬렉션으로 처리): %s", e)
+    
+    with _partition_lock:
+        _partition_maps[cache_key] = (signature, partitions)
+    return partitions
+
+
+def route_partitions(
+    collection_name: str,
+    artifact_types: Optional[List[str]] = None,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> List[Tuple[str, Optional[List[str]]]]:
+    """
+    검색할 물리 컬렉션 목록
+    
+    Returns:
+        [(컬렉션 이름, 파티션에 포함된 타입 또는 None)]
+        - 분할되지 않은 컬렉션: [(collection_name, None)]
+        - 타입 필터 있음: 해당 타입을 포함한 파티션만 (없으면 빈 목록)
+        - 타입 필터 없음: 모든 파티션
+    """
+    partitions = get_partition_map(collection_name, config)
+    if partitions is None:
+        return [(collection_name, None)]
+    if not artifact_types:
+        return list(partitions.items())
+    wanted = set(artifact_types)
+    return [(name, types) for name, types in partitions.items() if wanted & set(types)]
+
+
+def physical_collections(
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> List[str]:
+    """논리 컬렉션을 구성하는 실제 Chroma 컬렉션 이름 목록"""
+    return [name for name, _ in route_partitions(collection_name, None, config)]
+
+
+def get_data_version(
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> str:
+    """
+    저장된 데이터 기준 버전 (검색 결과 캐시 키용)
+    
+    물리 컬렉션별 (Chroma 컬렉션 ID, 문서 수)의 지문입니다. 삭제 후 재생성하면 컬렉션 ID가,
+    문서를 추가하면 문서 수가 바뀌므로 다른 프로세스(노트북, 워커 등)의 저장/삭제도 반영됩니다.
+    """
+    client = get_chroma_client(config)
+    parts = []
+    for name in physical_collections(collection_name, config):
+        try:
+            collection = client.get_collection(name)
+            parts.append(f"{collection.id}:{collection.count()}")
+        except Exception:
+            parts.append(f"{name}:missing")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def delete_collection_partitions(
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> int:
+    """파티션 컬렉션과 매니페스트 삭제 (삭제한 파티션 수 반환)"""
+    partitions = get_partition_map(collection_name, config)
+    if not partitions:
+        return 0
+    client = get_chroma_client(config)
+    deleted = 0
+    for name in partitions:
+        try:
+            client.delete_collection(name=name)
+            deleted += 1
+        except Exception:
+            logger.debug("파티션 컬렉션 없음: %s", name)
+    _write_partition_manifest(collection_name, None, "none", config)
+    return deleted
+
+
+def drop_collection(
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> bool:
+    """작업 종료 후 컬렉션 정리 (파티션, 로컬 인덱스 포함) - 삭제한 컬렉션이 있으면 True"""
+    from workflow.local_index import drop_local_indexes
+
+    deleted = delete_collection_partitions(collection_name, config) > 0
+    try:
+        get_chroma_client(config).delete_collection(name=collection_name)
+        deleted = True
+    except Exception:
+        logger.debug("컬렉션 없음: %s", collection_name)
+    if deleted:
+        bump_collection_version(collection_name)
+        logger.info("컬렉션 '%s' 정리 완료", collection_name)
+    drop_local_indexes(collection_name, config)
+    return deleted
+
+
 # --------------------------------------------------------------------------
 # 벡터 스토어 생성
 # --------------------------------------------------------------------------
@@ -227,12 +541,47 @@ def create_vectorstore(
         raise ValueError(f"Unknown db_type: {config.db_type}")
 
 
+def get_document_embeddings(
+    collection_name: str,
+    artifact_ids: List[str],
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> Dict[str, List[float]]:
+    """
+    저장된 문서 임베딩 조회 (재임베딩 없이 컬렉션에서 읽음)
+
+    Returns:
+        artifact_id → 임베딩 (컬렉션에 없는 ID는 제외)
+    """
+    if not artifact_ids:
+        return {}
+    if config.db_type != "chroma":
+        raise NotImplementedError(f"{config.db_type} 임베딩 조회 미구현")
+
+    client = get_chroma_client(config)
+    found: Dict[str, List[float]] = {}
+    unique_ids = list(dict.fromkeys(artifact_ids))
+    for name in physical_collections(collection_name, config):
+        collection = client.get_collection(name)
+        for i in range(0, len(unique_ids), 500):
+            batch = [artifact_id for artifact_id in unique_ids[i:i + 500] if artifact_id not in found]
+            if not batch:
+                continue
+            result = collection.get(
+                where={"artifact_id": {"$in": batch}},
+                include=["embeddings", "metadatas"]
+            )
+            for metadata, embedding in zip(result["metadatas"], result["embeddings"]):
+                if metadata and embedding is not None:
+                    found[metadata.get("artifact_id")] = embedding
+    return found
+
+
 # --------------------------------------------------------------------------
 # 데이터베이스 저장 함수
 # --------------------------------------------------------------------------
 
-def _artifact_to_document(artifact: dict, idx: int) -> Document:
-    """아티팩트를 검색 가능한 Document로 변환"""
+def artifact_to_document(artifact: dict, idx: int) -> Document:
+    """아티팩트를 검색 가능한 Document로 변환 (로컬 인덱스도 같은 page_content 사용)"""
     artifact_type = artifact.get('artifact_type', 'unknown')
     artifact_id = artifact.get('id', f'artifact_{idx}')
     source = artifact.get('source', 'unknown')
@@ -263,6 +612,48 @@ def _artifact_to_document(artifact: dict, idx: int) -> Document:
     return Document(page_content=page_content, metadata=metadata)
 
 
+def _write_documents(
+    documents: List[Document],
+    collection_name: str,
+    embeddings: Any,
+    config: VectorDBConfig,
+    indent: str = "  "
+) -> None:
+    """Document 목록을 한 컬렉션에 배치 저장"""
+    BATCH_SIZE = 500
+    total_docs = len(documents)
+    
+    if total_docs <= BATCH_SIZE:
+        Chroma.from_documents(
+            documents=documents,
+            embedding=embeddings,
+            collection_name=collection_name,
+            persist_directory=config.persist_directory
+        )
+        print(f"{indent}✅ {total_docs:,}개 아티팩트 저장 완료")
+        return
+    
+    # 대용량 배치 저장
+    print(f"{indent}📦 {total_docs:,}개를 {BATCH_SIZE:,}개씩 배치 저장")
+    
+    # 첫 번째 배치
+    vectorstore = Chroma.from_documents(
+        documents=documents[:BATCH_SIZE],
+        embedding=embeddings,
+        collection_name=collection_name,
+        persist_directory=config.persist_directory
+    )
+    print(f"{indent}   ✓ 배치 1/{(total_docs + BATCH_SIZE - 1) // BATCH_SIZE}")
+    
+    # 나머지 배치
+    for i in range(BATCH_SIZE, total_docs, BATCH_SIZE):
+        batch_docs = documents[i:i + BATCH_SIZE]
+        vectorstore.add_documents(batch_docs)
+        print(f"{indent}   ✓ 배치 {(i // BATCH_SIZE) + 1}/{(total_docs + BATCH_SIZE - 1) // BATCH_SIZE}")
+    
+    print(f"{indent}✅ 전체 {total_docs:,}개 배치 저장 완료")
+
+
 def save_to_chroma(
     artifacts: List[dict],
     collection_name: str = "filtered_artifacts",
@@ -270,6 +661,9 @@ def save_to_chroma(
 ) -> Dict:
     """
     아티팩트를 벡터 DB에 저장 (배치 처리 지원)
+    
+    분할 방식(config.get_partition_mode())이 "type"/"group"이면 파티션별 컬렉션에 나누어 저장하고
+    매니페스트에 구성을 기록합니다 (검색 시 타입 필터에 맞는 파티션만 조회).
     """
     try:
         if not artifacts:
@@ -282,44 +676,38 @@ def save_to_chroma(
         print(f"--- 💾 {config.db_type.upper()} DB에 {len(artifacts):,}개 아티팩트 저장 중... ---")
         
         embeddings = get_embeddings(config)
-        documents = [_artifact_to_document(art, idx) for idx, art in enumerate(artifacts)]
+        documents = [artifact_to_document(art, idx) for idx, art in enumerate(artifacts)]
+        partition_mode = config.get_partition_mode()
+        partition_count = 0
         
         # ChromaDB 배치 저장
         if config.db_type == "chroma":
-            BATCH_SIZE = 500
-            total_docs = len(documents)
-            
-            if total_docs <= BATCH_SIZE:
-                vectorstore = Chroma.from_documents(
-                    documents=documents,
-                    embedding=embeddings,
-                    collection_name=collection_name,
-                    persist_directory=config.persist_directory
-                )
-                print(f"  ✅ {total_docs:,}개 아티팩트 저장 완료")
+            if partition_mode == "none":
+                _write_documents(documents, collection_name, embeddings, config)
+                _write_partition_manifest(collection_name, None, partition_mode, config)
             else:
-                # 대용량 배치 저장
-                print(f"  📦 {total_docs:,}개를 {BATCH_SIZE:,}개씩 배치 저장")
-                
-                # 첫 번째 배치
-                vectorstore = Chroma.from_documents(
-                    documents=documents[:BATCH_SIZE],
-                    embedding=embeddings,
-                    collection_name=collection_name,
-                    persist_directory=config.persist_directory
-                )
-                print(f"     ✓ 배치 1/{(total_docs + BATCH_SIZE - 1) // BATCH_SIZE}")
-                
-                # 나머지 배치
-                for i in range(BATCH_SIZE, total_docs, BATCH_SIZE):
-                    batch_docs = documents[i:i + BATCH_SIZE]
-                    vectorstore.add_documents(batch_docs)
-                    print(f"     ✓ 배치 {(i // BATCH_SIZE) + 1}/{(total_docs + BATCH_SIZE - 1) // BATCH_SIZE}")
+                # 파티션별 분할 저장
+                grouped: Dict[str, List[Document]] = {}
+                partitions: Dict[str, List[str]] = {}
+                for doc in documents:
+                    artifact_type = doc.metadata["artifact_type"]
+                    name = partition_collection_name(
+                        collection_name, partition_key(artifact_type, partition_mode)
+                    )
+                    grouped.setdefault(name, []).append(doc)
+                    if artifact_type not in partitions.setdefault(name, []):
+                        partitions[name].append(artifact_type)
                 
-                print(f"  ✅ 전체 {total_docs:,}개 배치 저장 완료")
+                print(f"  🗂️  {len(grouped)}개 파티션으로 분할 저장 ({partition_mode})")
+                for name, partition_docs in grouped.items():
+                    print(f"  • {name} ({', '.join(partitions[name])})")
+                    _write_documents(partition_docs, name, embeddings, config, indent="    ")
+                _write_partition_manifest(collection_name, partitions, partition_mode, config)
+                partition_count = len(grouped)
         else:
             raise NotImplementedError(f"{config.db_type} 저장 미구현")
         
+        bump_collection_version(collection_name)
         print(f"  📁 위치: {config.persist_directory}/{collection_name}")
         
         return {
@@ -327,11 +715,13 @@ def save_to_chroma(
             "message": f"{len(documents):,}개 아티팩트 저장 완료",
             "count": len(documents),
             "collection_name": collection_name,
+            "partitions": partition_count,
             "db_config": {
                 "db_type": config.db_type,
                 "embedding_model": config.embedding_model,
                 "embedding_provider": config.embedding_provider,
-                "persist_directory": config.persist_directory
+                "persist_directory": config.persist_directory,
+                "partition_mode": partition_mode
             }
         }
         
@@ -352,18 +742,26 @@ def save_data_node(state) -> Dict[str, Any]:
     print("--- 💾 Node: 필터링된 데이터 저장 시도... ---")
     
     filtered_artifacts = state.get("filtered_artifacts", [])
-    collection_name = "artifacts_collection"
+    collection_name = collection_name_for_task(state.get("task_id"))
     
     # 이전 컬렉션 삭제
     try:
         client = get_chroma_client(DEFAULT_DB_CONFIG)
+        partitions_deleted = delete_collection_partitions(collection_name, DEFAULT_DB_CONFIG)
+        if partitions_deleted:
+            logger.info("기존 파티션 컬렉션 %d개 삭제", partitions_deleted)
         try:
             client.delete_collection(name=collection_name)
+            bump_collection_version(collection_name)
             logger.info("기존 컬렉션 '%s' 삭제", collection_name)
             print(f"  🗑️  이전 컬렉션 초기화 완료")
         except Exception:
-            logger.debug("컬렉션 없음, 새로 생성")
-            print(f"  ℹ️  새로운 컬렉션 생성 준비")
+            if partitions_deleted:
+                bump_collection_version(collection_name)
+                print(f"  🗑️  이전 파티션 컬렉션 {partitions_deleted}개 초기화 완료")
+            else:
+                logger.debug("컬렉션 없음, 새로 생성")
+                print(f"  ℹ️  새로운 컬렉션 생성 준비")
     except Exception as e:
         logger.warning("초기화 중 오류 (무시): %s", e)
         print(f"  ⚠️  초기화 중 오류 (무시): {e}")
@@ -375,6 +773,11 @@ def save_data_node(state) -> Dict[str, Any]:
         config=DEFAULT_DB_CONFIG
     )
     
+    # 로컬 인덱스 생성 (집계 등 임베딩 없이 조회하는 도구용)
+    if result["data_save_status"] == "success":
+        from workflow.local_index import build_local_indexes
+        build_local_indexes(filtered_artifacts, collection_name, DEFAULT_DB_CONFIG)
+    
     status = "성공" if result["data_save_status"] == "success" else "실패"
     print(f"--- {'✅' if status == '성공' else '❌'} Node: 데이터 저장 {status} ({result.get('count', 0):,}개) ---")
     
@@ -0,0 +1,295 @@
+"""
+검색 쿼리 임베딩 캐시
+- get_embeddings()가 반환하는 임베딩 모델을 감싸 embed_query 결과를 재사용
+- 1단계: 메모리 LRU, 2단계: SQLite 파일 (선택, 프로세스 재시작 후에도 유지)
+- 동시에 들어온 같은 쿼리는 하나의 원격 호출로 묶음 (single-flight)
+- 문서 임베딩(embed_documents, 저장 시)은 캐시하지 않고 그대로 전달
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from workflow.utils import env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_EMBEDDING_CACHE_SIZE = 1024  # 메모리 LRU 최대 항목 수 (0이면 캐시 비활성화)
+
+
+def configured_cache_size() -> int:
+    """EMBEDDING_CACHE_SIZE (빈 값은 미설정과 동일하게 기본값)"""
+    return env_int("EMBEDDING_CACHE_SIZE", DEFAULT_EMBEDDING_CACHE_SIZE)
+
+
+class CachedEmbeddings(Embeddings):
+    """쿼리 임베딩 캐시 래퍼 (스레드 안전)"""
+
+    def __init__(
+        self,
+        base: Embeddings,
+        model_key: str,
+        max_size: int = DEFAULT_EMBEDDING_CACHE_SIZE,
+        persist_path: Optional[str] = None,
+        query_batch_kwargs: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            base: 실제 임베딩 모델
+            model_key: 캐시 키 접두사 (provider:model, 모델이 다르면 벡터도 다름)
+            max_size: 메모리 LRU 크기
+            persist_path: SQLite 파일 경로 (None이면 메모리만 사용)
+            query_batch_kwargs: 여러 쿼리를 embed_documents로 묶어 보낼 때의 추가 인자
+                (예: Google은 task_type="RETRIEVAL_QUERY")
+        """
+        self.base = base
+        self.model_key = model_key
+        self.max_size = max_size
+        self.persist_path = persist_path
+        self.query_batch_kwargs = query_batch_kwargs or {}
+
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "coalesced": 0, "misses": 0}
+
+        if persist_path:
+            self._open_disk(persist_path)
+
+    @classmethod
+    def from_env(
+        cls,
+        base: Embeddings,
+        model_key: str,
+        query_batch_kwargs: Optional[Dict[str, Any]] = None
+    ) -> "CachedEmbeddings":
+        """환경 변수 기반 캐시 생성"""
+        return cls(
+            base,
+            model_key,
+            max_size=configured_cache_size(),
+            persist_path=env_str("EMBEDDING_CACHE_PATH"),
+            query_batch_kwargs=query_batch_kwargs
+        )
+
+    # ----------------------------------------------------------------------
+    # 저장소 (메모리 LRU + SQLite)
+    # ----------------------------------------------------------------------
+
+    def _open_disk(self, path: str) -> None:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._disk.commit()
+        except sqlite3.Error as e:
+            logger.warning("임베딩 캐시 파일 열기 실패 (메모리 캐시만 사용): %s", e)
+            self._disk = None
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model_key}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        """메모리 → 디스크 순으로 조회 (디스크 적중 시 메모리로 승격)"""
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return vector
+
+        if self._disk is None:
+            return None
+
+        try:
+            with self._disk_lock:
+                row = self._disk.execute(
+                    "SELECT vector FROM query_embeddings WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug("임베딩 캐시 파일 조회 실패: %s", e)
+            return None
+        if row is None:
+            return None
+
+        vector = np.frombuffer(row[0], dtype=np.float32).tolist()
+        self._remember(key, vector)
+        with self._lock:
+            self.stats["disk_hits"] += 1
+        return vector
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def _store(self, key: str, vector: List[float]) -> None:
+        self._remember(key, vector)
+        if self._disk is None:
+            return
+        try:
+            with self._disk_lock:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                    (key, np.asarray(vector, dtype=np.float32).tobytes(), time.time())
+                )
+                self._disk.commit()
+        except sqlite3.Error as e:
+            logger.debug("임베딩 캐시 파일 저장 실패: %s", e)
+
+    # ----------------------------------------------------------------------
+    # single-flight
+    # ----------------------------------------------------------------------
+
+    def _claim(self, key: str) -> Tuple[Future, bool]:
+        """진행 중인 같은 요청이 있으면 그 Future를, 없으면 새 Future를 반환 (True: 직접 호출 담당)"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self.stats["misses"] += 1
+            return future, True
+
+    def _settle(self, key: str, future: Future, vector: Optional[List[float]] = None,
+                error: Optional[BaseException] = None) -> None:
+        if error is None:
+            self._store(key, vector)
+            future.set_result(vector)
+        else:
+            future.set_exception(error)
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _partition(self, texts: List[str]) -> Tuple[Dict[str, List[float]], Dict[str, Future], List[Tuple[str, str, Future]]]:
+        """
+        쿼리 목록을 (캐시 적중, 다른 요청 대기, 직접 호출) 세 그룹으로 분류
+
+        Returns:
+            (text → 벡터, text → 대기할 Future, [(text, key, 담당 Future)])
+        """
+        found: Dict[str, List[float]] = {}
+        waiting: Dict[str, Future] = {}
+        owned: List[Tuple[str, str, Future]] = []
+        for text in dict.fromkeys(texts):
+            key = self._key(text)
+            vector = self._lookup(key)
+            if vector is not None:
+                found[text] = vector
+                continue
+            future, owner = self._claim(key)
+            if owner:
+                owned.append((text, key, future))
+            else:
+                waiting[text] = future
+        return found, waiting, owned
+
+    # ----------------------------------------------------------------------
+    # Embeddings 인터페이스
+    # ----------------------------------------------------------------------
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """문서 임베딩 (캐시하지 않음)"""
+        return self.base.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.base.aembed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """쿼리 임베딩 (캐시 적용)"""
+        return self.embed_queries([text])[0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_queries([text]))[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 쿼리 임베딩 - 캐시에 없는 쿼리만 한 번의 호출로 묶어 전송"""
+        if not texts:
+            return []
+        found, waiting, owned = self._partition(texts)
+
+        if owned:
+            owned_texts = [text for text, _, _ in owned]
+            try:
+                if len(owned_texts) == 1:
+                    vectors = [self.base.embed_query(owned_texts[0])]
+                else:
+                    vectors = self.base.embed_documents(owned_texts, **self.query_batch_kwargs)
+            except BaseException as e:
+                for _, key, future in owned:
+                    self._settle(key, future, error=e)
+                raise
+            for (text, key, future), vector in zip(owned, vectors):
+                self._settle(key, future, vector)
+                found[text] = vector
+
+        for text, future in waiting.items():
+            found[text] = future.result()
+        return [found[text] for text in texts]
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        """embed_queries의 비동기 버전"""
+        if not texts:
+            return []
+        found, waiting, owned = self._partition(texts)
+
+        if owned:
+            owned_texts = [text for text, _, _ in owned]
+            try:
+                if len(owned_texts) == 1:
+                    vectors = [await self.base.aembed_query(owned_texts[0])]
+                else:
+                    vectors = await self.base.aembed_documents(owned_texts, **self.query_batch_kwargs)
+            except BaseException as e:
+                for _, key, future in owned:
+                    self._settle(key, future, error=e)
+                raise
+            for (text, key, future), vector in zip(owned, vectors):
+                self._settle(key, future, vector)
+                found[text] = vector
+
+        for text, future in waiting.items():
+            found[text] = await asyncio.wrap_future(future)
+        return [found[text] for text in texts]
+
+    # ----------------------------------------------------------------------
+    # 통계
+    # ----------------------------------------------------------------------
+
+    def clear(self) -> None:
+        """메모리 캐시 및 통계 초기화 (디스크 캐시는 유지)"""
+        with self._lock:
+            self._memory.clear()
+            self.stats = {"memory_hits": 0, "disk_hits": 0, "coalesced": 0, "misses": 0}
+
+    def get_stats(self) -> Dict:
+        """적중률 통계 반환 (coalesced: 진행 중인 같은 요청을 기다려 호출을 생략한 횟수)"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_size"] = len(self._memory)
+        served = stats["memory_hits"] + stats["disk_hits"] + stats["coalesced"]
+        total = served + stats["misses"]
+        stats["hit_rate"] = served / total if total else 0.0
+        return stats
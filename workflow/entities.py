@@ -0,0 +1,174 @@
+"""
+아티팩트 엔티티 키 추출 (교차 아티팩트 상관 분석용)
+- 파일명(basename), 전체 경로, 드라이브 문자, 장치 시리얼, 도메인을 정규화된 키로 추출
+- 키 형식: "<종류>:<정규화된 값>" (예: "file:strategy2025.docx", "drive:e", "serial:S5XXNJ0R123456")
+- 같은 파일이 lnk / prefetch / 다운로드 / 휴지통 / USB 기록에 서로 다른 경로로 남아도 file 키로 연결됨
+"""
+from typing import Dict, Iterable, List, Set
+import re
+
+ENTITY_KINDS = ("file", "path", "drive", "serial", "domain")
+
+# 값 안에 포함된 경로/URL
+_URL_PATTERN = re.compile(r"\b[a-zA-Z][\w+.-]*://[^\s\"'<>]+")
+# 경로: 폴더 구간은 공백 허용("Program Files"), 마지막 구간은 확장자에서 끝남("cmd.exe /c" → cmd.exe)
+_SEGMENT = r"[^\\/\r\n\t\"'<>|*?:]"
+_PATH_TAIL = (
+    rf"(?:{_SEGMENT}+\\)*"
+    rf"(?:{_SEGMENT}*?\.[A-Za-z0-9]{{1,8}}(?=$|[\s,;)\]}}])|[^\s\\/\"'<>|*?:]*)"
+)
+_WINDOWS_PATH_PATTERN = re.compile(rf"(?:\\\\\?\\)?\b[A-Za-z]:\\{_PATH_TAIL}")
+_UNC_PATH_PATTERN = re.compile(rf"\\\\[^\\\s\"'<>|*?]+\\{_PATH_TAIL}")
+_POSIX_PATH_PATTERN = re.compile(r"(?<![\w:])/(?:[^/\s\"'<>|*?]+/)+[^/\s\"'<>|*?]+")
+# 값 전체가 파일명인 경우 (확장자 필수)
+_FILE_NAME_PATTERN = re.compile(r"^[^\\/:*?\"<>|\r\n]{1,200}\.[A-Za-z0-9]{1,8}$")
+# USBSTOR 장치 인스턴스 ID의 시리얼 (예: USBSTOR\Disk&Ven_X&Prod_Y\S5XXNJ0R123456&0)
+_USBSTOR_SERIAL_PATTERN = re.compile(r"USBSTOR\\[^\\]+\\([^\\&\s]+)", re.IGNORECASE)
+_SERIAL_FIELD_PATTERN = re.compile(r"serial", re.IGNORECASE)
+
+
+# --------------------------------------------------------------------------
+# 정규화
+# --------------------------------------------------------------------------
+
+def normalize_path(path: str) -> str:
+    """경로 정규화 (소문자, 구분자 통일, \\\\?\\ 접두사/끝 구분자 제거)"""
+    path = path.strip().strip("\"'").replace("/", "\\")
+    if path.startswith("\\\\?\\"):
+        path = path[4:]
+    path = re.sub(r"(?<!^)\\{2,}", "\\\\", path)
+    return path.rstrip("\\ .").lower()
+
+
+def normalize_file_name(name: str) -> str:
+    """파일명 정규화 (소문자, 끝 공백/마침표 제거 - Windows 파일명 규칙과 동일)"""
+    return name.strip().strip("\"'").rstrip(" .").lower()
+
+
+def normalize_domain(host: str) -> str:
+    host = host.strip().lower().rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def normalize_serial(serial: str) -> str:
+    return serial.strip().upper()
+
+
+def _basename(path: str) -> str:
+    return re.split(r"[\\/]", path.rstrip("\\/"))[-1]
+
+
+# --------------------------------------------------------------------------
+# 추출
+# --------------------------------------------------------------------------
+
+def _path_entities(raw_path: str, keys: Set[str]) -> None:
+    path = normalize_path(raw_path)
+    if not path:
+        return
+    if re.match(r"^[a-z]:", path):
+        keys.add(f"drive:{path[0]}")
+    if len(path) <= 2:
+        return
+    keys.add(f"path:{path}")
+    name = normalize_file_name(_basename(path))
+    if name and "." in name and not re.match(r"^[a-z]:$", name):
+        keys.add(f"file:{name}")
+
+
+def _url_entities(url: str, keys: Set[str]) -> None:
+    match = re.match(r"^[a-zA-Z][\w+.-]*://(?:[^@/]*@)?([^/:?#\s]+)([^?#\s]*)", url)
+    if not match:
+        return
+    host, path = match.groups()
+    if host:
+        keys.add(f"domain:{normalize_domain(host)}")
+    # 다운로드 URL의 파일명 (확장자가 있는 경우만)
+    name = normalize_file_name(_basename(path)) if path else ""
+    if _FILE_NAME_PATTERN.match(name):
+        keys.add(f"file:{name}")
+
+
+def _value_entities(key: str, value: str, keys: Set[str]) -> None:
+    for url in _URL_PATTERN.findall(value):
+        _url_entities(url, keys)
+    text = _URL_PATTERN.sub(" ", value)
+
+    for pattern in (_WINDOWS_PATH_PATTERN, _UNC_PATH_PATTERN, _POSIX_PATH_PATTERN):
+        for raw_path in pattern.findall(text):
+            _path_entities(raw_path, keys)
+        text = pattern.sub(" ", text)
+
+    for serial in _USBSTOR_SERIAL_PATTERN.findall(value):
+        keys.add(f"serial:{normalize_serial(serial)}")
+    if _SERIAL_FIELD_PATTERN.search(key) and value.strip():
+        keys.add(f"serial:{normalize_serial(value)}")
+
+    stripped = value.strip()
+    if _FILE_NAME_PATTERN.match(stripped) and not _URL_PATTERN.match(stripped):
+        keys.add(f"file:{normalize_file_name(stripped)}")
+
+
+def _iter_values(data, prefix: str = "") -> Iterable:
+    """중첩 dict/list의 (필드명, 문자열 값) 순회"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from _iter_values(value, str(key))
+    elif isinstance(data, (list, tuple)):
+        for value in data:
+            yield from _iter_values(value, prefix)
+    elif data is not None and data != "":
+        yield prefix, str(data)
+
+
+def extract_entities(data: Dict) -> List[str]:
+    """아티팩트 data 필드에서 엔티티 키 추출 (정렬된 중복 없는 목록)"""
+    keys: Set[str] = set()
+    for key, value in _iter_values(data or {}):
+        _value_entities(key, value, keys)
+    return sorted(keys)
+
+
+def entity_query_keys(entity: str, kind: str = "auto") -> List[str]:
+    """
+    조회 입력을 엔티티 키 목록으로 변환
+
+    Args:
+        entity: 파일명, 경로, 드라이브("E:"), 시리얼, 도메인/URL 또는 "종류:값" 형식의 키
+        kind: auto | file | path | drive | serial | domain
+
+    auto에서 경로를 입력하면 파일명 키도 함께 사용합니다 (같은 파일의 다른 위치 기록까지 연결).
+    """
+    entity = (entity or "").strip()
+    if not entity:
+        return []
+
+    prefix, _, rest = entity.partition(":")
+    if prefix in ENTITY_KINDS and rest and not re.match(r"^[A-Za-z]$", prefix):
+        kind, entity = prefix, rest
+
+    if kind == "file":
+        return [f"file:{normalize_file_name(_basename(entity))}"]
+    if kind == "path":
+        return [f"path:{normalize_path(entity)}"]
+    if kind == "drive":
+        letter = entity.strip().rstrip(":\\/").lower()
+        return [f"drive:{letter}"]
+    if kind == "serial":
+        return [f"serial:{normalize_serial(entity)}"]
+    if kind == "domain":
+        keys: Set[str] = set()
+        _url_entities(entity if "://" in entity else f"http://{entity}", keys)
+        return sorted(key for key in keys if key.startswith("domain:"))
+
+    # auto: 입력 형태로 판단
+    if re.match(r"^[A-Za-z]:\\?$", entity):
+        return [f"drive:{entity[0].lower()}"]
+    if "://" in entity or "\\" in entity or "/" in entity:
+        keys = set()
+        _value_entities("", entity, keys)
+        return sorted(key for key in keys if not key.startswith("drive:"))
+    if "." in entity:
+        # 점이 있는 단일 값은 파일명 또는 도메인 (예: report.zip, drive.google.com)
+        return [f"domain:{normalize_domain(entity)}", f"file:{normalize_file_name(entity)}"]
+    return [f"serial:{normalize_serial(entity)}", f"file:{normalize_file_name(entity)}"]
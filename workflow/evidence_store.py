@@ -0,0 +1,276 @@
+"""
+실행(run) 단위 근거 저장소 - 도구 결과 원문을 대화 히스토리 밖에 보관
+- 도구 결과 원문은 저장소에, ToolMessage에는 요약 + 근거 핸들(ev_0001)만 남김
+  → state.messages / 최종 state / Generator.result_messages가 검색량에 비례해 커지지 않음
+- 에이전트 추론에는 최근 N턴의 도구 결과만 원문으로 펼침 (expand_recent_evidence)
+- 보고서 생성 / 결과 분류에는 에이전트가 인용한 핸들(또는 인용한 아티팩트 ID가 든 결과)만 원문 확장
+  (resolve_cited_evidence, 토큰 예산 안에서)
+- 메모리 예산을 넘으면 오래된 원문부터 SQLite 파일로 내보냄 (spill-to-disk)
+- 저장소는 그래프 실행(run_id) 단위 (search_session과 동일) - 실행 종료 시 삭제 (ToolContext.end_run)
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+from workflow.tool_digest import digest_tool_content, estimate_tokens, tool_content_ids
+from workflow.utils import env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MEMORY_CHARS = 2_000_000  # 메모리에 둘 원문 최대 글자 수 (초과 시 디스크로)
+DEFAULT_MIN_TOKENS = 300  # 이보다 작은 도구 결과는 그대로 메시지에 둠
+DEFAULT_RESOLVE_TOKENS = 60_000  # 보고서 생성 시 확장할 원문 토큰 예산
+DEFAULT_SPILL_DIR = "./evidence"
+
+EVIDENCE_KEY = "evidence_handle"  # ToolMessage.artifact에 핸들 기록
+HANDLE_PATTERN = re.compile(r"\bev_\d{4,}\b")
+
+
+@dataclass
+class _Evidence:
+    tool_name: str
+    chars: int
+    artifact_ids: Set[str] = field(default_factory=set)
+
+
+class EvidenceStore:
+    """도구 결과 원문 보관 (스레드 안전) - 하나의 에이전트 실행 동안 유지"""
+
+    def __init__(self, session_id: str, spill_dir: str = DEFAULT_SPILL_DIR, memory_chars: int = DEFAULT_MEMORY_CHARS):
+        self.session_id = session_id
+        self.spill_dir = spill_dir
+        self.memory_chars = memory_chars
+        self._records: "OrderedDict[str, _Evidence]" = OrderedDict()
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_used = 0
+        self._spilled = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, session_id: str) -> "EvidenceStore":
+        return cls(
+            session_id,
+            spill_dir=env_str("EVIDENCE_SPILL_DIR", DEFAULT_SPILL_DIR),
+            memory_chars=env_int("EVIDENCE_MEMORY_CHARS", DEFAULT_MEMORY_CHARS)
+        )
+
+    @property
+    def spill_path(self) -> str:
+        safe_id = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in self.session_id)
+        return os.path.join(self.spill_dir, f"{safe_id}.sqlite")
+
+    def _spill_locked(self) -> None:
+        """메모리 예산을 넘는 동안 가장 오래된 원문을 디스크로 이동"""
+        while self._memory_used > self.memory_chars and len(self._memory) > 1:
+            handle, content = self._memory.popitem(last=False)
+            if self._conn is None:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                self._conn = sqlite3.connect(self.spill_path, check_same_thread=False)
+                self._conn.execute("CREATE TABLE IF NOT EXISTS evidence (handle TEXT PRIMARY KEY, content TEXT NOT NULL)")
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO evidence VALUES (?, ?)", (handle, content))
+            self._memory_used -= len(content)
+            self._spilled += 1
+
+    def put(self, content: str, tool_name: str, artifact_ids: Iterable[str] = ()) -> str:
+        """원문 저장 후 핸들 반환"""
+        with self._lock:
+            handle = f"ev_{len(self._records) + 1:04d}"
+            self._records[handle] = _Evidence(tool_name, len(content), set(artifact_ids))
+            self._memory[handle] = content
+            self._memory_used += len(content)
+            self._spill_locked()
+        return handle
+
+    def get(self, handle: str) -> Optional[str]:
+        with self._lock:
+            content = self._memory.get(handle)
+            if content is not None or self._conn is None:
+                return content
+            row = self._conn.execute("SELECT content FROM evidence WHERE handle = ?", (handle,)).fetchone()
+            return row[0] if row else None
+
+    def handles(self) -> List[str]:
+        """저장 순서대로 핸들 목록"""
+        with self._lock:
+            return list(self._records)
+
+    def handles_for_ids(self, artifact_ids: Iterable[str]) -> List[str]:
+        """아티팩트 ID가 들어 있는 결과의 핸들 목록 (저장 순서)"""
+        wanted = set(artifact_ids)
+        with self._lock:
+            return [handle for handle, record in self._records.items() if record.artifact_ids & wanted]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "count": len(self._records),
+                "total_chars": sum(record.chars for record in self._records.values()),
+                "memory_chars": self._memory_used,
+                "spilled": self._spilled,
+            }
+
+    def close(self) -> None:
+        """디스크로 내보낸 원문 파일까지 삭제"""
+        with self._lock:
+            self._records.clear()
+            self._memory.clear()
+            self._memory_used = 0
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                try:
+                    os.remove(self.spill_path)
+                except OSError as e:
+                    logger.warning("근거 저장소 파일 삭제 실패: %s", e)
+
+
+# --------------------------------------------------------------------------
+# 저장소 레지스트리 (실행 단위)
+# --------------------------------------------------------------------------
+
+_stores: Dict[str, EvidenceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_evidence_store(session_id: str) -> EvidenceStore:
+    """저장소 반환 (없으면 생성)"""
+    with _stores_lock:
+        store = _stores.get(session_id)
+        if store is None:
+            store = EvidenceStore.from_env(session_id)
+            _stores[session_id] = store
+        return store
+
+
+def drop_evidence_store(session_id: str) -> None:
+    """저장소 삭제 (실행 종료 시 호출)"""
+    with _stores_lock:
+        store = _stores.pop(session_id, None)
+    if store is not None:
+        logger.info("근거 저장소 삭제: %s (%s)", session_id, store.get_stats())
+        store.close()
+
+
+# --------------------------------------------------------------------------
+# 메시지 변환
+# --------------------------------------------------------------------------
+
+def evidence_handle(message: BaseMessage) -> Optional[str]:
+    """요약으로 바뀐 ToolMessage의 근거 핸들 (원문 그대로인 메시지는 None)"""
+    artifact = getattr(message, "artifact", None)
+    return artifact.get(EVIDENCE_KEY) if isinstance(artifact, dict) else None
+
+
+def store_tool_messages(messages: List[Any], store: EvidenceStore) -> List[Any]:
+    """도구 결과 원문을 저장소로 옮기고 요약 + 핸들만 담은 ToolMessage로 교체"""
+    min_tokens = env_int("EVIDENCE_MIN_TOKENS", DEFAULT_MIN_TOKENS)
+    stored = []
+    for message in messages:
+        content = getattr(message, "content", None)
+        if (
+            not isinstance(message, ToolMessage)
+            or not isinstance(content, str)
+            or message.status == "error"
+            or evidence_handle(message)
+            or estimate_tokens(content) < min_tokens
+        ):
+            stored.append(message)
+            continue
+        handle = store.put(content, message.name or "tool", tool_content_ids(content))
+        header = f"📎 [{handle}] 도구 결과 요약 — 원문 {len(content):,}자는 근거 저장소 보관 (보고서 근거로 쓸 결과는 핸들을 인용)"
+        stored.append(message.model_copy(update={
+            "content": digest_tool_content(content, header=header),
+            "artifact": {EVIDENCE_KEY: handle}
+        }))
+    return stored
+
+
+def expand_recent_evidence(messages: List[BaseMessage], store: EvidenceStore, keep_turns: int) -> List[BaseMessage]:
+    """최근 keep_turns개 에이전트 턴의 도구 결과를 원문으로 펼침 (LLM 입력용, state는 그대로)"""
+    ai_positions = [i for i, message in enumerate(messages) if isinstance(message, AIMessage)]
+    if keep_turns <= 0 or not ai_positions:
+        return list(messages)
+    boundary = ai_positions[-keep_turns] if len(ai_positions) >= keep_turns else ai_positions[0]
+
+    expanded = []
+    for i, message in enumerate(messages):
+        handle = evidence_handle(message) if i >= boundary else None
+        content = store.get(handle) if handle else None
+        if content is None:
+            expanded.append(message)
+        else:
+            expanded.append(message.model_copy(update={"content": f"📎 [{handle}]\n{content}"}))
+    return expanded
+
+
+def _cited(messages: List[BaseMessage]) -> Tuple[List[str], List[str]]:
+    """에이전트 메시지(추론 텍스트, 도구 호출 인자)에서 인용한 핸들 / 아티팩트 ID 수집"""
+    from workflow.tools import FINISH_TOOL_NAME
+
+    handles: List[str] = []
+    artifact_ids: List[str] = []
+    for message in messages:
+        if not isinstance(message, AIMessage):
+            continue
+        text = message.content if isinstance(message.content, str) else json.dumps(message.content, ensure_ascii=False, default=str)
+        handles.extend(HANDLE_PATTERN.findall(text))
+        for tool_call in message.tool_calls:
+            args = tool_call.get("args") or {}
+            handles.extend(HANDLE_PATTERN.findall(json.dumps(args, ensure_ascii=False, default=str)))
+            if tool_call.get("name") == FINISH_TOOL_NAME:
+                artifact_ids.extend(str(artifact_id) for artifact_id in args.get("evidence_artifact_ids") or [])
+    return list(dict.fromkeys(handles)), list(dict.fromkeys(artifact_ids))
+
+
+def resolve_cited_evidence(messages: List[BaseMessage], store: EvidenceStore, budget_tokens: Optional[int] = None) -> str:
+    """
+    인용된 근거만 원문으로 확장한 텍스트 (없으면 빈 문자열)
+
+    인용한 핸들 + 인용한 아티팩트 ID가 든 결과를 저장 순서대로 예산 안에서 포함합니다.
+    아무것도 인용하지 않았으면 최근 결과부터 예산만큼 포함합니다.
+    """
+    budget = budget_tokens if budget_tokens is not None else env_int("EVIDENCE_RESOLVE_TOKENS", DEFAULT_RESOLVE_TOKENS)
+    all_handles = store.handles()
+    if not all_handles:
+        return ""
+
+    cited_handles, cited_ids = _cited(messages)
+    wanted = set(cited_handles) | set(store.handles_for_ids(cited_ids))
+    if wanted:
+        ordered = [handle for handle in all_handles if handle in wanted]
+    else:
+        ordered = list(reversed(all_handles))
+
+    sections: List[str] = []
+    skipped: List[str] = []
+    used = 0
+    for handle in ordered:
+        content = store.get(handle)
+        if content is None:
+            continue
+        tokens = estimate_tokens(content)
+        if used + tokens > budget:
+            skipped.append(handle)
+            continue
+        sections.append(f"### [{handle}]\n{content}")
+        used += tokens
+    if not wanted:
+        sections.reverse()
+    if skipped:
+        sections.append(f"(토큰 예산 초과로 원문 생략: {', '.join(skipped)} — 히스토리의 요약 참고)")
+    logger.info(
+        "근거 확장: %d개 (%s, %d 토큰, 생략 %d개)",
+        len(sections) - bool(skipped), "인용" if wanted else "최근 결과", used, len(skipped)
+    )
+    return "\n\n".join(sections)
@@ -3,7 +3,8 @@ from workflow.prompts import FILTER_PROMPT
 from workflow.utils import chunk_artifacts, llm_small
 from langchain_core.prompts import ChatPromptTemplate
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 from typing import List, cast
 import json
 import time
@@ -102,7 +103,8 @@ def recursive_filter_node(state: AgentState):
         
         batch_results = []
         
-        with ThreadPoolExecutor(max_workers=max_workers_per_batch) as executor:
+        # 컨텍스트 복사: 노드 정보/토큰 장부 콜백이 작업 스레드의 LLM 호출에도 전달되도록
+        with ContextThreadPoolExecutor(max_workers=max_workers_per_batch) as executor:
             future_to_idx = {}
             for offset, chunk in enumerate(batch_chunks):
                 chunk_idx = start_idx + offset
@@ -0,0 +1,414 @@
+"""
+LLM 응답 캐시 (temperature=0 모델의 재시도/재실행/노트북 실험 호출 재사용)
+- LangChain BaseCache 구현 → 채팅 모델의 cache 필드로 연결 (with_structured_output / bind_tools 그대로 동작)
+- 키: 모델 설정 + 호출 인자(도구 스키마, 구조화 출력 스키마 포함) + 정규화된 메시지
+  (메시지 id, 응답 메타데이터/토큰 사용량 제거, 도구 호출 id는 등장 순서 번호로 치환)
+- 저장소: SQLite (LLM_CACHE_PATH가 없으면 메모리 DB), TTL + 최대 항목 수 초과 시 오래 안 쓴 항목부터 삭제
+- 동시에 들어온 같은 요청은 하나의 호출로 묶음 (single-flight, 호출이 실패하면 게이트웨이가 바로 해제)
+- 모델 등급(small / medium / large)별로 선택 적용: LLM_CACHE_TIERS=small,medium
+"""
+from typing import Any, Dict, Optional, Sequence, Tuple
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import warnings
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, Generation
+
+from workflow.utils import env_float, env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+
+LLM_TIERS = ("small", "medium", "large")
+
+DEFAULT_MAX_ENTRIES = 5000  # 등급별 최대 항목 수
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # 0이면 만료 없음
+DEFAULT_INFLIGHT_TIMEOUT = 300.0  # 같은 요청의 진행 중인 호출을 기다리는 최대 시간 (초)
+EVICTION_INTERVAL = 64  # 저장 N회마다 크기 제한 검사
+
+_VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+_CACHED_OBJECTS = [Generation, ChatGeneration, ChatGenerationChunk, AIMessage, AIMessageChunk]
+
+
+# --------------------------------------------------------------------------
+# 키 생성
+# --------------------------------------------------------------------------
+
+def _normalize_message(node: Dict, call_ids: Dict[str, str]) -> None:
+    kwargs = node.get("kwargs")
+    if not isinstance(kwargs, dict):
+        return
+    for field in _VOLATILE_MESSAGE_FIELDS:
+        kwargs.pop(field, None)
+    # 도구 호출 id는 호출마다 새로 생성되므로 등장 순서 번호로 치환 (AIMessage ↔ ToolMessage 짝은 유지)
+    for call in kwargs.get("tool_calls") or []:
+        if isinstance(call, dict) and call.get("id"):
+            call["id"] = call_ids.setdefault(call["id"], f"call_{len(call_ids)}")
+    if kwargs.get("tool_call_id"):
+        kwargs["tool_call_id"] = call_ids.setdefault(kwargs["tool_call_id"], f"call_{len(call_ids)}")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """LangChain이 직렬화한 메시지 목록에서 호출마다 달라지는 값 제거"""
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+    call_ids: Dict[str, str] = {}
+    for node in messages:
+        if isinstance(node, dict):
+            _normalize_message(node, call_ids)
+    return json.dumps(messages, ensure_ascii=False, sort_keys=True)
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    raw = f"{llm_string}\0{normalize_prompt(prompt)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _owner_token() -> Tuple[int, Optional[int]]:
+    """호출 주체 식별 (스레드 + asyncio 태스크) - 같은 주체의 재시도는 자기 자신을 기다리지 않음"""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return threading.get_ident(), id(task) if task is not None else None
+
+
+class _InFlight:
+    __slots__ = ("owner", "future")
+
+    def __init__(self, owner: Tuple[int, Optional[int]]):
+        self.owner = owner
+        self.future: Future = Future()
+
+
+# --------------------------------------------------------------------------
+# 캐시
+# --------------------------------------------------------------------------
+
+class LLMResponseCache(BaseCache):
+    """SQLite 기반 LLM 응답 캐시 (스레드 안전, 등급별 인스턴스)"""
+
+    def __init__(
+        self,
+        tier: str,
+        path: Optional[str] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        inflight_timeout: float = DEFAULT_INFLIGHT_TIMEOUT
+    ):
+        """
+        Args:
+            tier: 모델 등급 (small / medium / large) - 통계와 크기 제한 단위
+            path: SQLite 파일 경로 (None이면 메모리 DB, 프로세스 종료 시 사라짐)
+            max_entries: 등급별 최대 항목 수 (초과 시 마지막 사용 시각이 오래된 것부터 삭제)
+            ttl_seconds: 항목 유효 시간 (0이면 만료 없음)
+            inflight_timeout: 같은 요청을 먼저 보낸 호출이 끝나기를 기다리는 최대 시간
+        """
+        self.tier = tier
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.inflight_timeout = inflight_timeout
+
+        self._inflight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self.stats = {"hits": 0, "coalesced": 0, "misses": 0, "expired": 0, "evicted": 0}
+        self._db = self._open(path)
+        with self._db_lock:
+            self._evict()
+
+    @classmethod
+    def from_env(cls, tier: str) -> "LLMResponseCache":
+        return cls(
+            tier,
+            path=env_str("LLM_CACHE_PATH"),
+            max_entries=env_int("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+            ttl_seconds=env_float("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS),
+            inflight_timeout=env_float("LLM_CACHE_INFLIGHT_TIMEOUT", DEFAULT_INFLIGHT_TIMEOUT)
+        )
+
+    # ----------------------------------------------------------------------
+    # 저장소
+    # ----------------------------------------------------------------------
+
+    def _open(self, path: Optional[str]) -> sqlite3.Connection:
+        target = ":memory:"
+        if path:
+            directory = os.path.dirname(path)
+            try:
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                target = path
+            except OSError as e:
+                logger.warning("LLM 캐시 디렉토리 생성 실패 (메모리 DB 사용): %s", e)
+        try:
+            db = sqlite3.connect(target, check_same_thread=False, timeout=30)
+        except sqlite3.Error as e:
+            logger.warning("LLM 캐시 파일 열기 실패 (메모리 DB 사용): %s", e)
+            db = sqlite3.connect(":memory:", check_same_thread=False)
+        if target != ":memory:":
+            db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, tier TEXT NOT NULL, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS llm_responses_lru ON llm_responses (tier, accessed_at)")
+        db.commit()
+        return db
+
+    def _read(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        now = time.time()
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if self.ttl_seconds > 0 and now - row[1] > self.ttl_seconds:
+                    self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    with self._lock:
+                        self.stats["expired"] += 1
+                    return None
+                self._db.execute("UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.debug("LLM 캐시 조회 실패: %s", e)
+            return None
+
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                return loads(row[0], allowed_objects=_CACHED_OBJECTS)
+        except Exception as e:
+            logger.debug("LLM 캐시 항목 복원 실패 (무시): %s", e)
+            return None
+
+    def _write(self, key: str, return_val: RETURN_VAL_TYPE) -> None:
+        now = time.time()
+        try:
+            value = dumps(list(return_val))
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, tier, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, self.tier, value, now, now)
+                )
+                self._db.commit()
+                self._writes += 1
+                if self._writes % EVICTION_INTERVAL == 0:
+                    self._evict()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.debug("LLM 캐시 저장 실패: %s", e)
+
+    def _evict(self) -> None:
+        """만료 항목 + 최대 항목 수 초과분 삭제 (_db_lock 보유 상태에서 호출)"""
+        deleted = 0
+        if self.ttl_seconds > 0:
+            deleted += self._db.execute(
+                "DELETE FROM llm_responses WHERE tier = ? AND created_at < ?",
+                (self.tier, time.time() - self.ttl_seconds)
+            ).rowcount
+        if self.max_entries > 0:
+            deleted += self._db.execute(
+                "DELETE FROM llm_responses WHERE tier = ? AND key NOT IN ("
+                "SELECT key FROM llm_responses WHERE tier = ? ORDER BY accessed_at DESC LIMIT ?)",
+                (self.tier, self.tier, self.max_entries)
+            ).rowcount
+        self._db.commit()
+        if deleted:
+            with self._lock:
+                self.stats["evicted"] += deleted
+            logger.info("LLM 캐시 정리 (%s): %d개 삭제", self.tier, deleted)
+
+    # ----------------------------------------------------------------------
+    # single-flight
+    # ----------------------------------------------------------------------
+
+    def _claim(self, key: str) -> Optional[Future]:
+        """진행 중인 같은 요청이 있으면 그 Future를, 없으면 직접 호출 담당으로 등록하고 None 반환"""
+        owner = _owner_token()
+        with self._lock:
+            entry = self._inflight.get(key)
+            if entry is not None and entry.owner != owner:
+                self.stats["coalesced"] += 1
+                return entry.future
+            # 같은 주체의 재시도이거나 첫 요청
+            if entry is None:
+                self._inflight[key] = _InFlight(owner)
+            self.stats["misses"] += 1
+            return None
+
+    def _release(self, key: str) -> None:
+        with self._lock:
+            entry = self._inflight.pop(key, None)
+        if entry is not None and not entry.future.done():
+            entry.future.set_result(True)
+
+    def release_owned(self) -> None:
+        """
+        현재 호출 주체가 담당한 진행 중 요청 해제 (모델 호출이 끝나면 성공 여부와 관계없이 호출)
+
+        호출이 실패하면 update가 불리지 않으므로, 해제하지 않으면 같은 요청을 기다리던
+        호출이 inflight_timeout까지 대기합니다. 해제된 대기 호출은 저장된 응답이 없으면 직접 호출합니다.
+        """
+        owner = _owner_token()
+        with self._lock:
+            owned = [key for key, entry in self._inflight.items() if entry.owner == owner]
+            entries = [self._inflight.pop(key) for key in owned]
+        for entry in entries:
+            if not entry.future.done():
+                entry.future.set_result(True)
+
+    def _after_wait(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        """기다린 호출이 끝난 뒤 저장된 응답을 다시 읽음 (응답 객체를 호출 간에 공유하지 않음)"""
+        value = self._read(key)
+        if value is None:
+            with self._lock:
+                self.stats["coalesced"] -= 1
+                self.stats["misses"] += 1
+        return value
+
+    def _timed_out(self, key: str) -> None:
+        # 먼저 보낸 호출이 실패했거나 너무 오래 걸림 → 직접 호출 (결과는 update에서 저장)
+        logger.warning("LLM 캐시: 진행 중인 같은 요청 대기 시간 초과 (%s) - 직접 호출", self.tier)
+        with self._lock:
+            self.stats["coalesced"] -= 1
+            self.stats["misses"] += 1
+
+    # ----------------------------------------------------------------------
+    # BaseCache 인터페이스
+    # ----------------------------------------------------------------------
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = cache_key(prompt, llm_string)
+        value = self._read(key)
+        if value is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+            return value
+
+        future = self._claim(key)
+        if future is None:
+            return None
+        try:
+            future.result(timeout=self.inflight_timeout)
+        except FutureTimeoutError:
+            self._timed_out(key)
+            return None
+        return self._after_wait(key)
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = cache_key(prompt, llm_string)
+        value = self._read(key)
+        if value is not None:
+            with self._lock:
+                self.stats["hits"] += 1
+            return value
+
+        future = self._claim(key)
+        if future is None:
+            return None
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.inflight_timeout)
+        except asyncio.TimeoutError:
+            self._timed_out(key)
+            return None
+        return self._after_wait(key)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = cache_key(prompt, llm_string)
+        self._write(key, return_val)
+        self._release(key)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        """이 등급의 저장 항목 및 통계 초기화"""
+        with self._db_lock:
+            self._db.execute("DELETE FROM llm_responses WHERE tier = ?", (self.tier,))
+            self._db.commit()
+        with self._lock:
+            self.stats = {"hits": 0, "coalesced": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+    # ----------------------------------------------------------------------
+    # 통계
+    # ----------------------------------------------------------------------
+
+    def size(self) -> int:
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM llm_responses WHERE tier = ?", (self.tier,)
+            ).fetchone()[0]
+
+    def get_stats(self) -> Dict:
+        """적중률 통계 반환 (coalesced: 진행 중인 같은 요청을 기다려 호출을 생략한 횟수)"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats["size"] = self.size()
+        served = stats["hits"] + stats["coalesced"]
+        total = served + stats["misses"]
+        stats["hit_rate"] = served / total if total else 0.0
+        return stats
+
+
+# --------------------------------------------------------------------------
+# 등급별 캐시 (선택 적용)
+# --------------------------------------------------------------------------
+
+_tier_caches: Dict[str, LLMResponseCache] = {}
+_tier_lock = threading.Lock()
+
+
+def enabled_tiers() -> Sequence[str]:
+    """LLM_CACHE_TIERS 환경 변수 (쉼표 구분, all이면 전체, 기본 비활성화)"""
+    raw = env_str("LLM_CACHE_TIERS", "").strip().lower()
+    if raw in ("all", "*"):
+        return LLM_TIERS
+    return tuple(tier.strip() for tier in raw.split(",") if tier.strip() in LLM_TIERS)
+
+
+def get_llm_cache(tier: str) -> Optional[LLMResponseCache]:
+    """
+    모델 등급의 응답 캐시 반환 (해당 등급이 활성화되지 않았으면 None)
+
+    None을 채팅 모델의 cache로 넘기면 LangChain 전역 캐시(미설정 시 캐시 없음)가 사용됩니다.
+    """
+    if tier not in enabled_tiers():
+        return None
+
+    cache = _tier_caches.get(tier)
+    if cache is not None:
+        return cache
+
+    with _tier_lock:
+        if tier not in _tier_caches:
+            _tier_caches[tier] = LLMResponseCache.from_env(tier)
+            logger.info("LLM 응답 캐시 활성화: %s", tier)
+        return _tier_caches[tier]
+
+
+def get_llm_cache_stats() -> Dict[str, Dict]:
+    """활성화된 등급별 캐시 통계"""
+    with _tier_lock:
+        caches = dict(_tier_caches)
+    return {tier: cache.get_stats() for tier, cache in caches.items()}
@@ -0,0 +1,101 @@
+"""
+채팅 모델 / 외부 도구 생성 (LLM_MODE에 따라 실제 호출, 기록, 재생 선택)
+- live: 실제 모델 (등급별 LLM 응답 캐시 선택 적용)
+- record: 실제 모델 + 입출력 기록 (workflow/replay.py)
+- replay: 같은 모델 클래스에 기록 재생 캐시 연결 → 네트워크 호출 없이 운영과 같은 파싱 경로 사용
+- 모든 모델은 LLM 게이트웨이(workflow/llm_gateway.py)를 거쳐 호출 (등급별 우선순위 대기열 / 속도 제한)
+"""
+from typing import Dict
+import logging
+import os
+import threading
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+from workflow.llm_cache import get_llm_cache
+from workflow.llm_gateway import GatewayChatModel
+from workflow.replay import (
+    RecordingCache,
+    ReplayCache,
+    get_fixture_store,
+    get_llm_mode,
+    get_replay_latency,
+    recording_tool_func,
+    replay_tool_func
+)
+
+logger = logging.getLogger(__name__)
+
+
+MODEL_NAMES = {
+    "small": "gemini-2.5-flash-lite",
+    "medium": "gemini-2.5-flash",
+    "large": "gemini-2.5-pro",
+}
+
+WEB_SEARCH_TOOL_NAME = "web_search_tool"
+WEB_SEARCH_DESCRIPTION = """
+웹에서 최신 정보를 검색합니다. 보안 위협, 공격 기법, CVE 정보 등
+외부 정보가 필요할 때 사용하세요.
+"""
+
+
+_models: Dict[str, GatewayChatModel] = {}
+_model_lock = threading.Lock()
+
+
+def get_chat_model(tier: str) -> GatewayChatModel:
+    """등급별 공유 채팅 모델 (프로세스 전체에서 한 인스턴스 → API 클라이언트 / 연결 재사용)"""
+    if tier not in _models:
+        with _model_lock:
+            if tier not in _models:
+                _models[tier] = create_chat_model(tier)
+    return _models[tier]
+
+
+def create_chat_model(tier: str) -> GatewayChatModel:
+    """모델 등급(small / medium / large)의 채팅 모델 새로 생성 (temperature=0, 보통은 get_chat_model 사용)"""
+    if tier not in MODEL_NAMES:
+        raise ValueError(f"Unknown model tier: {tier} ({', '.join(MODEL_NAMES)} 지원)")
+
+    mode = get_llm_mode()
+    if mode == "record":
+        cache = RecordingCache(get_fixture_store(), tier)
+    elif mode == "replay":
+        cache = ReplayCache(get_fixture_store(), tier, get_replay_latency())
+    else:
+        cache = get_llm_cache(tier)
+
+    kwargs = {}
+    if mode == "replay" and not (os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")):
+        # 재생 시에는 요청을 보내지 않지만 모델 생성에 키가 필요
+        kwargs["google_api_key"] = "replay"
+
+    return GatewayChatModel(tier=tier, model=MODEL_NAMES[tier], temperature=0, cache=cache, **kwargs)
+
+
+def create_web_search_tool() -> BaseTool:
+    """웹 검색 도구 (Tavily, 비동기 호출 시 ainvoke로 동시 실행)"""
+    mode = get_llm_mode()
+    if mode == "replay":
+        from langchain_tavily.tavily_search import TavilySearchInput
+        return StructuredTool.from_function(
+            func=replay_tool_func(WEB_SEARCH_TOOL_NAME, get_fixture_store(), get_replay_latency()),
+            name=WEB_SEARCH_TOOL_NAME,
+            description=WEB_SEARCH_DESCRIPTION,
+            args_schema=TavilySearchInput
+        )
+
+    from langchain_tavily import TavilySearch
+    tool = TavilySearch(max_results=3)
+    tool.name = WEB_SEARCH_TOOL_NAME
+    tool.description = WEB_SEARCH_DESCRIPTION
+    if mode == "live":
+        return tool
+
+    return StructuredTool.from_function(
+        func=recording_tool_func(WEB_SEARCH_TOOL_NAME, tool.invoke, get_fixture_store()),
+        name=WEB_SEARCH_TOOL_NAME,
+        description=WEB_SEARCH_DESCRIPTION,
+        args_schema=tool.args_schema
+    )
@@ -0,0 +1,312 @@
+"""
+LLM 게이트웨이 - 모든 채팅 모델 호출이 거치는 등급별 관문
+- 등급(small / medium / large)마다 동시 호출 수 제한 + 우선순위 대기열
+  interactive(에이전트 루프) > report(시나리오 / 보고서 섹션) > bulk(필터링)
+  → 자리가 나면 항상 우선순위가 높은 대기 호출부터 실행 (같은 우선순위는 도착 순)
+- 등급별 요청 속도 제한(LLM_RPM_*)도 자리를 얻은 호출만 소비 → 대량 작업이 할당량을 선점하지 못함
+- 캐시 적중은 대기열을 거치지 않음 (BaseChatModel이 캐시 조회 후 _generate 호출)
+- 우선순위: 호출 metadata의 llm_priority > LangGraph 노드 기본값(NODE_PRIORITIES) > report
+"""
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from langchain_core.rate_limiters import BaseRateLimiter, InMemoryRateLimiter
+from langchain_google_genai import ChatGoogleGenerativeAI
+from pydantic import PrivateAttr
+
+from workflow.llm_cache import LLMResponseCache
+from workflow.utils import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+
+PRIORITIES = {"interactive": 0, "report": 1, "bulk": 2}
+DEFAULT_PRIORITY = "report"
+
+# 그래프 노드별 기본 우선순위 (그래프 밖 호출 - 보고서 섹션 생성 등 - 은 DEFAULT_PRIORITY)
+NODE_PRIORITIES = {
+    "analyze_requirements": "interactive",
+    "agent_reasoner": "interactive",
+    "execute_tools": "interactive",
+    "generate_scenario": "report",
+    "classify_results": "report",
+    "filter_artifacts": "bulk",
+}
+
+DEFAULT_MAX_CONCURRENCY = 8  # 등급별 동시 호출 수
+DEFAULT_RATE_BURST = 1
+SLOW_WAIT_SECONDS = 5.0  # 대기 시간이 이보다 길면 경고 로그
+
+
+def resolve_priority(metadata: Optional[Dict[str, Any]]) -> str:
+    """호출 metadata로 우선순위 결정"""
+    metadata = metadata or {}
+    priority = metadata.get("llm_priority") or NODE_PRIORITIES.get(metadata.get("langgraph_node") or "")
+    return priority if priority in PRIORITIES else DEFAULT_PRIORITY
+
+
+# --------------------------------------------------------------------------
+# 우선순위 대기열
+# --------------------------------------------------------------------------
+
+@dataclass(order=True)
+class _Waiter:
+    rank: int
+    seq: int
+    wake: Any = field(compare=False)
+    granted: bool = field(default=False, compare=False)
+
+
+@dataclass
+class _PriorityStats:
+    calls: int = 0
+    queued: int = 0  # 자리가 없어 대기한 호출 수
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    errors: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "queued": self.queued,
+            "errors": self.errors,
+            "wait_total": round(self.wait_total, 3),
+            "wait_avg": round(self.wait_total / self.calls, 3) if self.calls else 0.0,
+            "wait_max": round(self.wait_max, 3),
+        }
+
+
+class TierGateway:
+    """한 모델 등급의 동시 호출 제한 (스레드 / asyncio 호출 공용, 스레드 안전)"""
+
+    def __init__(self, tier: str, max_concurrency: int, rate_limiter: Optional[BaseRateLimiter] = None):
+        self.tier = tier
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = rate_limiter
+        self._lock = threading.Lock()
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._active = 0
+        self._max_queue_depth = 0
+        self._stats = {name: _PriorityStats() for name in PRIORITIES}
+
+    # -- 자리 할당 --
+
+    def _try_enter_locked(self) -> bool:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return True
+        return False
+
+    def _enqueue_locked(self, priority: str, wake: Any) -> _Waiter:
+        waiter = _Waiter(PRIORITIES[priority], next(self._seq), wake)
+        heapq.heappush(self._waiters, waiter)
+        self._max_queue_depth = max(self._max_queue_depth, len(self._waiters))
+        return waiter
+
+    def _release(self) -> None:
+        with self._lock:
+            self._active -= 1
+            while self._waiters and self._active < self.max_concurrency:
+                waiter = heapq.heappop(self._waiters)
+                waiter.granted = True
+                self._active += 1
+                waiter.wake()
+
+    def _acquire(self, priority: str) -> bool:
+        """자리를 얻을 때까지 대기 (대기했으면 True)"""
+        with self._lock:
+            if self._try_enter_locked():
+                return False
+            event = threading.Event()
+            self._enqueue_locked(priority, event.set)
+        event.wait()
+        return True
+
+    async def _aacquire(self, priority: str) -> bool:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        with self._lock:
+            if self._try_enter_locked():
+                return False
+            waiter = self._enqueue_locked(priority, wake)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+            if granted:
+                self._release()
+            raise
+        return True
+
+    def _record(self, priority: str, queued: bool, wait: float, error: bool = False) -> None:
+        if wait > SLOW_WAIT_SECONDS:
+            logger.warning("LLM 게이트웨이 대기 %.1f초 (%s, %s)", wait, self.tier, priority)
+        with self._lock:
+            stats = self._stats[priority]
+            stats.calls += 1
+            stats.queued += int(queued)
+            stats.errors += int(error)
+            stats.wait_total += wait
+            stats.wait_max = max(stats.wait_max, wait)
+
+    @contextmanager
+    def slot(self, priority: str) -> Iterator[None]:
+        """우선순위에 따라 자리를 얻은 뒤 블록 실행 (속도 제한 포함)"""
+        started = time.perf_counter()
+        queued = self._acquire(priority)
+        try:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(blocking=True)
+            wait = time.perf_counter() - started
+            try:
+                yield
+            except BaseException:
+                self._record(priority, queued, wait, error=True)
+                raise
+            self._record(priority, queued, wait)
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self, priority: str) -> AsyncIterator[None]:
+        started = time.perf_counter()
+        queued = await self._aacquire(priority)
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire(blocking=True)
+            wait = time.perf_counter() - started
+            try:
+                yield
+            except BaseException:
+                self._record(priority, queued, wait, error=True)
+                raise
+            self._record(priority, queued, wait)
+        finally:
+            self._release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._active,
+                "queue_depth": len(self._waiters),
+                "max_queue_depth": self._max_queue_depth,
+                "priorities": {name: stats.to_dict() for name, stats in self._stats.items()},
+            }
+
+
+# --------------------------------------------------------------------------
+# 등급별 게이트웨이 (싱글톤)
+# --------------------------------------------------------------------------
+
+_gateways: Dict[str, TierGateway] = {}
+_gateway_lock = threading.Lock()
+
+
+def _create_rate_limiter(tier: str) -> Optional[BaseRateLimiter]:
+    """등급별 요청 속도 제한 (LLM_RPM_SMALL / MEDIUM / LARGE, 분당 요청 수 - 미설정 시 None)"""
+    rpm = env_float(f"LLM_RPM_{tier.upper()}", 0)
+    if rpm <= 0:
+        return None
+    logger.info("LLM 요청 속도 제한 (%s): 분당 %.0f회", tier, rpm)
+    return InMemoryRateLimiter(
+        requests_per_second=rpm / 60,
+        check_every_n_seconds=0.05,
+        max_bucket_size=max(1, env_int("LLM_RATE_BURST", DEFAULT_RATE_BURST))
+    )
+
+
+def get_gateway(tier: str) -> TierGateway:
+    """등급 게이트웨이 반환 (프로세스 전체 공유)"""
+    if tier not in _gateways:
+        with _gateway_lock:
+            if tier not in _gateways:
+                max_concurrency = env_int(
+                    f"LLM_GATEWAY_MAX_CONCURRENCY_{tier.upper()}",
+                    env_int("LLM_GATEWAY_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+                )
+                _gateways[tier] = TierGateway(tier, max_concurrency, _create_rate_limiter(tier))
+    return _gateways[tier]
+
+
+def get_gateway_stats() -> Dict[str, Any]:
+    """등급별 대기열 통계 (동시 호출 수, 대기열 길이, 우선순위별 대기 시간)"""
+    with _gateway_lock:
+        gateways = dict(_gateways)
+    return {tier: gateway.get_stats() for tier, gateway in gateways.items()}
+
+
+# --------------------------------------------------------------------------
+# 채팅 모델
+# --------------------------------------------------------------------------
+
+class GatewayChatModel(ChatGoogleGenerativeAI):
+    """실제 API 호출(_generate / _stream)을 등급 게이트웨이의 우선순위 대기열로 보내는 Gemini 모델"""
+
+    _tier: str = PrivateAttr(default="medium")
+
+    def __init__(self, tier: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._tier = tier
+
+    # LLM 캐시 / 기록 키가 기존 ChatGoogleGenerativeAI와 같도록 직렬화 이름 유지
+    @classmethod
+    def lc_id(cls) -> List[str]:
+        return ChatGoogleGenerativeAI.lc_id()
+
+    def get_name(self, suffix: Optional[str] = None, *, name: Optional[str] = None) -> str:
+        return super().get_name(suffix, name=name or self.name or ChatGoogleGenerativeAI.__name__)
+
+    @property
+    def gateway(self) -> TierGateway:
+        return get_gateway(self._tier)
+
+    def _release_cache_claim(self) -> None:
+        # 캐시 미스로 이 호출이 맡은 single-flight 자리 해제 (성공 시에는 update에서 이미 해제됨)
+        if isinstance(self.cache, LLMResponseCache):
+            self.cache.release_owned()
+
+    def _generate_with_cache(self, messages, stop=None, run_manager=None, **kwargs):
+        try:
+            return super()._generate_with_cache(messages, stop=stop, run_manager=run_manager, **kwargs)
+        finally:
+            self._release_cache_claim()
+
+    async def _agenerate_with_cache(self, messages, stop=None, run_manager=None, **kwargs):
+        try:
+            return await super()._agenerate_with_cache(messages, stop=stop, run_manager=run_manager, **kwargs)
+        finally:
+            self._release_cache_claim()
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        with self.gateway.slot(resolve_priority(getattr(run_manager, "metadata", None))):
+            return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        async with self.gateway.aslot(resolve_priority(getattr(run_manager, "metadata", None))):
+            return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        with self.gateway.slot(resolve_priority(getattr(run_manager, "metadata", None))):
+            yield from super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async with self.gateway.aslot(resolve_priority(getattr(run_manager, "metadata", None))):
+            async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                yield chunk
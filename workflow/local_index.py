@@ -0,0 +1,612 @@
+"""
+컬렉션별 로컬 인덱스 (저장 시 생성, 임베딩 호출 없이 조회)
+- 아티팩트 컬럼 프레임 (pandas): 집계/통계 도구용
+- 정렬된 타임스탬프 인덱스 (NumPy): 시간 창 조회 도구용 (이진 탐색)
+- ID 키 원본 아티팩트 저장소 (SQLite): ID로 원본 레코드 조회용
+- BM25 역색인 (NumPy CSR): 파일명/시리얼/도메인 같은 정확한 토큰 검색용 (벡터 검색과 융합)
+- 엔티티 역색인 (NumPy CSR): 파일명/경로/드라이브/시리얼/도메인 키 → 아티팩트 (교차 상관 추적용)
+- 인덱스 파일은 {persist_directory}/local_index/{collection_name}/ 아래에 저장
+- 로드한 인덱스는 컬렉션 쓰기 버전 단위로 메모리에 유지
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from workflow.database import (
+    DEFAULT_DB_CONFIG,
+    VectorDBConfig,
+    artifact_to_document,
+    convert_datetime_to_str,
+    datetime_to_timestamp,
+    get_collection_version
+)
+from workflow.entities import extract_entities
+
+logger = logging.getLogger(__name__)
+
+
+FRAME_FILE = "frame.pkl"
+TIMELINE_FILE = "timeline.npz"
+STORE_FILE = "artifacts.sqlite"
+BM25_FILE = "bm25.npz"
+BM25_VOCAB_FILE = "bm25_vocab.json"
+ENTITY_FILE = "entities.npz"
+ENTITY_KEYS_FILE = "entity_keys.json"
+
+# 프레임 기본 컬럼 (아티팩트 data 필드와 이름이 겹치면 data 필드에 "data_" 접두사)
+BASE_COLUMNS = ("artifact_id", "artifact_type", "source", "timestamp", "datetime")
+
+
+def local_index_dir(collection_name: str, config: VectorDBConfig = DEFAULT_DB_CONFIG) -> str:
+    """컬렉션의 로컬 인덱스 디렉토리 경로"""
+    return os.path.join(config.persist_directory, "local_index", collection_name)
+
+
+# --------------------------------------------------------------------------
+# 아티팩트 컬럼 프레임
+# --------------------------------------------------------------------------
+
+def _field_value(value: Any) -> Optional[str]:
+    """data 필드 값을 문자열로 통일 (빈 값은 None)"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return str(value)
+
+
+def build_artifact_frame(artifacts: List[dict]) -> pd.DataFrame:
+    """
+    아티팩트 목록을 컬럼 프레임으로 변환
+
+    - 기본 컬럼: artifact_id, artifact_type, source, timestamp(float), datetime(로컬 시각)
+    - data의 각 필드는 문자열 컬럼으로 펼침
+    """
+    records = []
+    for idx, artifact in enumerate(artifacts):
+        collected_at = convert_datetime_to_str(artifact.get("collected_at"))
+        timestamp = datetime_to_timestamp(collected_at)
+        record = {
+            "artifact_id": artifact.get("id", f"artifact_{idx}"),
+            "artifact_type": artifact.get("artifact_type", "unknown"),
+            "source": artifact.get("source", "unknown"),
+            "timestamp": timestamp,
+            "datetime": datetime.fromtimestamp(timestamp) if timestamp is not None else None,
+        }
+        data = convert_datetime_to_str(artifact.get("data", {})) or {}
+        for key, value in data.items():
+            column = f"data_{key}" if key in BASE_COLUMNS else key
+            record[column] = _field_value(value)
+        records.append(record)
+
+    frame = pd.DataFrame.from_records(records)
+    if frame.empty:
+        frame = pd.DataFrame(columns=list(BASE_COLUMNS))
+    frame["timestamp"] = pd.to_numeric(frame["timestamp"], errors="coerce")
+    frame["datetime"] = pd.to_datetime(frame["datetime"], errors="coerce")
+    return frame
+
+
+# --------------------------------------------------------------------------
+# 타임라인 인덱스
+# --------------------------------------------------------------------------
+
+class TimelineIndex:
+    """타임스탬프 오름차순으로 정렬된 (timestamp, 프레임 행 번호) 인덱스"""
+
+    def __init__(
+        self,
+        timestamps: np.ndarray,
+        rows: np.ndarray,
+        artifact_ids: np.ndarray,
+        artifact_types: np.ndarray
+    ):
+        """
+        Args:
+            timestamps: 정렬된 타임스탬프 (float64)
+            rows: 각 타임스탬프의 프레임 행 번호
+            artifact_ids / artifact_types: 프레임 행 번호 순서의 ID/타입 (시각 없는 행 포함)
+        """
+        self.timestamps = timestamps
+        self.rows = rows
+        self.artifact_ids = artifact_ids
+        self.artifact_types = artifact_types
+        self._row_by_id = {artifact_id: row for row, artifact_id in enumerate(artifact_ids.tolist())}
+        self._row_timestamps = np.full(len(artifact_ids), np.nan)
+        self._row_timestamps[rows] = timestamps
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "TimelineIndex":
+        timestamps = frame["timestamp"].to_numpy(dtype=np.float64)
+        valid = np.flatnonzero(~np.isnan(timestamps))
+        order = valid[np.argsort(timestamps[valid], kind="stable")]
+        return cls(
+            timestamps=timestamps[order],
+            rows=order.astype(np.int64),
+            artifact_ids=frame["artifact_id"].astype(str).to_numpy(dtype=str),
+            artifact_types=frame["artifact_type"].astype(str).to_numpy(dtype=str)
+        )
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            timestamps=self.timestamps,
+            rows=self.rows,
+            artifact_ids=self.artifact_ids,
+            artifact_types=self.artifact_types
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TimelineIndex":
+        with np.load(path) as data:
+            return cls(data["timestamps"], data["rows"], data["artifact_ids"], data["artifact_types"])
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def timestamp_of(self, artifact_id: str) -> Optional[float]:
+        """아티팩트 ID의 타임스탬프 (O(1), 없거나 시각 정보가 없으면 None)"""
+        row = self._row_by_id.get(artifact_id)
+        if row is None:
+            return None
+        timestamp = self._row_timestamps[row]
+        return None if np.isnan(timestamp) else float(timestamp)
+
+    def row_timestamps(self, rows: np.ndarray) -> np.ndarray:
+        """프레임 행 번호들의 타임스탬프"""
+        return self._row_timestamps[rows]
+
+    def window(
+        self,
+        start: float,
+        end: float,
+        artifact_types: Optional[List[str]] = None
+    ) -> np.ndarray:
+        """[start, end] 구간의 프레임 행 번호를 시간순으로 반환 (이진 탐색, O(log n + k))"""
+        lo = int(np.searchsorted(self.timestamps, start, side="left"))
+        hi = int(np.searchsorted(self.timestamps, end, side="right"))
+        rows = self.rows[lo:hi]
+        if artifact_types:
+            rows = rows[np.isin(self.artifact_types[rows], artifact_types)]
+        return rows
+
+
+# --------------------------------------------------------------------------
+# ID 키 원본 저장소
+# --------------------------------------------------------------------------
+
+class ArtifactStore:
+    """artifact_id → 원본 아티팩트 레코드 (SQLite, 기본 키 조회)"""
+
+    _QUERY_CHUNK = 500  # IN 절 최대 파라미터 수
+
+    def __init__(self, path: str, readonly: bool = True):
+        if readonly:
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, path: str, artifacts: List[dict]) -> None:
+        """원본 아티팩트를 JSON 레코드로 저장 (ID 중복 시 마지막 레코드 유지)"""
+        store = cls(path, readonly=False)
+        rows = []
+        for idx, artifact in enumerate(artifacts):
+            record = convert_datetime_to_str(dict(artifact))
+            record.setdefault("id", f"artifact_{idx}")
+            rows.append((
+                str(record["id"]),
+                record.get("artifact_type", "unknown"),
+                json.dumps(record, ensure_ascii=False, default=str)
+            ))
+        with store._conn:
+            store._conn.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts ("
+                "artifact_id TEXT PRIMARY KEY, artifact_type TEXT, record TEXT NOT NULL)"
+            )
+            store._conn.executemany("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?)", rows)
+        store.close()
+
+    def get_many(self, artifact_ids: List[str]) -> Dict[str, dict]:
+        """ID 목록의 원본 레코드 조회 (없는 ID는 결과에서 제외)"""
+        records: Dict[str, dict] = {}
+        unique_ids = list(dict.fromkeys(artifact_ids))
+        with self._lock:
+            for i in range(0, len(unique_ids), self._QUERY_CHUNK):
+                chunk = unique_ids[i:i + self._QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self._conn.execute(
+                    f"SELECT artifact_id, record FROM artifacts WHERE artifact_id IN ({placeholders})",
+                    chunk
+                )
+                for artifact_id, record in cursor:
+                    records[artifact_id] = json.loads(record)
+        return records
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# --------------------------------------------------------------------------
+# BM25 역색인
+# --------------------------------------------------------------------------
+
+_TOKEN_PATTERN = re.compile(r"[\w.\-@]+")
+_SUBTOKEN_PATTERN = re.compile(r"[.\-@_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25 토큰화 (소문자)
+
+    "Strategy2025.docx" → ["strategy2025.docx", "strategy2025", "docx"]처럼
+    전체 토큰과 구분자(. - @ _) 기준 하위 토큰을 함께 생성해 정확 일치와 부분 일치를 모두 점수화합니다.
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall((text or "").lower()):
+        token = token.strip(".-@")
+        if not token:
+            continue
+        tokens.append(token)
+        parts = [part for part in _SUBTOKEN_PATTERN.split(token) if part]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """BM25 역색인 (용어별 posting을 CSR 배열로 저장)"""
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(
+        self,
+        vocab: List[str],
+        indptr: np.ndarray,
+        doc_ids: np.ndarray,
+        term_freqs: np.ndarray,
+        doc_lengths: np.ndarray
+    ):
+        """
+        Args:
+            vocab: 용어 목록 (순서 = 용어 번호)
+            indptr: 용어 t의 posting 범위 [indptr[t], indptr[t+1])
+            doc_ids / term_freqs: posting (문서 번호 = 프레임 행 번호, 용어 빈도)
+            doc_lengths: 문서별 토큰 수
+        """
+        self.vocab = {term: idx for idx, term in enumerate(vocab)}
+        self.terms = vocab
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.avg_length = float(doc_lengths.mean()) if len(doc_lengths) else 0.0
+
+        doc_freqs = np.diff(indptr).astype(np.float64)
+        n_docs = len(doc_lengths)
+        self.idf = np.log(1.0 + (n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+
+    @classmethod
+    def build(cls, texts: List[str]) -> "BM25Index":
+        postings: Dict[str, Dict[int, int]] = {}
+        doc_lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[doc_id] = len(tokens)
+            for token in tokens:
+                counts = postings.setdefault(token, {})
+                counts[doc_id] = counts.get(doc_id, 0) + 1
+
+        vocab = sorted(postings)
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        doc_ids = []
+        term_freqs = []
+        for idx, term in enumerate(vocab):
+            counts = postings[term]
+            doc_ids.extend(counts.keys())
+            term_freqs.extend(counts.values())
+            indptr[idx + 1] = indptr[idx] + len(counts)
+        return cls(
+            vocab,
+            indptr,
+            np.asarray(doc_ids, dtype=np.int64),
+            np.asarray(term_freqs, dtype=np.float32),
+            doc_lengths
+        )
+
+    def save(self, index_dir: str) -> None:
+        np.savez(
+            os.path.join(index_dir, BM25_FILE),
+            indptr=self.indptr,
+            doc_ids=self.doc_ids,
+            term_freqs=self.term_freqs,
+            doc_lengths=self.doc_lengths
+        )
+        with open(os.path.join(index_dir, BM25_VOCAB_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.terms, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, index_dir: str) -> "BM25Index":
+        with open(os.path.join(index_dir, BM25_VOCAB_FILE), "r", encoding="utf-8") as f:
+            vocab = json.load(f)
+        with np.load(os.path.join(index_dir, BM25_FILE)) as data:
+            return cls(vocab, data["indptr"], data["doc_ids"], data["term_freqs"], data["doc_lengths"])
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        BM25 상위 k개 (문서 번호, 점수) 반환
+
+        Args:
+            mask: 문서별 허용 여부 (메타데이터 1차 필터와 동일한 조건)
+        """
+        term_ids = {self.vocab[token] for token in tokenize(query) if token in self.vocab}
+        if not term_ids or not len(self.doc_lengths):
+            return []
+
+        scores = np.zeros(len(self.doc_lengths), dtype=np.float64)
+        for term_id in term_ids:
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.term_freqs[start:end]
+            norm = self.K1 * (1.0 - self.B + self.B * self.doc_lengths[docs] / (self.avg_length or 1.0))
+            # 용어별 posting의 문서 번호는 중복이 없으므로 fancy indexing 누적 가능
+            scores[docs] += self.idf[term_id] * tf * (self.K1 + 1.0) / (tf + norm)
+
+        if mask is not None:
+            scores[~mask] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            top = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[top]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in order]
+
+
+# --------------------------------------------------------------------------
+# 엔티티 역색인
+# --------------------------------------------------------------------------
+
+class EntityIndex:
+    """엔티티 키 ↔ 프레임 행 번호 (역방향/정방향 모두 CSR 배열)"""
+
+    def __init__(
+        self,
+        keys: List[str],
+        indptr: np.ndarray,
+        rows: np.ndarray,
+        row_indptr: np.ndarray,
+        row_keys: np.ndarray
+    ):
+        """
+        Args:
+            keys: 정렬된 엔티티 키 목록 (순서 = 키 번호)
+            indptr / rows: 키 k가 나타난 행 [indptr[k], indptr[k+1])
+            row_indptr / row_keys: 행 r에 나타난 키 번호 [row_indptr[r], row_indptr[r+1])
+        """
+        self.keys = keys
+        self.key_ids = {key: idx for idx, key in enumerate(keys)}
+        self.indptr = indptr
+        self.rows = rows
+        self.row_indptr = row_indptr
+        self.row_keys = row_keys
+
+    @classmethod
+    def build(cls, artifacts: List[dict]) -> "EntityIndex":
+        per_row = [extract_entities(artifact.get("data") or {}) for artifact in artifacts]
+        keys = sorted({key for row_keys in per_row for key in row_keys})
+        key_ids = {key: idx for idx, key in enumerate(keys)}
+
+        row_indptr = np.zeros(len(per_row) + 1, dtype=np.int64)
+        row_keys = []
+        for row, entities in enumerate(per_row):
+            row_keys.extend(key_ids[key] for key in entities)
+            row_indptr[row + 1] = len(row_keys)
+        row_keys = np.asarray(row_keys, dtype=np.int64)
+
+        # 정방향(행 → 키)을 키 번호로 정렬하면 역방향(키 → 행) CSR
+        row_of = np.repeat(np.arange(len(per_row), dtype=np.int64), np.diff(row_indptr))
+        order = np.argsort(row_keys, kind="stable")
+        indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_keys, minlength=len(keys)), out=indptr[1:])
+        return cls(keys, indptr, row_of[order], row_indptr, row_keys)
+
+    def save(self, index_dir: str) -> None:
+        np.savez(
+            os.path.join(index_dir, ENTITY_FILE),
+            indptr=self.indptr,
+            rows=self.rows,
+            row_indptr=self.row_indptr,
+            row_keys=self.row_keys
+        )
+        with open(os.path.join(index_dir, ENTITY_KEYS_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.keys, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, index_dir: str) -> "EntityIndex":
+        with open(os.path.join(index_dir, ENTITY_KEYS_FILE), "r", encoding="utf-8") as f:
+            keys = json.load(f)
+        with np.load(os.path.join(index_dir, ENTITY_FILE)) as data:
+            return cls(keys, data["indptr"], data["rows"], data["row_indptr"], data["row_keys"])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, keys: List[str]) -> Dict[int, List[str]]:
+        """키 목록 중 하나라도 나타난 행 → 일치한 키 목록"""
+        matched: Dict[int, List[str]] = {}
+        for key in keys:
+            key_id = self.key_ids.get(key)
+            if key_id is None:
+                continue
+            for row in self.rows[self.indptr[key_id]:self.indptr[key_id + 1]].tolist():
+                matched.setdefault(row, []).append(key)
+        return matched
+
+    def row_entities(self, row: int) -> List[str]:
+        """행에 나타난 엔티티 키 목록"""
+        return [self.keys[key_id] for key_id in self.row_keys[self.row_indptr[row]:self.row_indptr[row + 1]]]
+
+    def co_occurring(self, rows: List[int], exclude: List[str], top_n: int = 10) -> List[Tuple[str, int]]:
+        """행 집합에 함께 나타난 다른 엔티티 키 (행 수 많은 순)"""
+        if not rows:
+            return []
+        key_ids = np.concatenate([
+            self.row_keys[self.row_indptr[row]:self.row_indptr[row + 1]] for row in rows
+        ])
+        counts = np.bincount(key_ids, minlength=len(self.keys)) if len(key_ids) else np.zeros(0, dtype=np.int64)
+        for key in exclude:
+            key_id = self.key_ids.get(key)
+            if key_id is not None and key_id < len(counts):
+                counts[key_id] = 0
+        top = np.flatnonzero(counts)
+        top = top[np.argsort(-counts[top], kind="stable")][:top_n]
+        return [(self.keys[key_id], int(counts[key_id])) for key_id in top]
+
+
+# --------------------------------------------------------------------------
+# 생성 / 로드
+# --------------------------------------------------------------------------
+
+def build_local_indexes(
+    artifacts: List[dict],
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> Dict:
+    """저장 시 호출: 컬렉션의 로컬 인덱스를 새로 생성 (이전 인덱스는 삭제)"""
+    index_dir = local_index_dir(collection_name, config)
+    try:
+        shutil.rmtree(index_dir, ignore_errors=True)
+        os.makedirs(index_dir, exist_ok=True)
+
+        frame = build_artifact_frame(artifacts)
+        frame.to_pickle(os.path.join(index_dir, FRAME_FILE))
+        TimelineIndex.from_frame(frame).save(os.path.join(index_dir, TIMELINE_FILE))
+        ArtifactStore.build(os.path.join(index_dir, STORE_FILE), artifacts)
+        BM25Index.build([
+            artifact_to_document(artifact, idx).page_content
+            for idx, artifact in enumerate(artifacts)
+        ]).save(index_dir)
+        EntityIndex.build(artifacts).save(index_dir)
+
+        logger.info("로컬 인덱스 생성: %s (%d행, %d컬럼)", index_dir, len(frame), len(frame.columns))
+        return {"status": "success", "path": index_dir, "rows": len(frame)}
+    except Exception as e:
+        logger.warning("로컬 인덱스 생성 실패 (검색은 계속 가능): %s", e)
+        return {"status": "failure", "path": index_dir, "message": str(e)}
+
+
+_loaded: Dict[Tuple[str, str], Tuple[int, Any]] = {}
+_loaded_lock = threading.Lock()
+
+
+def _load_cached(
+    kind: str,
+    collection_name: str,
+    config: VectorDBConfig,
+    loader: Callable[[str], Any]
+) -> Optional[Any]:
+    """인덱스 로드 (같은 컬렉션 쓰기 버전 동안은 메모리 사본 재사용)"""
+    index_dir = local_index_dir(collection_name, config)
+    version = get_collection_version(collection_name)
+    key = (kind, index_dir)
+
+    with _loaded_lock:
+        cached = _loaded.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        try:
+            value = loader(index_dir)
+        except FileNotFoundError:
+            logger.warning("로컬 인덱스 없음: %s (%s)", index_dir, kind)
+            return None
+        _loaded[key] = (version, value)
+        return value
+
+
+def get_artifact_frame(
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> Optional[pd.DataFrame]:
+    """컬렉션의 아티팩트 컬럼 프레임 반환 (없으면 None)"""
+    return _load_cached(
+        "frame",
+        collection_name,
+        config,
+        lambda index_dir: pd.read_pickle(os.path.join(index_dir, FRAME_FILE))
+    )
+
+
+def get_timeline_index(
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> Optional[TimelineIndex]:
+    """컬렉션의 타임라인 인덱스 반환 (없으면 None)"""
+    return _load_cached(
+        "timeline",
+        collection_name,
+        config,
+        lambda index_dir: TimelineIndex.load(os.path.join(index_dir, TIMELINE_FILE))
+    )
+
+
+def get_artifact_store(
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> Optional[ArtifactStore]:
+    """컬렉션의 원본 아티팩트 저장소 반환 (없으면 None)"""
+    return _load_cached(
+        "store",
+        collection_name,
+        config,
+        lambda index_dir: ArtifactStore(os.path.join(index_dir, STORE_FILE))
+    )
+
+
+def get_bm25_index(
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> Optional[BM25Index]:
+    """컬렉션의 BM25 역색인 반환 (없으면 None)"""
+    return _load_cached("bm25", collection_name, config, BM25Index.load)
+
+
+def get_entity_index(
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> Optional[EntityIndex]:
+    """컬렉션의 엔티티 역색인 반환 (없으면 None)"""
+    return _load_cached("entity", collection_name, config, EntityIndex.load)
+
+
+def drop_local_indexes(
+    collection_name: str,
+    config: VectorDBConfig = DEFAULT_DB_CONFIG
+) -> None:
+    """작업 종료 시 호출: 컬렉션의 로컬 인덱스 파일과 메모리 사본 삭제"""
+    index_dir = local_index_dir(collection_name, config)
+    with _loaded_lock:
+        for key in [key for key in _loaded if key[1] == index_dir]:
+            _, value = _loaded.pop(key)
+            if isinstance(value, ArtifactStore):
+                value.close()
+    shutil.rmtree(index_dir, ignore_errors=True)
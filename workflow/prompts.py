@@ -426,6 +426,59 @@ search_artifacts_tool("USB로 전송된 기밀 문서")
 search_artifacts_tool("2024-01-15 오전 브라우저 다운로드 기록")
 ```
 
+**검색 결과 형식 및 재사용**
+- 결과는 artifact_type별 표로 압축되어 반환됩니다 ("공통:" 줄은 모든 행에 동일한 값)
+- 긴 값은 "…(+N자)"로 생략되며, 토큰 예산을 넘으면 유사도가 낮은 행부터 생략됩니다
+  (생략된 행의 ID는 마지막 줄에 나열 → 필요하면 get_artifacts_by_ids_tool로 조회)
+- "이미 확인한 아티팩트(ID만)": 이전 검색에서 이미 확인한 아티팩트 (내용은 이전 결과 참고)
+- next_cursor가 있으면 **search_next_page_tool**(cursor)로 다음 페이지 조회
+- 같은 검색을 max_results만 늘려 반복하지 말고 다음 페이지를 조회하세요
+
+**batch_search_artifacts_tool** ⭐ 독립적인 검색이 여러 개일 때
+- 검색 목표 리스트(최대 8개)를 한 번에 전달 → 병렬 검색 후 중복 제거하여 반환
+- 각 아티팩트의 matched_goals로 어떤 목표에서 검색되었는지 확인
+- 서로 결과에 의존하지 않는 검색은 여러 번 나누어 호출하지 말고 한 번에 요청
+
+```python
+batch_search_artifacts_tool(["USB 장치 연결 기록", "크롬 다운로드 기록에서 .zip 파일", "휴지통 삭제 파일"])
+```
+
+**aggregate_artifacts_tool** ⭐ 개수/빈도/기간 통계가 필요할 때
+- "날짜별 USB 연결 횟수", "가장 많이 방문한 도메인" 같은 질문은 검색 결과를 직접 세지 말고 집계
+- group_by(파생 컬럼 "url:domain", "file_name:ext" 지원), metric(count/nunique/min/max), time_bucket(hour/day/week/month)
+- 임베딩 호출 없이 작은 집계표만 반환 → 수백 건의 원본 결과 대신 사용
+
+```python
+aggregate_artifacts_tool(artifact_types=["usb_files"], time_bucket="day")
+aggregate_artifacts_tool(group_by=["url:domain"], top_n=10)
+```
+
+**timeline_window_tool** ⭐ 특정 이벤트 전후 상황 재구성
+- 기준 아티팩트 ID(또는 시각) 전후 N분 안의 모든 아티팩트를 시간순으로 반환 (누락 없음)
+- "USB 연결 ±10분 동안 접근한 파일"처럼 전후 관계를 볼 때 시간 필터 검색 대신 사용
+
+```python
+timeline_window_tool(artifact_ids=["artifact_45"], minutes_before=10, minutes_after=10)
+```
+
+**get_artifacts_by_ids_tool**
+- 이미 알고 있는 아티팩트 ID의 원본 레코드 전체(생략 없음)를 한 번에 조회
+- 검색 결과에서 "…(+N자)"로 생략된 값이 필요할 때 같은 검색을 반복하지 말고 사용
+
+```python
+get_artifacts_by_ids_tool(["artifact_45", "artifact_67"])
+```
+
+**trace_entity_tool** ⭐ 한 파일/장치/도메인의 흔적을 모든 아티팩트에서 연결
+- 파일명, 경로, 드라이브("E:"), USB 시리얼, 도메인 하나와 관련된 모든 기록을 시간순으로 반환
+- lnk / prefetch / 다운로드 / 휴지통 / USB 기록에 흩어진 같은 파일을 의미 검색 반복 없이 한 번에 추적
+- "함께 나타난 엔티티"로 해당 파일이 거쳐 간 드라이브/장치/도메인 확인
+
+```python
+trace_entity_tool(entity="Strategy2025.docx")
+trace_entity_tool(entity="S5XXNJ0R123456", kind="serial")
+```
+
 **web_search_tool**
 - 외부 정보가 필요할 때만 사용
 - 보안 위협, CVE 정보, 공격 기법 등
@@ -455,7 +508,11 @@ search_artifacts_tool("2024-01-15 오전 브라우저 다운로드 기록")
 
 ### 7. 종료 조건
 시나리오를 구성할 충분한 증거를 확보했다고 판단되면:
-- 명시적으로 "충분한 정보를 수집했습니다. 최종 보고서를 생성하겠습니다." 라고 선언하세요
+- **finish_analysis_tool**(summary, evidence_artifact_ids, evidence_handles)을 호출하세요 (호출 즉시 보고서 생성 단계로 이동)
+- summary에는 확보한 증거와 결론을, evidence_artifact_ids에는 핵심 근거 아티팩트 ID를 넣으세요
+- evidence_handles에는 근거가 담긴 도구 결과의 핸들(📎 [ev_0003])을 넣으세요 - 보고서 생성 시 인용한 결과만 원문으로 제공됩니다
+- 오래된 도구 결과는 요약(📎 [ev_XXXX] + ID 목록)으로만 보입니다. 세부 값이 다시 필요하면 get_artifacts_by_ids_tool로 조회하세요
+- 더 조사할 내용이 남아 있으면 호출하지 말고 조사를 계속하세요
 
 ## 중요 원칙
 - 사용된 원본 아티팩트 반드시 원본 보장 및 맨 마지막에 나열
@@ -549,6 +606,8 @@ QUERY_PLANNER_SYSTEM_PROMPT = """당신은 디지털 포렌식 아티팩트 검
    - query_text: 검색 의도를 반영한 핵심 키워드 (의미론적 검색)
    - max_results: 필요한 결과 개수 (기본 50개, 광범위한 검색은 100~300개)
    - similarity_threshold: 유사도 임계값 (정확한 매칭 필요한 경우에만 0.7~0.8)
+   - hybrid_search: 키워드(BM25) 검색 융합 (기본 true). 파일명, 시리얼, 도메인 같은 정확한 토큰은 query_text에 그대로 포함
+   - diversity: 결과 다양성 (기본 0). 같은 파일/도메인의 반복 기록이 많을 것 같은 광범위한 검색에서만 0.3~0.5
 
 **중요:**
 - 필터를 사용하면 검색 속도가 빨라지고 정확도가 높아집니다
@@ -0,0 +1,267 @@
+"""
+Query Planner 결과 캐시
+- 1단계: 정규화된 검색 목표 + 메타데이터 지문(fingerprint) 기반 정확 일치 캐시
+- 2단계: 검색 목표 임베딩 기반 의미 유사 캐시 (선택, 유사도 컷오프 적용)
+- 두 단계 모두 LRU로 크기 제한, JSON 파일로 저장/복원 가능
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+from workflow.utils import env_flag, env_float, env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------------------------------
+# 캐시 설정 (환경 변수로 조정 가능)
+# --------------------------------------------------------------------------
+
+DEFAULT_CACHE_SIZE = 256  # 정확 일치 캐시 최대 항목 수
+DEFAULT_SEMANTIC_CACHE_SIZE = 256  # 의미 유사 캐시 최대 항목 수
+DEFAULT_SIMILARITY_CUTOFF = 0.95  # 의미 유사 캐시 적중 기준 (코사인 유사도)
+
+
+# --------------------------------------------------------------------------
+# 키 생성 함수
+# --------------------------------------------------------------------------
+
+def normalize_goal(goal: str) -> str:
+    """검색 목표 문자열 정규화 (유니코드 정규화, 소문자, 공백/말미 구두점 정리)"""
+    text = unicodedata.normalize("NFKC", goal or "")
+    text = re.sub(r"\s+", " ", text.lower()).strip()
+    return text.rstrip(" .,!?。")
+
+
+def metadata_fingerprint(metadata_info: Dict) -> str:
+    """메타데이터 요약(타입 목록, 시간 범위, 개수)의 지문 생성
+
+    컬렉션 내용이 바뀌면 지문이 달라지므로 이전 작업의 계획이 재사용되지 않습니다.
+    """
+    summary = {
+        "artifact_types": sorted(metadata_info.get("artifact_types", []) or []),
+        "datetime_range": metadata_info.get("datetime_range", {}) or {},
+        "total_count": metadata_info.get("total_count", 0),
+    }
+    raw = json.dumps(summary, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+# --------------------------------------------------------------------------
+# 2단계 캐시
+# --------------------------------------------------------------------------
+
+class QueryPlanCache:
+    """StructuredQuery(dict) 2단계 LRU 캐시 (스레드 안전)"""
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_CACHE_SIZE,
+        semantic_max_size: int = DEFAULT_SEMANTIC_CACHE_SIZE,
+        similarity_cutoff: float = DEFAULT_SIMILARITY_CUTOFF,
+        enable_semantic: bool = False,
+        persist_path: Optional[str] = None
+    ):
+        self.max_size = max_size
+        self.semantic_max_size = semantic_max_size
+        self.similarity_cutoff = similarity_cutoff
+        self.enable_semantic = enable_semantic
+        self.persist_path = persist_path
+
+        # key: "{fingerprint}:{normalized_goal}" -> plan
+        self._exact: "OrderedDict[str, Dict]" = OrderedDict()
+        # key: 동일 -> (fingerprint, 정규화된 임베딩, plan)
+        self._semantic: "OrderedDict[str, Tuple[str, np.ndarray, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+        if persist_path:
+            self.load(persist_path)
+
+    @classmethod
+    def from_env(cls) -> "QueryPlanCache":
+        """환경 변수 기반 캐시 생성 (빈 값은 미설정과 동일하게 기본값 사용)"""
+        return cls(
+            max_size=env_int("QUERY_PLAN_CACHE_SIZE", DEFAULT_CACHE_SIZE),
+            semantic_max_size=env_int("QUERY_PLAN_SEMANTIC_CACHE_SIZE", DEFAULT_SEMANTIC_CACHE_SIZE),
+            similarity_cutoff=env_float("QUERY_PLAN_SEMANTIC_CUTOFF", DEFAULT_SIMILARITY_CUTOFF),
+            enable_semantic=env_flag("QUERY_PLAN_SEMANTIC_CACHE"),
+            persist_path=env_str("QUERY_PLAN_CACHE_PATH")
+        )
+
+    @staticmethod
+    def _make_key(goal: str, fingerprint: str) -> str:
+        return f"{fingerprint}:{normalize_goal(goal)}"
+
+    @staticmethod
+    def _unit(vector: List[float]) -> np.ndarray:
+        arr = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(arr))
+        return arr / norm if norm > 0 else arr
+
+    # ----------------------------------------------------------------------
+    # 조회 / 저장
+    # ----------------------------------------------------------------------
+
+    def get_exact(self, goal: str, fingerprint: str) -> Optional[Dict]:
+        """정확 일치 캐시 조회 (적중 시 LRU 갱신)"""
+        key = self._make_key(goal, fingerprint)
+        with self._lock:
+            plan = self._exact.get(key)
+            if plan is None:
+                return None
+            self._exact.move_to_end(key)
+            self.stats["exact_hits"] += 1
+            return dict(plan)
+
+    def get_semantic(self, embedding: List[float], fingerprint: str) -> Optional[Dict]:
+        """의미 유사 캐시 조회 (같은 지문 내에서 코사인 유사도 최댓값이 컷오프 이상이면 적중)"""
+        if not self.enable_semantic:
+            return None
+
+        query = self._unit(embedding)
+        with self._lock:
+            candidates = [
+                (key, vector, plan)
+                for key, (fp, vector, plan) in self._semantic.items()
+                if fp == fingerprint and vector.shape == query.shape
+            ]
+            if not candidates:
+                return None
+
+            matrix = np.stack([vector for _, vector, _ in candidates])
+            scores = matrix @ query
+            best = int(np.argmax(scores))
+            if float(scores[best]) < self.similarity_cutoff:
+                return None
+
+            key, _, plan = candidates[best]
+            self._semantic.move_to_end(key)
+            self.stats["semantic_hits"] += 1
+            logger.debug("의미 유사 캐시 적중 (유사도 %.3f)", float(scores[best]))
+            return dict(plan)
+
+    def record_miss(self) -> None:
+        """두 단계 모두 실패한 조회 기록"""
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def put(
+        self,
+        goal: str,
+        fingerprint: str,
+        plan: Dict,
+        embedding: Optional[List[float]] = None
+    ) -> None:
+        """계획 저장 (용량 초과 시 가장 오래된 항목 제거)"""
+        key = self._make_key(goal, fingerprint)
+        with self._lock:
+            self._exact[key] = dict(plan)
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.max_size:
+                self._exact.popitem(last=False)
+
+            if self.enable_semantic and embedding is not None:
+                self._semantic[key] = (fingerprint, self._unit(embedding), dict(plan))
+                self._semantic.move_to_end(key)
+                while len(self._semantic) > self.semantic_max_size:
+                    self._semantic.popitem(last=False)
+
+        if self.persist_path:
+            self.save(self.persist_path)
+
+    def clear(self) -> None:
+        """캐시 및 통계 초기화"""
+        with self._lock:
+            self._exact.clear()
+            self._semantic.clear()
+            self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    def get_stats(self) -> Dict:
+        """적중률 통계 반환"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["exact_size"] = len(self._exact)
+            stats["semantic_size"] = len(self._semantic)
+        total = stats["exact_hits"] + stats["semantic_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["exact_hits"] + stats["semantic_hits"]) / total if total else 0.0
+        return stats
+
+    # ----------------------------------------------------------------------
+    # 저장 / 복원
+    # ----------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """캐시를 JSON 파일로 저장 (임시 파일 작성 후 교체)"""
+        with self._lock:
+            payload = {
+                "exact": list(self._exact.items()),
+                "semantic": [
+                    [key, fp, vector.tolist(), plan]
+                    for key, (fp, vector, plan) in self._semantic.items()
+                ],
+            }
+
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("쿼리 계획 캐시 저장 실패: %s", e)
+
+    def load(self, path: str) -> None:
+        """JSON 파일에서 캐시 복원 (파일이 없으면 무시)"""
+        if not os.path.exists(path):
+            return
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("쿼리 계획 캐시 로드 실패 (무시): %s", e)
+            return
+
+        with self._lock:
+            for key, plan in payload.get("exact", [])[-self.max_size:]:
+                self._exact[key] = plan
+            for key, fp, vector, plan in payload.get("semantic", [])[-self.semantic_max_size:]:
+                self._semantic[key] = (fp, np.asarray(vector, dtype=np.float32), plan)
+
+        logger.info(
+            "쿼리 계획 캐시 로드: 정확 %d개, 의미 %d개",
+            len(self._exact), len(self._semantic)
+        )
+
+
+# --------------------------------------------------------------------------
+# 전역 캐시 (프로세스 내 공유)
+# --------------------------------------------------------------------------
+
+_global_query_plan_cache: Optional[QueryPlanCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_plan_cache() -> QueryPlanCache:
+    """전역 Query Planner 캐시 반환 (최초 호출 시 환경 변수로 생성)"""
+    global _global_query_plan_cache
+
+    if _global_query_plan_cache is not None:
+        return _global_query_plan_cache
+
+    with _cache_lock:
+        if _global_query_plan_cache is None:
+            _global_query_plan_cache = QueryPlanCache.from_env()
+        return _global_query_plan_cache
@@ -1,6 +1,7 @@
 from typing import Any, Dict, List
 
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 
@@ -10,18 +11,35 @@ from workflow.filter_node import (
     recursive_filter_node,
     should_continue_filtering
 )
-from workflow.classes import AgentState, ScenarioCreate, BooleanResponse
-from workflow.database import save_data_node
+from workflow.classes import AgentState, ScenarioCreate, BooleanResponse, new_run_id
+from workflow.context_compaction import get_context_compactor
+from workflow.database import DEFAULT_COLLECTION_NAME, save_data_node
+from workflow.evidence_store import (
+    expand_recent_evidence,
+    get_evidence_store,
+    resolve_cited_evidence,
+    store_tool_messages
+)
 from workflow.requirements_node import analyze_requirements_node
-from workflow.tools import agent_tools, ToolContext, get_metadata_info, format_metadata_section
+from workflow.tools import (
+    FINISH_TOOL_NAME,
+    agent_tools,
+    ToolContext,
+    get_metadata_info,
+    format_metadata_section
+)
 from workflow.prompts import AGENT_SYSTEM_PROMPT, SCENARIO_GENERATOR_SYSTEM_PROMPT, CLASSIFY_PROMPT
-from workflow.utils import llm_large, llm_medium
+from workflow.utils import env_flag, llm_large, llm_medium
 
 # --------------------------------------------------------------------------
 # LLM 및 도구 설정
 # --------------------------------------------------------------------------
 llm_with_tools = llm_large.bind_tools(agent_tools)
 
+# 종료 판단: finish_analysis_tool 호출(기본) → 종료 선언 문구 → (선택) LLM 분류기
+DONE_PHRASES = ("충분한 정보를 수집했습니다", "최종 보고서를 생성하겠습니다")
+DONE_LLM_FALLBACK = env_flag("AGENT_DONE_LLM_FALLBACK")
+
 # --------------------------------------------------------------------------
 # 그래프 노드(Nodes) 정의
 # --------------------------------------------------------------------------
@@ -76,10 +94,10 @@ def agent_reasoner(state: AgentState) -> Dict:
     """
     print("--- 🤔 Agent: 추론 및 행동 결정 중... ---")
     
-    # 0. 도구 컨텍스트 설정 (도구가 State 정보에 접근 가능하도록)
-    collection_name = state.get("collection_name") or "artifacts_collection"
+    # 0. 작업 컬렉션 정보 / 실행 ID (create_initial_state를 거치지 않은 State는 첫 추론에서 발급)
+    collection_name = state.get("collection_name") or DEFAULT_COLLECTION_NAME
     db_config = state.get("db_config")
-    ToolContext.set_context(collection_name, db_config)
+    run_id = state.get("run_id") or new_run_id()
     
     # 1. 메시지 구성
     existing_messages = state.get("messages", [])
@@ -105,14 +123,27 @@ def agent_reasoner(state: AgentState) -> Dict:
         # ToolMessage 이후에는 continuation_prompt를 추가하지 않음
         # (도구 결과가 이미 메시지에 포함되어 있으므로 LLM이 자동으로 분석함)
         if isinstance(last_message, AIMessage) and not last_message.tool_calls:
-            continuation_prompt = "분석을 바탕으로 다음 단계를 진행하세요. 모든 정보가 수집되었다고 판단되면 최종 보고서를 생성하겠다고 명확히 언급해주세요."
+            continuation_prompt = "분석을 바탕으로 다음 단계를 진행하세요. 모든 정보가 수집되었다고 판단되면 finish_analysis_tool을 호출하세요."
             messages_to_invoke.append(HumanMessage(content=continuation_prompt))
 
+    # 최근 턴의 도구 결과만 근거 저장소에서 원문으로 펼치고, 오래된 결과는 요약으로 교체 (LLM 입력만 변경)
+    compactor = get_context_compactor()
+    expanded_messages = expand_recent_evidence(messages_to_invoke, get_evidence_store(run_id), compactor.keep_turns)
+    compacted_messages, compaction = compactor.compact(expanded_messages)
+    if compaction["compacted"]:
+        print(
+            f"  🗜️  컨텍스트 압축: {compaction['before_tokens']:,} → {compaction['after_tokens']:,} 토큰 "
+            f"(메시지 {compaction['compacted']}개 요약, 최근 {compaction['kept_turns']}턴 원문 유지)"
+        )
+    
+    # 도구 결과 토큰 예산 산정을 위해 현재 히스토리 크기를 state로 전달 (execute_tools에서 사용)
+    context_tokens = compaction["after_tokens"]
+    
     # 2. LLM 호출
-    print(f"  📨 메시지 개수: {len(messages_to_invoke)}개")
+    print(f"  📨 메시지 개수: {len(messages_to_invoke)}개 (추정 {context_tokens:,} 토큰)")
     
     try:
-        response = llm_with_tools.invoke(messages_to_invoke)
+        response = llm_with_tools.invoke(compacted_messages)
 
         # 3. 응답 분석 및 로깅
         tool_calls = getattr(response, 'tool_calls', None)
@@ -120,6 +151,8 @@ def agent_reasoner(state: AgentState) -> Dict:
             print(f"  🔧 도구 호출: {len(tool_calls)}개")
             for tool_call in tool_calls:
                 print(f"     - {tool_call.get('name', 'unknown')}")
+            if any(tool_call.get("name") == FINISH_TOOL_NAME for tool_call in tool_calls):
+                print("  ✅ 분석 종료 신호 → 보고서 생성 단계로 이동")
         else:
             content = getattr(response, 'content', '')
             if content:
@@ -130,13 +163,13 @@ def agent_reasoner(state: AgentState) -> Dict:
                 print(f"  ⚠️  경고: LLM 응답이 비어있습니다!")
             
             # 종료 조건 확인
-            if "충분한 정보를 수집했습니다" in content or "최종 보고서를 생성하겠습니다" in content:
+            if _declares_done(content):
                 print("  ✅ 정보 수집 완료 → 보고서 생성 단계로 이동")
         
         print("--- ✅ Agent: 추론 완료 ---")
         if len(messages_to_invoke) == 2:
-            return {"messages": messages_to_invoke + [response]}
-        return {"messages": [response]}
+            return {"messages": messages_to_invoke + [response], "context_tokens": context_tokens, "run_id": run_id}
+        return {"messages": [response], "context_tokens": context_tokens, "run_id": run_id}
         
     except Exception as e:
         print(f"  ❌ 에이전트 추론 중 오류 발생: {e}")
@@ -191,7 +224,10 @@ def scenario_generator(state: AgentState) -> Dict:
         return {"final_report": error_report}
     
     # 3. 도구 실행 검증 (최소 검색 횟수 확인)
-    tool_messages = [m for m in messages if hasattr(m, 'name') and getattr(m, 'name', None)]
+    tool_messages = [
+        m for m in messages
+        if hasattr(m, 'name') and getattr(m, 'name', None) and m.name != FINISH_TOOL_NAME
+    ]
     if len(tool_messages) == 0:
         print("  ⚠️  도구 실행 없음 - 데이터 부족 보고서 생성")
         no_search_report = ScenarioCreate(
@@ -213,11 +249,12 @@ def scenario_generator(state: AgentState) -> Dict:
     try:
         structured_llm = llm_large.with_structured_output(ScenarioCreate)
         
-        # 시나리오 생성 메시지 구성
+        # 시나리오 생성 메시지 구성 (히스토리의 도구 결과는 요약, 인용된 근거만 원문)
         scenario_messages = [
             SystemMessage(content=SCENARIO_GENERATOR_SYSTEM_PROMPT),
             HumanMessage(content=f"대화 히스토리를 바탕으로 정보유출 시나리오를 생성하세요.\n\n도구 실행 횟수: {len(tool_messages)}개"),
-            *messages  # 전체 대화 히스토리 포함
+            *messages,  # 전체 대화 히스토리 포함
+            *_cited_evidence_messages(state)
         ]
         
         result = structured_llm.invoke(scenario_messages)
@@ -253,6 +290,27 @@ def scenario_generator(state: AgentState) -> Dict:
         )
         return {"final_report": fallback_report}
 
+def _evidence_session_id(state: AgentState) -> str:
+    """근거 저장소 키 (그래프 실행 ID, 없으면 컬렉션 이름)"""
+    return state.get("run_id") or state.get("collection_name") or DEFAULT_COLLECTION_NAME
+
+def _cited_evidence_messages(state: AgentState) -> List[HumanMessage]:
+    """에이전트가 인용한 근거의 원문 (근거 저장소에서 확장, 없으면 빈 목록)"""
+    evidence = resolve_cited_evidence(state.get("messages") or [], get_evidence_store(_evidence_session_id(state)))
+    if not evidence:
+        return []
+    return [HumanMessage(content=f"[인용된 근거 원문]\n히스토리의 📎 요약 중 인용된 결과의 원문입니다.\n\n{evidence}")]
+
+def prepare_report(state: AgentState) -> Dict:
+    """
+    (워크플로우 4단계 진입) 보고서 생성과 결과 분류로 분기하는 지점입니다.
+
+    두 노드는 같은 messages 히스토리만 읽고 서로 다른 키(final_report / context)에 쓰므로
+    같은 super-step에서 동시에 실행되고, 둘 다 끝나면 END로 합류합니다.
+    """
+    print("--- 🔀 Node: 보고서 생성 / 결과 분류 병렬 실행 ---")
+    return {}
+
 def classify_data(state: AgentState) -> Dict:
     """
     (워크플로우 4단계) 누적된 메시지 정보들을 바탕으로 나온 마지막 결론을 행위 기준으로 분류합니다.
@@ -266,7 +324,7 @@ def classify_data(state: AgentState) -> Dict:
         return {"context": context}
     
     try:
-        response = llm_large.invoke([HumanMessage(content=CLASSIFY_PROMPT), *messages])
+        response = llm_large.invoke([HumanMessage(content=CLASSIFY_PROMPT), *messages, *_cited_evidence_messages(state)])
         context = response.content
         return {"context": context}
     except Exception as e:
@@ -312,26 +370,48 @@ def router(state: AgentState) -> str:
     if tool_calls:
         return "tools"
     
-    # AIMessage의 content를 보고 최종 보고서 생성 여부 판단
+    # 종료 신호 없이 끝난 응답: 종료 선언 문구는 로컬에서 판단, LLM 분류기는 설정 시에만 사용
     content = getattr(last_message, "content", "")
     if not content:
         return "continue"
 
-    if check_is_done(content):
+    if _declares_done(content):
+        return "generate_scenario"
+
+    if DONE_LLM_FALLBACK and check_is_done(content):
         return "generate_scenario"
     
     # 기본적으로 계속 생각
     return "continue"
 
-def check_is_done(content: str | List) -> bool:
-    print(f"{__name__} - last message content:", content[:200])
-    
+def after_tools(state: AgentState) -> str:
+    """도구 실행 후 분기: finish_analysis_tool이 실행되었으면 보고서 생성, 아니면 다시 추론"""
+    for message in reversed(state.get("messages", [])):
+        if not isinstance(message, ToolMessage):
+            break
+        if message.name == FINISH_TOOL_NAME:
+            print("  ✅ 분석 종료 신호 확인 → 보고서 생성")
+            return "generate_scenario"
+    return "continue"
+
+def _content_text(content: str | List) -> str:
+    """AIMessage content(문자열 또는 블록 리스트)를 텍스트로 변환"""
     if isinstance(content, list):
         if len(content) > 0 and isinstance(content[0], dict):
             msg_type = content[0].get("type", "") 
-            content = content[0][msg_type] if msg_type else ""
-        else:
-            content = "\n\n".join(str(item) for item in content)
+            return content[0].get(msg_type, "") if msg_type else ""
+        return "\n\n".join(str(item) for item in content)
+    return content
+
+def _declares_done(content: str | List) -> bool:
+    """종료 선언 문구 포함 여부 (LLM 호출 없음)"""
+    text = _content_text(content)
+    return any(phrase in text for phrase in DONE_PHRASES)
+
+def check_is_done(content: str | List) -> bool:
+    """LLM 분류기로 보고서 생성 완료 여부 판단 (AGENT_DONE_LLM_FALLBACK=1일 때만 사용)"""
+    content = _content_text(content)
+    print(f"{__name__} - last message content:", content[:200])
 
     prompt_text = (
         "아래 ai_message는 ai agent가 생성한 텍스트입니다. 보고서 생성 완료 여부를 True or False로 판단하세요.\n"
@@ -360,6 +440,31 @@ def check_is_done(content: str | List) -> bool:
 # 도구 노드 생성 (agent_tools는 tools.py에서 import됨)
 tool_node = ToolNode(agent_tools)
 
+
+def _store_evidence(state: AgentState, result: Any) -> Any:
+    """도구 결과 원문은 근거 저장소에 두고 state에는 요약 + 핸들만 추가"""
+    if not isinstance(result, dict) or not result.get("messages"):
+        return result
+    store = get_evidence_store(_evidence_session_id(state))
+    return {**result, "messages": store_tool_messages(result["messages"], store)}
+
+
+def _execute_tools(state: AgentState, config: RunnableConfig) -> Dict:
+    """State의 컬렉션 / DB 설정을 이번 실행의 도구 컨텍스트로 지정한 뒤 도구 실행"""
+    with ToolContext.from_state(state):
+        result = tool_node.invoke(state, config)
+    return _store_evidence(state, result)
+
+
+async def _aexecute_tools(state: AgentState, config: RunnableConfig) -> Dict:
+    with ToolContext.from_state(state):
+        result = await tool_node.ainvoke(state, config)
+    return _store_evidence(state, result)
+
+
+# 동시에 실행되는 invoke / ainvoke 간 컨텍스트 분리 (전역 상태 없음)
+execute_tools = RunnableLambda(_execute_tools, afunc=_aexecute_tools, name="execute_tools")
+
 # 그래프 워크플로우 정의
 workflow = StateGraph(AgentState)
 
@@ -369,7 +474,8 @@ workflow.add_node("extract_results", extract_filtered_artifacts)  # 필터링 
 workflow.add_node("save_data", save_data_node)  # 데이터 저장
 workflow.add_node("analyze_requirements", analyze_requirements_node)  # 요구사항 분석
 workflow.add_node("agent_reasoner", agent_reasoner)  # 에이전트 추론
-workflow.add_node("execute_tools", tool_node)  # 도구 실행
+workflow.add_node("execute_tools", execute_tools)  # 도구 실행
+workflow.add_node("prepare_report", prepare_report)  # 보고서 단계 분기
 workflow.add_node("generate_scenario", scenario_generator)  # 시나리오 생성
 workflow.add_node("classify_results", classify_data)  # 결과 분류
 
@@ -405,13 +511,23 @@ workflow.add_conditional_edges(
     router,
     {
         "tools": "execute_tools",
-        "generate_scenario": "generate_scenario",
+        "generate_scenario": "prepare_report",
         "continue": "agent_reasoner", # 계속 생각
     }
 )
-workflow.add_edge("execute_tools", "agent_reasoner") # 도구 사용 후 다시 생각
-workflow.add_edge("generate_scenario", "classify_results") 
-workflow.add_edge("classify_results", END) 
+workflow.add_conditional_edges(
+    "execute_tools",
+    after_tools,
+    {
+        "generate_scenario": "prepare_report",  # finish_analysis_tool 실행 시 보고서 생성
+        "continue": "agent_reasoner",  # 도구 사용 후 다시 생각
+    }
+)
+# 보고서 생성과 결과 분류는 서로 독립적인 LLM 호출이므로 동시에 실행 후 END에서 합류
+workflow.add_edge("prepare_report", "generate_scenario")
+workflow.add_edge("prepare_report", "classify_results")
+workflow.add_edge("generate_scenario", END)
+workflow.add_edge("classify_results", END)
 
 # 그래프 컴파일
 app = workflow.compile()
@@ -6,16 +6,17 @@
 """
 
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 
 from workflow.classes import AgentState
 from workflow.requirements_node import analyze_requirements_node
-from workflow.tools import agent_tools
 from workflow.rag_agent_workflow import (
     agent_reasoner,
+    execute_tools,
+    prepare_report,
     scenario_generator,
     classify_data,
-    router
+    router,
+    after_tools
 )
 
 
@@ -23,16 +24,14 @@ from workflow.rag_agent_workflow import (
 # 그래프 구성 및 컴파일
 # --------------------------------------------------------------------------
 
-# 도구 노드 생성
-tool_node = ToolNode(agent_tools)
-
 # 그래프 워크플로우 정의
 workflow_part2 = StateGraph(AgentState)
 
 # 노드 추가
 workflow_part2.add_node("analyze_requirements", analyze_requirements_node)
 workflow_part2.add_node("agent_reasoner", agent_reasoner)
-workflow_part2.add_node("execute_tools", tool_node)
+workflow_part2.add_node("execute_tools", execute_tools)
+workflow_part2.add_node("prepare_report", prepare_report)
 workflow_part2.add_node("generate_scenario", scenario_generator)
 workflow_part2.add_node("classify_results", classify_data)
 
@@ -46,13 +45,22 @@ workflow_part2.add_conditional_edges(
     router,
     {
         "tools": "execute_tools",
-        "generate_scenario": "generate_scenario",
+        "generate_scenario": "prepare_report",
         "continue": "agent_reasoner",
     }
 )
 
-workflow_part2.add_edge("execute_tools", "agent_reasoner")
-workflow_part2.add_edge("generate_scenario", "classify_results")
+workflow_part2.add_conditional_edges(
+    "execute_tools",
+    after_tools,
+    {
+        "generate_scenario": "prepare_report",
+        "continue": "agent_reasoner",
+    }
+)
+workflow_part2.add_edge("prepare_report", "generate_scenario")
+workflow_part2.add_edge("prepare_report", "classify_results")
+workflow_part2.add_edge("generate_scenario", END)
 workflow_part2.add_edge("classify_results", END)
 
 # 그래프 컴파일
@@ -0,0 +1,482 @@
+"""
+LLM / 임베딩 / 웹 검색 입출력 기록 및 재생 (오프라인 종단 간 벤치마크용)
+- LLM_MODE=record: 실제 호출 결과를 LLM_FIXTURE_DIR에 기록
+- LLM_MODE=replay: 기록된 결과로 응답 (외부 API 호출 없음), 선택적으로 지연 시간 주입
+- LLM은 실제 채팅 모델 클래스에 BaseCache로 연결 → 구조화 출력 파싱/도구 호출 변환은 운영과 동일하게 동작
+- 재생 매칭: 정규화된 요청 키 일치 → 없으면 같은 모델/호출 설정의 다음 기록 순서대로
+
+기록 디렉토리 구성:
+    llm_calls.jsonl      LLM 호출 (키, 모델 설정 지문, 등급, 지연 시간, 응답)
+    tool_calls.jsonl     외부 도구 호출 (웹 검색)
+    embeddings.sqlite    임베딩 벡터 + 호출별 지연 시간
+    job.json             벤치마크 입력 (아티팩트, task_id 등, workflow/benchmark.py가 기록)
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import defaultdict, deque
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import warnings
+
+import numpy as np
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.embeddings import Embeddings
+from langchain_core.load import dumps, loads
+
+from workflow.llm_cache import _CACHED_OBJECTS, cache_key
+from workflow.utils import env_str
+
+logger = logging.getLogger(__name__)
+
+
+LLM_MODES = ("live", "record", "replay")
+DEFAULT_EMBEDDING_DIM = 768  # 기록에 없는 텍스트의 대체 벡터 차원 (기록이 있으면 그 차원 사용)
+
+
+class ReplayMissError(RuntimeError):
+    """재생할 기록이 없음"""
+    pass
+
+
+def get_llm_mode() -> str:
+    """LLM_MODE 환경 변수 (live | record | replay, 기본 live)"""
+    mode = env_str("LLM_MODE", "live").strip().lower()
+    if mode not in LLM_MODES:
+        raise ValueError(f"Unknown LLM_MODE: {mode} ({', '.join(LLM_MODES)} 지원)")
+    return mode
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+# --------------------------------------------------------------------------
+# 지연 시간 주입
+# --------------------------------------------------------------------------
+
+class LatencyModel:
+    """
+    재생 시 호출마다 기다릴 시간
+
+    사양 문자열:
+        none                  지연 없음 (기본)
+        recorded[:배율]       기록된 실제 지연 × 배율
+        fixed:초              고정 지연
+        lognormal:중앙값:시그마  로그정규 분포 (원격 API 꼬리 지연 모사)
+    """
+
+    def __init__(self, kind: str = "none", a: float = 1.0, b: float = 0.0, seed: Optional[int] = None):
+        self.kind = kind
+        self.a = a
+        self.b = b
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_spec(cls, spec: Optional[str], seed: Optional[int] = None) -> "LatencyModel":
+        parts = (spec or "none").strip().lower().split(":")
+        kind = parts[0] or "none"
+        try:
+            values = [float(value) for value in parts[1:]]
+        except ValueError as e:
+            raise ValueError(f"지연 시간 사양 오류: {spec}") from e
+        if kind == "none":
+            return cls("none", seed=seed)
+        if kind == "recorded":
+            return cls("recorded", values[0] if values else 1.0, seed=seed)
+        if kind == "fixed" and len(values) == 1:
+            return cls("fixed", values[0], seed=seed)
+        if kind == "lognormal" and len(values) == 2:
+            return cls("lognormal", values[0], values[1], seed=seed)
+        raise ValueError(f"지연 시간 사양 오류: {spec} (none | recorded[:배율] | fixed:초 | lognormal:중앙값:시그마)")
+
+    def sample(self, recorded: Optional[float] = None) -> float:
+        if self.kind == "recorded":
+            return max(0.0, (recorded or 0.0) * self.a)
+        if self.kind == "fixed":
+            return self.a
+        if self.kind == "lognormal":
+            with self._lock:
+                return self.a * float(np.exp(self._random.gauss(0.0, self.b)))
+        return 0.0
+
+    def wait(self, recorded: Optional[float] = None) -> float:
+        delay = self.sample(recorded)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+# --------------------------------------------------------------------------
+# 기록 저장소
+# --------------------------------------------------------------------------
+
+class FixtureStore:
+    """기록 디렉토리 읽기/쓰기 (스레드 안전)"""
+
+    def __init__(self, directory: str, mode: str):
+        self.directory = directory
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(os.path.join(directory, "embeddings.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_calls (kind TEXT NOT NULL, count INTEGER NOT NULL, latency REAL NOT NULL)"
+        )
+        self._db.commit()
+
+        if mode == "record":
+            # 새로 기록 (이전 기록과 섞이지 않도록 초기화)
+            for name in ("llm_calls.jsonl", "tool_calls.jsonl"):
+                open(self._path(name), "w", encoding="utf-8").close()
+            with self._db_lock:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.execute("DELETE FROM embedding_calls")
+                self._db.commit()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def append(self, name: str, record: Dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self._path(name), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def read(self, name: str) -> List[Dict]:
+        path = self._path(name)
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def put_vectors(self, items: List[Tuple[str, List[float]]]) -> None:
+        with self._db_lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+            )
+            self._db.commit()
+
+    def get_vectors(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._db_lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def embedding_dim(self) -> int:
+        with self._db_lock:
+            row = self._db.execute("SELECT vector FROM embeddings LIMIT 1").fetchone()
+        return len(row[0]) // 4 if row else DEFAULT_EMBEDDING_DIM
+
+    def log_embedding_call(self, kind: str, count: int, latency: float) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT INTO embedding_calls (kind, count, latency) VALUES (?, ?, ?)", (kind, count, latency)
+            )
+            self._db.commit()
+
+    def embedding_latencies(self) -> Dict[str, List[Tuple[int, float]]]:
+        with self._db_lock:
+            rows = self._db.execute("SELECT kind, count, latency FROM embedding_calls").fetchall()
+        latencies: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for kind, count, latency in rows:
+            latencies[kind].append((count, latency))
+        return latencies
+
+
+# --------------------------------------------------------------------------
+# LLM 기록 / 재생 (BaseCache)
+# --------------------------------------------------------------------------
+
+class RecordingCache(BaseCache):
+    """항상 캐시 미스로 실제 호출을 진행시키고, 응답과 지연 시간을 기록"""
+
+    def __init__(self, store: FixtureStore, tier: str):
+        self.store = store
+        self.tier = tier
+        # 요청 키별 호출 시작 시각 (비동기 호출은 lookup/update 스레드가 다를 수 있어 키 기준 FIFO)
+        self._started: Dict[str, deque] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        with self._lock:
+            self._started[cache_key(prompt, llm_string)].append(time.perf_counter())
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            queue = self._started.get(key)
+            started = queue.popleft() if queue else None
+            if queue is not None and not queue:
+                del self._started[key]
+        self.store.append("llm_calls.jsonl", {
+            "key": key,
+            "model": _digest(llm_string),
+            "tier": self.tier,
+            "latency": round(time.perf_counter() - started, 4) if started is not None else None,
+            "generations": dumps(list(return_val))
+        })
+
+    def clear(self, **kwargs: Any) -> None:
+        pass
+
+
+class ReplayCache(BaseCache):
+    """기록된 응답 반환 (키 일치 우선, 없으면 같은 모델 설정의 다음 기록)"""
+
+    def __init__(self, store: FixtureStore, tier: str, latency: LatencyModel):
+        self.store = store
+        self.tier = tier
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, deque] = defaultdict(deque)
+        self._by_model: Dict[str, deque] = defaultdict(deque)
+        self._used = set()
+        self._records = [record for record in store.read("llm_calls.jsonl") if record.get("tier") == tier]
+        for index, record in enumerate(self._records):
+            self._by_key[record["key"]].append(index)
+            self._by_model[record["model"]].append(index)
+        self.stats = {"exact": 0, "sequential": 0, "misses": 0, "injected_seconds": 0.0}
+
+    def _take(self, queue: deque) -> Optional[int]:
+        while queue:
+            index = queue.popleft()
+            if index not in self._used:
+                self._used.add(index)
+                return index
+        return None
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            index = self._take(self._by_key.get(key, deque()))
+            kind = "exact"
+            if index is None:
+                # 앞선 재생 결과 차이로 요청이 달라진 경우: 같은 모델/호출 설정의 기록 순서대로
+                index = self._take(self._by_model.get(_digest(llm_string), deque()))
+                kind = "sequential"
+            if index is None:
+                self.stats["misses"] += 1
+            else:
+                self.stats[kind] += 1
+        if index is None:
+            raise ReplayMissError(f"재생할 LLM 기록이 없습니다 ({self.tier})")
+
+        record = self._records[index]
+        delay = self.latency.wait(record.get("latency"))
+        with self._lock:
+            self.stats["injected_seconds"] += delay
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return loads(record["generations"], allowed_objects=_CACHED_OBJECTS)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        pass
+
+    def clear(self, **kwargs: Any) -> None:
+        pass
+
+
+# --------------------------------------------------------------------------
+# 임베딩 기록 / 재생
+# --------------------------------------------------------------------------
+
+class RecordingEmbeddings(Embeddings):
+    """실제 임베딩 결과와 호출 지연 시간 기록"""
+
+    def __init__(self, base: Embeddings, model_key: str, store: FixtureStore):
+        self.base = base
+        self.model_key = model_key
+        self.store = store
+
+    def _record(self, kind: str, texts: List[str], vectors: List[List[float]], latency: float) -> None:
+        self.store.put_vectors([(_digest(self.model_key, kind, text), vector) for text, vector in zip(texts, vectors)])
+        self.store.log_embedding_call(kind, len(texts), latency)
+
+    def embed_documents(self, texts: List[str], **kwargs: Any) -> List[List[float]]:
+        started = time.perf_counter()
+        vectors = self.base.embed_documents(texts, **kwargs)
+        # task_type 등 추가 인자가 있으면 검색 쿼리 묶음 호출
+        self._record("query" if kwargs else "document", texts, vectors, time.perf_counter() - started)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        started = time.perf_counter()
+        vector = self.base.embed_query(text)
+        self._record("query", [text], [vector], time.perf_counter() - started)
+        return vector
+
+    async def aembed_documents(self, texts: List[str], **kwargs: Any) -> List[List[float]]:
+        started = time.perf_counter()
+        vectors = await self.base.aembed_documents(texts, **kwargs)
+        self._record("query" if kwargs else "document", texts, vectors, time.perf_counter() - started)
+        return vectors
+
+    async def aembed_query(self, text: str) -> List[float]:
+        started = time.perf_counter()
+        vector = await self.base.aembed_query(text)
+        self._record("query", [text], [vector], time.perf_counter() - started)
+        return vector
+
+
+class ReplayEmbeddings(Embeddings):
+    """기록된 벡터 반환 (기록에 없는 텍스트는 토큰 해시 기반 결정적 벡터로 대체)"""
+
+    def __init__(self, model_key: str, store: FixtureStore, latency: LatencyModel):
+        self.model_key = model_key
+        self.store = store
+        self.latency = latency
+        self.dim = store.embedding_dim()
+        # 기록된 호출의 텍스트당 평균 지연 (recorded 모드에서 호출 크기에 비례해 주입)
+        self._per_text = {
+            kind: sum(latency for _, latency in calls) / max(1, sum(count for count, _ in calls))
+            for kind, calls in store.embedding_latencies().items()
+        }
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _fallback(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in re.findall(r"\w+", text.lower()):
+            vector[int(_digest(token)[:8], 16) % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm > 0 else vector).tolist()
+
+    def _lookup(self, kind: str, texts: List[str]) -> List[List[float]]:
+        keys = [_digest(self.model_key, kind, text) for text in texts]
+        found = self.store.get_vectors(list(dict.fromkeys(keys)))
+        missing = sum(1 for key in keys if key not in found)
+        with self._lock:
+            self.stats["hits"] += len(keys) - missing
+            self.stats["misses"] += missing
+        if missing:
+            logger.debug("임베딩 재생 기록 없음 %d건 (대체 벡터 사용)", missing)
+        self.latency.wait(self._per_text.get(kind, 0.0) * len(texts))
+        return [found.get(key) or self._fallback(text) for key, text in zip(keys, texts)]
+
+    def embed_documents(self, texts: List[str], **kwargs: Any) -> List[List[float]]:
+        return self._lookup("query" if kwargs else "document", texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._lookup("query", [text])[0]
+
+    async def aembed_documents(self, texts: List[str], **kwargs: Any) -> List[List[float]]:
+        return self.embed_documents(texts, **kwargs)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return self.embed_query(text)
+
+
+# --------------------------------------------------------------------------
+# 외부 도구 기록 / 재생
+# --------------------------------------------------------------------------
+
+def _tool_key(tool_name: str, tool_input: Dict) -> str:
+    return _digest(tool_name, json.dumps(tool_input, ensure_ascii=False, sort_keys=True, default=str))
+
+
+def recording_tool_func(tool_name: str, invoke: Callable[[Dict], Any], store: FixtureStore) -> Callable[..., Any]:
+    """도구 호출 함수를 감싸 입력/출력/지연 시간 기록"""
+    def func(**kwargs: Any) -> Any:
+        started = time.perf_counter()
+        output = invoke(kwargs)
+        store.append("tool_calls.jsonl", {
+            "tool": tool_name,
+            "key": _tool_key(tool_name, kwargs),
+            "input": kwargs,
+            "latency": round(time.perf_counter() - started, 4),
+            "output": output
+        })
+        return output
+    return func
+
+
+def replay_tool_func(tool_name: str, store: FixtureStore, latency: LatencyModel) -> Callable[..., Any]:
+    """기록된 도구 출력 반환 (입력 일치 우선, 없으면 기록 순서대로)"""
+    records = [record for record in store.read("tool_calls.jsonl") if record.get("tool") == tool_name]
+    by_key: Dict[str, deque] = defaultdict(deque)
+    for index, record in enumerate(records):
+        by_key[record["key"]].append(index)
+    order = deque(range(len(records)))
+    used = set()
+    lock = threading.Lock()
+
+    def take(queue: deque) -> Optional[int]:
+        while queue:
+            index = queue.popleft()
+            if index not in used:
+                used.add(index)
+                return index
+        return None
+
+    def func(**kwargs: Any) -> Any:
+        with lock:
+            index = take(by_key.get(_tool_key(tool_name, kwargs), deque()))
+            if index is None:
+                index = take(order)
+        if index is None:
+            return {"results": [], "error": f"재생할 {tool_name} 기록이 없습니다"}
+        latency.wait(records[index].get("latency"))
+        return records[index]["output"]
+    return func
+
+
+# --------------------------------------------------------------------------
+# 전역 저장소 / 지연 모델
+# --------------------------------------------------------------------------
+
+_global_store: Optional[FixtureStore] = None
+_global_latency: Optional[LatencyModel] = None
+_replay_lock = threading.Lock()
+
+
+def get_fixture_store() -> FixtureStore:
+    """LLM_FIXTURE_DIR의 기록 저장소 (record/replay 모드에서만 사용)"""
+    global _global_store
+
+    if _global_store is not None:
+        return _global_store
+
+    with _replay_lock:
+        if _global_store is None:
+            directory = env_str("LLM_FIXTURE_DIR")
+            if not directory:
+                raise ValueError("LLM_MODE=record/replay에는 LLM_FIXTURE_DIR 설정이 필요합니다")
+            _global_store = FixtureStore(directory, get_llm_mode())
+            logger.info("LLM 기록 저장소 (%s): %s", _global_store.mode, directory)
+        return _global_store
+
+
+def get_replay_latency() -> LatencyModel:
+    """LLM_REPLAY_LATENCY 사양의 지연 모델 (LLM_REPLAY_SEED로 재현 가능)"""
+    global _global_latency
+
+    if _global_latency is not None:
+        return _global_latency
+
+    with _replay_lock:
+        if _global_latency is None:
+            seed = env_str("LLM_REPLAY_SEED")
+            _global_latency = LatencyModel.from_spec(
+                env_str("LLM_REPLAY_LATENCY"), int(seed) if seed else None
+            )
+        return _global_latency
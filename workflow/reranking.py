@@ -0,0 +1,75 @@
+"""
+검색 결과 다양성 재정렬 (MMR, Maximal Marginal Relevance)
+- 후보 풀(search_k)에서 관련도는 높으면서 이미 고른 결과와 덜 비슷한 문서를 순서대로 선택
+- 거의 같은 내용의 아티팩트(같은 파일의 반복 기록 등)가 결과 자리를 독차지하지 않도록 함
+- 저장된 문서 임베딩을 사용하며 NumPy로 벡터화 (후보 수 n, 선택 수 k일 때 O(n·d + k·n))
+"""
+from typing import List, Optional, Sequence
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_relevance(relevance: Sequence[float]) -> np.ndarray:
+    """관련도 점수를 0~1로 정규화 (모두 같으면 1)"""
+    scores = np.asarray(relevance, dtype=np.float64)
+    low, high = scores.min(), scores.max()
+    if high - low < 1e-12:
+        return np.ones_like(scores)
+    return (scores - low) / (high - low)
+
+
+def mmr_select(
+    relevance: Sequence[float],
+    embeddings: np.ndarray,
+    k: int,
+    diversity: float,
+    available: Optional[np.ndarray] = None
+) -> List[int]:
+    """
+    MMR로 후보 k개 선택
+
+    점수 = (1 - diversity) × 관련도 - diversity × max(이미 선택한 결과와의 코사인 유사도)
+
+    Args:
+        relevance: 후보별 관련도 (클수록 관련, 기존 순위 점수 그대로 사용)
+        embeddings: 후보 임베딩 (n × d)
+        k: 선택할 개수
+        diversity: 0이면 관련도 순서 그대로, 1에 가까울수록 다양성 우선
+        available: 임베딩이 있는 후보 여부 (False인 후보는 유사도 0으로 취급)
+
+    Returns:
+        선택 순서대로 정렬된 후보 인덱스
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    scores = _normalize_relevance(relevance)
+    if diversity <= 0 or n == 1:
+        return [int(i) for i in np.argsort(-scores, kind="stable")[:k]]
+
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms > 0, norms, 1.0)
+    if available is not None:
+        vectors[~available] = 0.0
+
+    weight = 1.0 - diversity
+    max_similarity = np.zeros(n, dtype=np.float64)
+    selected_mask = np.zeros(n, dtype=bool)
+    selected: List[int] = []
+
+    for _ in range(k):
+        mmr = weight * scores - diversity * max_similarity
+        mmr[selected_mask] = -np.inf
+        best = int(np.argmax(mmr))
+        selected.append(best)
+        selected_mask[best] = True
+        # 새로 고른 문서와의 유사도로 갱신 (행렬 전체 대신 한 행씩 계산)
+        np.maximum(max_similarity, vectors @ vectors[best], out=max_similarity)
+
+    return selected
@@ -0,0 +1,293 @@
+"""
+검색 결과 압축 포맷터 (ToolMessage 토큰 절감)
+- artifact_type별로 묶어 간결한 표로 출력
+- 모두 비어있는 컬럼은 제거, 모든 행이 같은 값인 컬럼은 '공통' 줄로 이동
+- 긴 값은 잘라내고 생략 표시
+- 토큰 예산을 넘으면 유사도가 낮은 행부터 제외
+- 시간 창 조회 결과(시간순 표), ID 조회 결과(원본 JSON), 엔티티 추적 결과(시간순 표) 포맷
+"""
+from typing import Dict, List, Optional, Tuple
+import json
+import math
+
+from workflow.tool_digest import estimate_tokens
+from workflow.utils import env_int
+
+
+# --------------------------------------------------------------------------
+# 포맷 설정
+# --------------------------------------------------------------------------
+
+MAX_CELL_CHARS = 80  # 셀 값 최대 길이 (초과 시 잘라냄)
+DEFAULT_CONTEXT_WINDOW_TOKENS = 200_000  # 에이전트 컨텍스트 한도 (AGENT_CONTEXT_WINDOW_TOKENS)
+RESULT_BUDGET_RATIO = 0.1  # 남은 컨텍스트 중 검색 결과 1회에 허용하는 비율
+MIN_RESULT_TOKENS = 1_000
+DEFAULT_MAX_RESULT_TOKENS = 12_000  # 검색 결과 1회 최대 토큰 (SEARCH_RESULT_MAX_TOKENS)
+
+# 표 컬럼에서 제외하는 필드 (별도로 표시하거나 내부용)
+_RESERVED_FIELDS = ("id", "artifact_type", "similarity", "relevance", "matched_goals")
+
+
+def derive_token_budget(used_tokens: int = 0) -> int:
+    """
+    현재까지 사용한 컨텍스트 토큰으로부터 검색 결과 1회분 토큰 예산 산출
+
+    환경 변수는 호출 시점에 읽음 (.env는 workflow.utils import 시 로드되므로 모듈 import 시점에는 없을 수 있음)
+    """
+    context_window = env_int("AGENT_CONTEXT_WINDOW_TOKENS", DEFAULT_CONTEXT_WINDOW_TOKENS)
+    max_tokens = env_int("SEARCH_RESULT_MAX_TOKENS", DEFAULT_MAX_RESULT_TOKENS)
+    remaining = max(0, context_window - used_tokens)
+    budget = int(remaining * RESULT_BUDGET_RATIO)
+    return max(MIN_RESULT_TOKENS, min(budget, max_tokens))
+
+
+def _cell(value) -> str:
+    """표 셀 문자열 변환 (개행/구분자 제거, 길이 제한)"""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        value = ",".join(str(v) for v in value)
+    text = str(value).replace("\n", " ").replace("|", "/").strip()
+    if len(text) > MAX_CELL_CHARS:
+        return f"{text[:MAX_CELL_CHARS]}…(+{len(text) - MAX_CELL_CHARS}자)"
+    return text
+
+
+def _render_group(artifact_type: str, rows: List[Dict]) -> List[str]:
+    """artifact_type 하나를 표로 렌더링"""
+    columns: List[str] = []
+    for row in rows:
+        for key in row:
+            if key not in _RESERVED_FIELDS and key not in columns:
+                columns.append(key)
+
+    # 빈 컬럼 제거, 상수 컬럼은 공통 줄로 이동
+    table_columns = []
+    constants = []
+    for col in columns:
+        values = [_cell(row.get(col)) for row in rows]
+        non_empty = {v for v in values if v}
+        if not non_empty:
+            continue
+        if len(rows) > 1 and len(non_empty) == 1 and all(values):
+            constants.append(f"{col}={values[0]}")
+        else:
+            table_columns.append(col)
+
+    has_goals = any(row.get("matched_goals") for row in rows)
+    header = ["id"] + table_columns + (["goals"] if has_goals else [])
+
+    lines = [f"[{artifact_type}] {len(rows)}건"]
+    if constants:
+        lines.append(f"공통: {'; '.join(constants)}")
+    lines.append("| " + " | ".join(header) + " |")
+    lines.append("|" + "---|" * len(header))
+    for row in rows:
+        cells = [_cell(row.get("id"))] + [_cell(row.get(col)) for col in table_columns]
+        if has_goals:
+            cells.append(_cell(row.get("matched_goals")))
+        lines.append("| " + " | ".join(cells) + " |")
+    return lines
+
+
+def _render(result: Dict, rows: List[Dict], omitted: List) -> str:
+    lines = [result.get("message", "")]
+
+    for goal in result.get("goals", []) or []:
+        cursor = f", next_cursor={goal['next_cursor']}" if goal.get("next_cursor") else ""
+        lines.append(
+            f"- 목표 {goal.get('index')}: {goal.get('goal')} → {goal.get('returned', 0)}건"
+            f" (query: {goal.get('query_text')}{cursor})"
+        )
+
+    groups: Dict[str, List[Dict]] = {}
+    for row in rows:
+        groups.setdefault(row.get("artifact_type", "unknown"), []).append(row)
+    for artifact_type, group_rows in groups.items():
+        lines.append("")
+        lines.extend(_render_group(artifact_type, group_rows))
+
+    shown_ids = result.get("already_shown_ids") or []
+    if shown_ids:
+        lines.append("")
+        lines.append(f"이미 확인한 아티팩트(ID만): {', '.join(shown_ids)}")
+    if result.get("next_cursor"):
+        lines.append(f"next_cursor: {result['next_cursor']}")
+    if omitted:
+        # 생략한 행은 표시 완료로 기록하지 않음 → 같은 검색을 다시 하거나 ID로 조회하면 원문을 받음
+        lines.append(
+            f"(토큰 예산 초과로 유사도 하위 {len(omitted)}건 생략 — get_artifacts_by_ids_tool로 조회: "
+            f"{', '.join(map(str, omitted))})"
+        )
+    return "\n".join(lines)
+
+
+def format_search_result(result: Dict, token_budget: Optional[int] = None) -> str:
+    """
+    검색 결과 dict를 토큰 예산 내의 압축 텍스트로 변환
+
+    Args:
+        result: search/batch/next-page 도구의 결과 dict
+        token_budget: 최대 토큰 수 (None이면 derive_token_budget() 기본값)
+
+    Returns:
+        ToolMessage에 들어갈 문자열
+    """
+    return fit_search_result(result, token_budget)[0]
+
+
+def fit_search_result(result: Dict, token_budget: Optional[int] = None) -> Tuple[str, List]:
+    """
+    format_search_result와 같은 변환 + 실제로 표에 들어간 아티팩트 ID
+
+    Returns:
+        (ToolMessage에 들어갈 문자열, 표에 포함된 아티팩트 ID 목록 - 예산 초과로 생략한 행 제외)
+    """
+    if token_budget is None:
+        token_budget = derive_token_budget()
+
+    artifacts = list(result.get("artifacts", []) or [])
+    # 융합 점수(모든 행에 있을 때) 또는 유사도 내림차순 (정보가 없으면 원래 순서 유지)
+    score_field = "relevance" if artifacts and all(
+        artifact.get("relevance") is not None for artifact in artifacts
+    ) else "similarity"
+    ranked = sorted(
+        enumerate(artifacts),
+        key=lambda item: (-(item[1].get(score_field) or 0.0), item[0])
+    )
+    rows = [artifact for _, artifact in ranked]
+
+    text = _render(result, rows, [])
+    ranked_ids = [artifact.get("id", "unknown") for artifact in rows]
+    while estimate_tokens(text) > token_budget and rows:
+        drop = max(1, math.ceil(len(rows) * 0.1))
+        rows = rows[:-drop]
+        text = _render(result, rows, ranked_ids[len(rows):])
+    return text, ranked_ids[:len(rows)]
+
+
+def _format_delta(seconds: float) -> str:
+    """기준 시각과의 차이 (+초 / -분 단위 표기)"""
+    sign = "+" if seconds >= 0 else "-"
+    seconds = abs(int(round(seconds)))
+    if seconds < 60:
+        return f"{sign}{seconds}s"
+    minutes, sec = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{sign}{minutes}m{sec:02d}s" if sec else f"{sign}{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    return f"{sign}{hours}h{minutes:02d}m"
+
+
+def _render_timeline(result: Dict, rows: List[Dict], omitted: int) -> str:
+    lines = [result.get("message", "")]
+    for anchor in result.get("anchors", []) or []:
+        lines.append(f"- 기준 {anchor.get('label')}: {anchor.get('datetime')}")
+    lines.append("")
+    lines.append("| 시각 | Δ | id | artifact_type | 내용 |")
+    lines.append("|---|---|---|---|---|")
+    for row in rows:
+        summary = "; ".join(f"{key}={value}" for key, value in (row.get("fields") or {}).items())
+        marker = " *" if row.get("is_anchor") else ""
+        lines.append(
+            f"| {_cell(row.get('datetime'))} | {_format_delta(row.get('delta', 0.0))} "
+            f"| {_cell(row.get('id'))}{marker} | {_cell(row.get('artifact_type'))} | {_cell(summary)} |"
+        )
+    if omitted:
+        lines.append(f"(토큰 예산 초과로 기준 시각에서 먼 {omitted}건 생략 — 시간 창을 좁혀 다시 조회)")
+    return "\n".join(lines)
+
+
+def format_timeline_result(result: Dict, token_budget: Optional[int] = None) -> str:
+    """
+    시간 창 조회 결과를 시간순 표로 변환 (* 표시는 기준 아티팩트)
+
+    토큰 예산을 넘으면 기준 시각과의 차이(|Δ|)가 큰 행부터 제외합니다.
+    """
+    if token_budget is None:
+        token_budget = derive_token_budget()
+
+    all_rows = list(result.get("rows", []) or [])
+    rows = all_rows
+    text = _render_timeline(result, rows, 0)
+    while estimate_tokens(text) > token_budget and rows:
+        drop = max(1, math.ceil(len(rows) * 0.1))
+        farthest = sorted(range(len(rows)), key=lambda i: -abs(rows[i].get("delta", 0.0)))[:drop]
+        removed = set(farthest)
+        rows = [row for i, row in enumerate(rows) if i not in removed]
+        text = _render_timeline(result, rows, len(all_rows) - len(rows))
+    return text
+
+
+def _render_entity_trace(result: Dict, rows: List[Dict], omitted: int) -> str:
+    lines = [result.get("message", "")]
+    related = result.get("related") or []
+    if related:
+        lines.append("- 함께 나타난 엔티티: " + ", ".join(f"{key}({count})" for key, count in related))
+    lines.append("")
+    lines.append("| 시각 | id | artifact_type | 일치 | 내용 |")
+    lines.append("|---|---|---|---|---|")
+    half = (len(rows) + 1) // 2
+    for i, row in enumerate(rows):
+        if omitted and i == half:
+            lines.append(f"| … | (중간 {omitted}건 생략) | | | |")
+        summary = "; ".join(f"{key}={value}" for key, value in (row.get("fields") or {}).items())
+        lines.append(
+            f"| {_cell(row.get('datetime'))} | {_cell(row.get('id'))} | {_cell(row.get('artifact_type'))} "
+            f"| {_cell(row.get('matched'))} | {_cell(summary)} |"
+        )
+    if omitted:
+        lines.append("(토큰 예산 초과로 중간 기록 생략 — artifact_types로 좁혀 다시 조회)")
+    return "\n".join(lines)
+
+
+def format_entity_trace(result: Dict, token_budget: Optional[int] = None) -> str:
+    """
+    엔티티 추적 결과를 시간순 표로 변환
+
+    토큰 예산을 넘으면 처음(유입)과 마지막(삭제/유출) 기록을 남기고 중간 행부터 제외합니다.
+    """
+    if token_budget is None:
+        token_budget = derive_token_budget()
+
+    all_rows = list(result.get("rows", []) or [])
+    rows = all_rows
+    text = _render_entity_trace(result, rows, 0)
+    while estimate_tokens(text) > token_budget and rows:
+        keep = len(rows) - max(1, math.ceil(len(rows) * 0.1))
+        head = (keep + 1) // 2
+        rows = rows[:head] + rows[len(rows) - (keep - head):] if keep > head else rows[:head]
+        text = _render_entity_trace(result, rows, len(all_rows) - len(rows))
+    return text
+
+
+def format_artifact_records(
+    records: List[Dict],
+    missing: List[str],
+    token_budget: Optional[int] = None
+) -> str:
+    """
+    원본 아티팩트 레코드를 ID별 JSON 한 줄로 변환 (값은 잘라내지 않음)
+
+    토큰 예산을 넘으면 뒤쪽 레코드부터 ID만 남기고 생략합니다.
+    """
+    if token_budget is None:
+        token_budget = derive_token_budget()
+
+    def _render(kept: List[Dict]) -> str:
+        lines = [f"✅ {len(records)}개 원본 아티팩트 조회"]
+        for record in kept:
+            lines.append(json.dumps(record, ensure_ascii=False, default=str))
+        omitted = [str(record.get("id")) for record in records[len(kept):]]
+        if omitted:
+            lines.append(f"(토큰 예산 초과로 생략 — 나누어 다시 조회: {', '.join(omitted)})")
+        if missing:
+            lines.append(f"찾을 수 없는 ID: {', '.join(missing)}")
+        return "\n".join(lines)
+
+    kept = list(records)
+    text = _render(kept)
+    while estimate_tokens(text) > token_budget and kept:
+        kept = kept[:-max(1, math.ceil(len(kept) * 0.1))]
+        text = _render(kept)
+    return text
@@ -0,0 +1,356 @@
+"""
+규칙 기반 Query Planner (LLM 호출 없는 빠른 경로)
+- 메타데이터의 artifact_type 목록과 매칭하여 타입 필터 추출
+- ISO / 한국어 / 상대 날짜 표현에서 시간 범위 추출
+- 신뢰도가 낮으면 None을 반환하여 LLM Planner로 폴백
+"""
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+import logging
+import re
+import threading
+
+from workflow.classes import StructuredQuery
+from workflow.utils import env_flag, env_float
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------------------------------
+# 규칙 설정
+# --------------------------------------------------------------------------
+
+DEFAULT_MIN_CONFIDENCE = 0.6  # 이 값 미만이면 LLM Planner로 폴백
+DEFAULT_MAX_RESULTS = 30
+DEFAULT_SIMILARITY_THRESHOLD = 0.3
+
+# 타입 이름 매칭 시 무시하는 일반 토큰
+GENERIC_TYPE_TOKENS = {"file", "files", "data", "record", "records", "log", "logs", "info", "entries", "bin"}
+
+# 자연어 키워드 → 타입 이름 토큰
+TYPE_KEYWORD_ALIASES: Dict[str, List[str]] = {
+    "usb": ["usb", "유에스비", "이동식", "외장"],
+    "prefetch": ["prefetch", "프리패치", "프로그램 실행"],
+    "lnk": ["lnk", "바로가기", "링크 파일"],
+    "download": ["download", "다운로드"],
+    "history": ["history", "히스토리", "방문", "접속 기록"],
+    "recycle": ["recycle", "휴지통"],
+    "mft": ["mft"],
+    "deleted": ["deleted", "삭제"],
+    "messenger": ["messenger", "메신저"],
+    "kakao": ["kakao", "카카오"],
+    "discord": ["discord", "디스코드"],
+    "telegram": ["telegram", "텔레그램"],
+    "chrome": ["chrome", "크롬", "브라우저", "browser", "웹사이트"],
+    "edge": ["edge", "엣지", "브라우저", "browser", "웹사이트"],
+    "firefox": ["firefox", "파이어폭스", "브라우저", "browser", "웹사이트"],
+    "whale": ["whale", "웨일", "브라우저", "browser", "웹사이트"],
+}
+
+# 복합/부정 조건 → 규칙으로 처리하기 어려움 (신뢰도 감점)
+COMPLEX_MARKERS = ["제외", "아닌", "말고", "또는", "의심", "비정상", "연관", " or ", " not "]
+
+AFTER_MARKERS = ("이후", "부터", "after", "since", "from")
+BEFORE_MARKERS = ("이전", "까지", "before", "until")
+
+_ISO_DATE = r"(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?:[T ](\d{1,2}):(\d{2})(?::(\d{2}))?)?"
+_KOREAN_DATE = r"(\d{4})년\s*(\d{1,2})월(?:\s*(\d{1,2})일)?(?:\s*(오전|오후)?\s*(\d{1,2})시)?"
+_RELATIVE = r"(최근|지난)\s*(\d+)\s*(일|주|개월|달|시간)"
+_RANGE_SEPARATOR = r"[~∼〜–—-]"  # 두 날짜 사이의 범위 기호 ("2025-09-23 ~ 2025-09-25")
+
+
+@dataclass
+class RulePlan:
+    """규칙 기반 계획 결과"""
+    query: StructuredQuery
+    confidence: float
+    reasons: List[str] = field(default_factory=list)
+
+
+# --------------------------------------------------------------------------
+# 추출 함수
+# --------------------------------------------------------------------------
+
+def _normalize_token(token: str) -> str:
+    token = token.lower()
+    if len(token) > 3 and token.endswith("s"):
+        token = token[:-1]
+    return token
+
+
+def _type_tokens(artifact_type: str) -> Set[str]:
+    """artifact_type 이름을 의미 토큰으로 분해 (예: 'Chrome.downloads' → {'chrome', 'download'})"""
+    tokens = {_normalize_token(t) for t in re.split(r"[._\-\s]+", artifact_type) if t}
+    significant = {t for t in tokens if t not in {_normalize_token(g) for g in GENERIC_TYPE_TOKENS}}
+    return significant or tokens
+
+
+def extract_artifact_types(goal: str, known_types: List[str]) -> Tuple[List[str], bool, List[str]]:
+    """
+    검색 목표에서 artifact_type 추출
+
+    Returns:
+        (매칭된 타입 리스트, 타입 이름이 그대로 언급되었는지 여부, 매칭에 사용된 원문 표현)
+    """
+    lowered = goal.lower()
+
+    # 1) 타입 이름이 그대로 언급된 경우 (가장 확실함)
+    explicit = [t for t in known_types if t.lower() in lowered]
+    if explicit:
+        return sorted(explicit), True, explicit
+
+    # 2) 키워드 별칭 → 타입 토큰 매칭 (타입의 모든 의미 토큰이 언급되어야 함)
+    goal_tokens = {_normalize_token(t) for t in re.findall(r"[A-Za-z0-9]+", lowered)}
+    matched_phrases = []
+    for canonical, aliases in TYPE_KEYWORD_ALIASES.items():
+        for alias in aliases:
+            if alias in lowered:
+                goal_tokens.add(_normalize_token(canonical))
+                matched_phrases.append(alias)
+
+    matched = [t for t in known_types if _type_tokens(t) <= goal_tokens]
+    return sorted(matched), False, matched_phrases
+
+
+def _day_range(dt: datetime) -> Tuple[datetime, datetime]:
+    start = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, start + timedelta(days=1) - timedelta(seconds=1)
+
+
+def _month_range(year: int, month: int) -> Tuple[datetime, datetime]:
+    start = datetime(year, month, 1)
+    next_month = datetime(year + (month == 12), month % 12 + 1, 1)
+    return start, next_month - timedelta(seconds=1)
+
+
+def _parse_reference_time(metadata_info: Dict) -> datetime:
+    """상대 날짜의 기준 시각: 수집 데이터의 최신 시각 (없으면 현재 시각)"""
+    latest = (metadata_info.get("datetime_range") or {}).get("latest")
+    if latest:
+        try:
+            parsed = datetime.fromisoformat(str(latest).replace("Z", "+00:00"))
+            return parsed.replace(tzinfo=None)
+        except ValueError:
+            pass
+    return datetime.now()
+
+
+def extract_datetime_range(
+    goal: str,
+    reference: datetime
+) -> Tuple[Optional[str], Optional[str], List[str]]:
+    """
+    검색 목표에서 시간 범위 추출 (ISO, 한국어, 상대 표현)
+
+    Returns:
+        (시작 ISO 문자열, 종료 ISO 문자열, 매칭된 원문 표현)
+    """
+    ranges: List[Tuple[datetime, datetime, int, int]] = []  # (start, end, 원문 시작, 원문 끝)
+
+    for m in re.finditer(_ISO_DATE, goal):
+        try:
+            year, month, day = int(m.group(1)), int(m.group(2)), int(m.group(3))
+            if m.group(4):
+                # 표기된 정밀도(분 / 초)만큼의 구간 (한 시각으로 두면 그 초의 기록만 일치)
+                start = datetime(year, month, day, int(m.group(4)), int(m.group(5)), int(m.group(6) or 0))
+                end = start if m.group(6) else start + timedelta(minutes=1) - timedelta(seconds=1)
+                ranges.append((start, end, m.start(), m.end()))
+            else:
+                start, end = _day_range(datetime(year, month, day))
+                ranges.append((start, end, m.start(), m.end()))
+        except ValueError:
+            continue
+
+    for m in re.finditer(_KOREAN_DATE, goal):
+        try:
+            year, month = int(m.group(1)), int(m.group(2))
+            if not m.group(3):
+                start, end = _month_range(year, month)
+            elif m.group(5):
+                hour = int(m.group(5))
+                if m.group(4) == "오후" and hour < 12:
+                    hour += 12
+                elif m.group(4) == "오전" and hour == 12:
+                    hour = 0
+                start = datetime(year, month, int(m.group(3)), hour)
+                end = start + timedelta(hours=1) - timedelta(seconds=1)
+            else:
+                start, end = _day_range(datetime(year, month, int(m.group(3))))
+            ranges.append((start, end, m.start(), m.end()))
+        except ValueError:
+            continue
+
+    for m in re.finditer(_RELATIVE, goal):
+        amount, unit = int(m.group(2)), m.group(3)
+        delta = {
+            "일": timedelta(days=amount),
+            "주": timedelta(weeks=amount),
+            "개월": timedelta(days=30 * amount),
+            "달": timedelta(days=30 * amount),
+            "시간": timedelta(hours=amount),
+        }[unit]
+        ranges.append((reference - delta, reference, m.start(), m.end()))
+
+    for word, days_ago in (("오늘", 0), ("어제", 1)):
+        idx = goal.find(word)
+        if idx >= 0:
+            start, end = _day_range(reference - timedelta(days=days_ago))
+            ranges.append((start, end, idx, idx + len(word)))
+
+    if not ranges:
+        return None, None, []
+
+    ranges.sort(key=lambda r: r[2])
+    matched_text = [goal[s:e] for _, _, s, e in ranges]
+    first_start, first_end, _, first_stop = ranges[0]
+    last_start, last_end, _, last_stop = ranges[-1]
+
+    if len(ranges) >= 2:
+        # 두 시점 이상: 첫 시점 ~ 마지막 시점
+        start, end = first_start, last_end
+    else:
+        # 단일 시점: 바로 뒤 표현으로 방향 결정
+        tail = goal[first_stop:first_stop + 6].lower()
+        if any(marker in tail for marker in AFTER_MARKERS):
+            start, end = first_start, None
+        elif any(marker in tail for marker in BEFORE_MARKERS):
+            start, end = None, first_end
+        else:
+            start, end = first_start, first_end
+
+    return (
+        start.isoformat() if start else None,
+        end.isoformat() if end else None,
+        matched_text
+    )
+
+
+def _residual_query_text(goal: str, removed: List[str], type_names: List[str]) -> str:
+    """날짜/방향 표현과 명시된 타입 이름을 제거한 벡터 검색용 텍스트"""
+    text = goal
+    for phrase in sorted(removed, key=len, reverse=True):
+        text = text.replace(phrase, "\x00")
+    # 날짜 사이의 범위 기호도 날짜와 함께 제거
+    text = re.sub(rf"\x00\s*{_RANGE_SEPARATOR}\s*(?=\x00)", " ", text).replace("\x00", " ")
+    for marker in AFTER_MARKERS + BEFORE_MARKERS:
+        text = re.sub(rf"(?<!\w){re.escape(marker)}(?!\w)", " ", text)
+    without_dates = re.sub(r"\s+", " ", text).strip()
+
+    for name in type_names:
+        text = re.sub(rf"{re.escape(name)}(에서|의|에)?", " ", text, flags=re.IGNORECASE)
+    without_types = re.sub(r"\s+", " ", text).strip()
+
+    # 타입 이름만 남는 목표는 타입 이름을 그대로 검색어로 사용
+    return without_types or without_dates or goal
+
+
+# --------------------------------------------------------------------------
+# 규칙 기반 Planner
+# --------------------------------------------------------------------------
+
+class RuleBasedPlanner:
+    """결정적(deterministic) 쿼리 계획기 + 적중률 통계 (스레드 안전)"""
+
+    def __init__(self, min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self._lock = threading.Lock()
+        self.stats = {"rule_hits": 0, "llm_fallbacks": 0}
+
+    @classmethod
+    def from_env(cls) -> "RuleBasedPlanner":
+        """환경 변수 기반 생성"""
+        return cls(min_confidence=env_float("RULE_PLANNER_MIN_CONFIDENCE", DEFAULT_MIN_CONFIDENCE))
+
+    def analyze(self, goal: str, metadata_info: Dict) -> RulePlan:
+        """검색 목표를 분석하여 계획과 신뢰도 산출 (통계에는 반영하지 않음)"""
+        known_types = metadata_info.get("artifact_types", []) or []
+        reasons = []
+        confidence = 0.0
+
+        types, explicit, type_phrases = extract_artifact_types(goal, known_types)
+        if types:
+            confidence += 0.6 if explicit else 0.5
+            reasons.append(f"타입 {'명시' if explicit else '키워드'} 매칭: {types}")
+
+        reference = _parse_reference_time(metadata_info)
+        start, end, date_phrases = extract_datetime_range(goal, reference)
+        if start or end:
+            confidence += 0.3
+            reasons.append(f"시간 범위: {start} ~ {end}")
+
+        query_text = _residual_query_text(goal, date_phrases, type_phrases if explicit else [])
+        residual = query_text
+        for phrase in type_phrases:
+            residual = re.sub(re.escape(phrase), " ", residual, flags=re.IGNORECASE)
+        if len(residual.split()) <= 4:
+            confidence += 0.2
+            reasons.append("단순 목표")
+
+        lowered = f" {goal.lower()} "
+        if any(marker in lowered for marker in COMPLEX_MARKERS):
+            confidence -= 0.3
+            reasons.append("복합/부정 조건 포함")
+
+        # 타입을 찾지 못하면 필터 없는 검색이 되므로 규칙 경로를 사용하지 않음
+        if not types:
+            confidence = min(confidence, 0.0)
+
+        query = StructuredQuery(
+            query_text=query_text,
+            filter_artifact_types=types or None,
+            filter_datetime_start=start,
+            filter_datetime_end=end,
+            max_results=DEFAULT_MAX_RESULTS,
+            similarity_threshold=DEFAULT_SIMILARITY_THRESHOLD
+        )
+        return RulePlan(query=query, confidence=round(max(0.0, min(confidence, 1.0)), 2), reasons=reasons)
+
+    def plan(self, goal: str, metadata_info: Dict) -> Optional[Dict]:
+        """신뢰도가 충분하면 StructuredQuery dict, 아니면 None (LLM 폴백)"""
+        result = self.analyze(goal, metadata_info)
+
+        with self._lock:
+            if result.confidence >= self.min_confidence:
+                self.stats["rule_hits"] += 1
+            else:
+                self.stats["llm_fallbacks"] += 1
+
+        if result.confidence < self.min_confidence:
+            logger.debug("규칙 기반 계획 신뢰도 부족 (%.2f): %s", result.confidence, result.reasons)
+            return None
+
+        logger.info("규칙 기반 계획 사용 (신뢰도 %.2f): %s", result.confidence, result.reasons)
+        return result.query.model_dump()
+
+    def get_stats(self) -> Dict:
+        """규칙 경로 적중률 (LLM 호출 제거 비율)"""
+        with self._lock:
+            stats = dict(self.stats)
+        total = stats["rule_hits"] + stats["llm_fallbacks"]
+        stats["hit_rate"] = stats["rule_hits"] / total if total else 0.0
+        return stats
+
+
+# --------------------------------------------------------------------------
+# 전역 Planner
+# --------------------------------------------------------------------------
+
+_global_rule_planner: Optional[RuleBasedPlanner] = None
+_planner_lock = threading.Lock()
+
+
+def get_rule_planner() -> Optional[RuleBasedPlanner]:
+    """전역 규칙 기반 Planner 반환 (RULE_PLANNER_ENABLED=0이면 None)"""
+    global _global_rule_planner
+
+    if not env_flag("RULE_PLANNER_ENABLED", default=True):
+        return None
+
+    if _global_rule_planner is not None:
+        return _global_rule_planner
+
+    with _planner_lock:
+        if _global_rule_planner is None:
+            _global_rule_planner = RuleBasedPlanner.from_env()
+        return _global_rule_planner
@@ -0,0 +1,169 @@
+"""
+StructuredQuery 검색 결과 캐시
+- 키: (컬렉션 이름, 저장된 데이터 버전, 정규화된 StructuredQuery)
+- 값: 유사도 순으로 정렬된 (Document, 거리) 목록 전체
+- max_results / similarity_threshold / offset은 키에서 제외 → 캐시된 목록을 잘라서 응답
+- 데이터 버전은 DB에 저장된 상태(컬렉션 ID, 문서 수)에서 계산 → 다른 프로세스가 저장/삭제해도
+  이전 결과는 조회되지 않음 (LRU로 자연 소멸)
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+import json
+import logging
+import re
+import threading
+
+from workflow.database import datetime_to_timestamp
+from workflow.utils import env_int
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_SEARCH_CACHE_SIZE = 128  # 최대 캐시 항목 수 (0이면 비활성화)
+
+
+# --------------------------------------------------------------------------
+# 키 생성
+# --------------------------------------------------------------------------
+
+def search_cache_key(
+    collection_name: str,
+    data_version: str,
+    persist_directory: str,
+    structured_query: Dict
+) -> str:
+    """검색 결과 캐시 키 생성 (결과 개수/임계값 관련 필드는 제외)"""
+    query_text = re.sub(r"\s+", " ", structured_query.get("query_text", "") or "").strip()
+    filter_types = sorted(structured_query.get("filter_artifact_types") or [])
+    normalized = {
+        "query_text": query_text,
+        "filter_artifact_types": filter_types,
+        # 같은 시각의 다른 표기(ISO, 공백 구분 등)를 하나로 맞춤
+        "start": datetime_to_timestamp(structured_query.get("filter_datetime_start")),
+        "end": datetime_to_timestamp(structured_query.get("filter_datetime_end")),
+    }
+    raw = json.dumps(normalized, ensure_ascii=False, sort_keys=True)
+    return f"{persist_directory}:{collection_name}:{data_version}:{raw}"
+
+
+# --------------------------------------------------------------------------
+# 캐시
+# --------------------------------------------------------------------------
+
+@dataclass
+class CachedHits:
+    """벡터 검색 1회분 결과 (거리 오름차순)"""
+    hits: List[Tuple[Any, float]]
+    k: int  # 검색에 사용한 k
+
+    @property
+    def exhausted(self) -> bool:
+        """필터를 통과한 문서를 모두 가져왔는지 (k보다 적게 반환된 경우)"""
+        return len(self.hits) < self.k
+
+    def covers(self, needed: int, distance_threshold: float) -> bool:
+        """offset + max_results개(+다음 페이지 여부)를 이 목록만으로 판단할 수 있는지"""
+        if self.exhausted:
+            return True
+        passed = sum(1 for _, score in self.hits if score <= distance_threshold)
+        # 임계값을 넘는 결과가 목록 안에 있으면 그 뒤는 모두 탈락
+        return passed > needed or passed < len(self.hits)
+
+
+class SearchResultCache:
+    """검색 결과 LRU 캐시 (스레드 안전)"""
+
+    def __init__(self, max_size: int = DEFAULT_SEARCH_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, CachedHits]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def from_env(cls) -> "SearchResultCache":
+        """환경 변수 기반 캐시 생성 (빈 값은 기본값)"""
+        return cls(max_size=env_int("SEARCH_RESULT_CACHE_SIZE", DEFAULT_SEARCH_CACHE_SIZE))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def peek(self, key: str, needed: int, distance_threshold: float) -> bool:
+        """캐시로 응답 가능한지 확인 (통계/LRU 갱신 없음)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.covers(needed, distance_threshold)
+
+    def get(self, key: str, needed: int, distance_threshold: float) -> Optional[List[Tuple[Any, float]]]:
+        """
+        캐시된 결과 목록 조회
+
+        Args:
+            needed: offset + max_results
+            distance_threshold: 1 - similarity_threshold
+
+        Returns:
+            거리 오름차순 (Document, 거리) 목록, 캐시로 응답할 수 없으면 None
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.covers(needed, distance_threshold):
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return list(entry.hits)
+
+    def put(self, key: str, hits: List[Tuple[Any, float]], k: int) -> None:
+        """검색 결과 저장 (기존 항목보다 많이 가져온 경우에만 교체)"""
+        if not self.enabled:
+            return
+
+        ordered = sorted(hits, key=lambda item: item[1])
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is None or existing.k < k:
+                self._entries[key] = CachedHits(hits=ordered, k=k)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """캐시 및 통계 초기화"""
+        with self._lock:
+            self._entries.clear()
+            self.stats = {"hits": 0, "misses": 0}
+
+    def get_stats(self) -> Dict:
+        """적중률 통계 반환"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self._entries)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        return stats
+
+
+# --------------------------------------------------------------------------
+# 전역 캐시 (프로세스 내 공유)
+# --------------------------------------------------------------------------
+
+_global_search_cache: Optional[SearchResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_result_cache() -> SearchResultCache:
+    """전역 검색 결과 캐시 반환 (최초 호출 시 환경 변수로 생성)"""
+    global _global_search_cache
+
+    if _global_search_cache is not None:
+        return _global_search_cache
+
+    with _cache_lock:
+        if _global_search_cache is None:
+            _global_search_cache = SearchResultCache.from_env()
+        return _global_search_cache
@@ -0,0 +1,111 @@
+"""
+실행(run) 단위 검색 세션
+- 이미 에이전트에게 보여준 아티팩트 ID 추적 → 재검색 시 ID만 반환
+- 다음 페이지 커서 관리 → Query Planner 재실행 없이 추가 결과 조회
+"""
+from typing import Any, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+import copy
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SearchCursor:
+    """다음 페이지 조회에 필요한 검색 상태"""
+    structured_query: Dict
+    offset: int
+    collection_name: Optional[str] = None
+    db_config: Any = None
+
+
+class SearchSession:
+    """검색 세션 (스레드 안전) - 하나의 에이전트 실행 동안 유지"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self._shown_ids: Set[str] = set()
+        self._cursors: Dict[str, SearchCursor] = {}
+        self._cursor_seq = 0
+        self._lock = threading.Lock()
+
+    def split_new(self, artifacts: List[Dict]) -> Tuple[List[Dict], List[str]]:
+        """
+        결과를 새 아티팩트와 이미 보여준 아티팩트 ID로 분리 (표시 기록은 mark_shown으로 따로)
+
+        Returns:
+            (새 아티팩트 리스트, 이미 보여준 아티팩트 ID 리스트)
+        """
+        new_artifacts = []
+        shown_ids = []
+        with self._lock:
+            for artifact in artifacts:
+                artifact_id = artifact.get("id", "unknown")
+                if artifact_id in self._shown_ids:
+                    shown_ids.append(artifact_id)
+                else:
+                    new_artifacts.append(artifact)
+        return new_artifacts, shown_ids
+
+    def mark_shown(self, artifact_ids: List[str]) -> None:
+        """에이전트에게 실제로 전달한(토큰 예산 안에서 표에 들어간) 아티팩트를 표시 완료로 기록"""
+        with self._lock:
+            self._shown_ids.update(artifact_ids)
+
+    def is_shown(self, artifact_id: str) -> bool:
+        with self._lock:
+            return artifact_id in self._shown_ids
+
+    def create_cursor(
+        self,
+        structured_query: Dict,
+        offset: int,
+        collection_name: Optional[str] = None,
+        db_config: Any = None
+    ) -> str:
+        """다음 페이지 커서 생성"""
+        with self._lock:
+            self._cursor_seq += 1
+            cursor_id = f"cursor_{self._cursor_seq}"
+            self._cursors[cursor_id] = SearchCursor(
+                structured_query=copy.deepcopy(structured_query),
+                offset=offset,
+                collection_name=collection_name,
+                db_config=db_config
+            )
+        return cursor_id
+
+    def get_cursor(self, cursor_id: str) -> Optional[SearchCursor]:
+        with self._lock:
+            return self._cursors.get(cursor_id)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"shown_count": len(self._shown_ids), "cursor_count": len(self._cursors)}
+
+
+# --------------------------------------------------------------------------
+# 세션 레지스트리 (실행 단위 - 키는 그래프 run_id, 그래프 밖 직접 호출은 컬렉션 이름)
+# --------------------------------------------------------------------------
+
+_sessions: Dict[str, SearchSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_search_session(session_id: str) -> SearchSession:
+    """세션 반환 (없으면 생성)"""
+    with _sessions_lock:
+        session = _sessions.get(session_id)
+        if session is None:
+            session = SearchSession(session_id)
+            _sessions[session_id] = session
+        return session
+
+
+def reset_search_session(session_id: str) -> None:
+    """세션 삭제 (실행 종료 시 호출)"""
+    with _sessions_lock:
+        if _sessions.pop(session_id, None) is not None:
+            logger.info("검색 세션 초기화: %s", session_id)
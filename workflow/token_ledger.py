@@ -0,0 +1,313 @@
+"""
+작업별 토큰 / 비용 장부
+- LLM 호출: 콜백으로 입력/출력 토큰(응답의 usage_metadata), 지연 시간, 모델 등급 기록
+- 임베딩 호출: 래퍼로 텍스트 수, 추정 토큰, 지연 시간 기록 (임베딩 API는 사용량을 돌려주지 않음)
+- 태그: LangGraph 노드 이름(langgraph_node), 그래프 밖 호출은 ledger_stage()로 지정한 단계 이름
+- 장부는 contextvar로 작업(task_id)에 묶임 → 같은 프로세스의 동시 작업이 섞이지 않음
+  (스레드 풀로 넘기는 작업은 ContextThreadPoolExecutor 등으로 컨텍스트를 복사해야 집계됨)
+"""
+from typing import Any, Dict, Iterator, List, Optional
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from uuid import UUID
+import json
+import logging
+import os
+import threading
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_core.tracers.context import register_configure_hook
+
+from workflow.tool_digest import estimate_tokens
+from workflow.utils import env_str
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_LEDGER_DIR = "./ledgers"
+
+# 기준 단가 (USD / 1M 토큰, 2025년 공개 가격 기준 - 변경 시 수정)
+MODEL_PRICES = {
+    "gemini-2.5-flash-lite": {"input": 0.10, "output": 0.40},
+    "gemini-2.5-flash": {"input": 0.30, "output": 2.50},
+    "gemini-2.5-pro": {"input": 1.25, "output": 10.00},
+    "gemini-embedding-001": {"input": 0.15, "output": 0.0},
+    "text-embedding-3-small": {"input": 0.02, "output": 0.0},
+}
+MODEL_TIERS = {
+    "gemini-2.5-flash-lite": "small",
+    "gemini-2.5-flash": "medium",
+    "gemini-2.5-pro": "large",
+}
+
+
+def _model_name(name: Optional[str]) -> str:
+    """'models/gemini-2.5-flash', 'google_genai:gemini-2.5-flash' 형태 정리"""
+    name = (name or "unknown").split(":")[-1]
+    return name.split("/")[-1]
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    price = MODEL_PRICES.get(_model_name(model))
+    if price is None:
+        return 0.0
+    return (input_tokens * price["input"] + output_tokens * price["output"]) / 1_000_000
+
+
+# --------------------------------------------------------------------------
+# 장부
+# --------------------------------------------------------------------------
+
+class TokenLedger:
+    """한 작업(task)의 LLM / 임베딩 호출 기록 (스레드 안전)"""
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.started_at = time.time()
+        self.entries: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        kind: str,
+        model: str,
+        node: str,
+        input_tokens: int,
+        output_tokens: int,
+        latency: float,
+        error: bool = False,
+        items: int = 1
+    ) -> None:
+        model = _model_name(model)
+        entry = {
+            "kind": kind,
+            "model": model,
+            "tier": MODEL_TIERS.get(model, kind),
+            "node": node,
+            "input_tokens": int(input_tokens),
+            "output_tokens": int(output_tokens),
+            "latency": round(latency, 4),
+            "cost": estimate_cost(model, input_tokens, output_tokens),
+            "items": items,
+            "error": error,
+        }
+        with self._lock:
+            self.entries.append(entry)
+
+    def summary(self) -> Dict[str, Any]:
+        """노드별 / 모델 등급별 합계 (토큰, 호출 수, 지연 시간, 추정 비용)"""
+        def bucket() -> Dict[str, Any]:
+            return {"calls": 0, "errors": 0, "input_tokens": 0, "output_tokens": 0, "latency": 0.0, "cost": 0.0}
+
+        with self._lock:
+            entries = list(self.entries)
+
+        total = bucket()
+        by_node: Dict[str, Dict[str, Any]] = defaultdict(bucket)
+        by_tier: Dict[str, Dict[str, Any]] = defaultdict(bucket)
+        for entry in entries:
+            for target in (total, by_node[entry["node"]], by_tier[entry["tier"]]):
+                target["calls"] += 1
+                target["errors"] += int(entry["error"])
+                target["input_tokens"] += entry["input_tokens"]
+                target["output_tokens"] += entry["output_tokens"]
+                target["latency"] += entry["latency"]
+                target["cost"] += entry["cost"]
+
+        for target in [total, *by_node.values(), *by_tier.values()]:
+            target["latency"] = round(target["latency"], 3)
+            target["cost"] = round(target["cost"], 6)
+
+        return {
+            "task_id": self.task_id,
+            "elapsed": round(time.time() - self.started_at, 3),
+            "total": total,
+            "by_node": dict(sorted(by_node.items(), key=lambda item: -item[1]["cost"])),
+            "by_tier": dict(by_tier),
+        }
+
+    def write(self, directory: Optional[str] = None) -> Optional[str]:
+        """작업별 요약 + 호출 목록을 JSON 파일로 저장 (실패 시 None)"""
+        directory = directory or env_str("TOKEN_LEDGER_DIR", DEFAULT_LEDGER_DIR)
+        safe_task_id = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in self.task_id)
+        path = os.path.join(directory, f"{safe_task_id}.json")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with self._lock:
+                entries = list(self.entries)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"summary": self.summary(), "entries": entries}, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning("토큰 장부 저장 실패: %s", e)
+            return None
+        return path
+
+
+# --------------------------------------------------------------------------
+# 현재 작업 / 단계 (contextvar)
+# --------------------------------------------------------------------------
+
+_current_ledger: ContextVar[Optional[TokenLedger]] = ContextVar("token_ledger", default=None)
+_current_stage: ContextVar[Optional[str]] = ContextVar("token_ledger_stage", default=None)
+_ledger_handler: ContextVar[Optional["LedgerCallbackHandler"]] = ContextVar("token_ledger_handler", default=None)
+
+# 장부가 설정된 컨텍스트의 모든 LLM 호출에 콜백 자동 연결 (config로 넘기지 않은 호출 포함)
+register_configure_hook(_ledger_handler, inheritable=True)
+
+
+def get_current_ledger() -> Optional[TokenLedger]:
+    return _current_ledger.get()
+
+
+def current_node() -> str:
+    """현재 실행 중인 그래프 노드 이름 (그래프 밖이면 ledger_stage 이름)"""
+    config = var_child_runnable_config.get() or {}
+    node = (config.get("metadata") or {}).get("langgraph_node")
+    return node or _current_stage.get() or "unknown"
+
+
+@contextmanager
+def track_tokens(task_id: str) -> Iterator[TokenLedger]:
+    """블록 안의 LLM / 임베딩 호출을 task_id 장부에 기록"""
+    ledger = TokenLedger(task_id)
+    ledger_token = _current_ledger.set(ledger)
+    handler_token = _ledger_handler.set(LedgerCallbackHandler(ledger))
+    try:
+        yield ledger
+    finally:
+        _ledger_handler.reset(handler_token)
+        _current_ledger.reset(ledger_token)
+
+
+@contextmanager
+def ledger_stage(name: str) -> Iterator[None]:
+    """그래프 밖 호출의 태그 지정 (예: 보고서 섹션 생성)"""
+    token = _current_stage.set(name)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+
+
+# --------------------------------------------------------------------------
+# LLM 콜백
+# --------------------------------------------------------------------------
+
+class LedgerCallbackHandler(BaseCallbackHandler):
+    """LLM 호출 시작/종료 시각과 응답 사용량을 장부에 기록"""
+
+    def __init__(self, ledger: TokenLedger):
+        self.ledger = ledger
+        self._runs: Dict[UUID, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, metadata: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> None:
+        metadata = metadata or {}
+        params = kwargs.get("invocation_params") or {}
+        with self._lock:
+            self._runs[run_id] = {
+                "started": time.perf_counter(),
+                "model": metadata.get("ls_model_name") or params.get("model") or params.get("model_name"),
+                "node": metadata.get("langgraph_node") or _current_stage.get() or "unknown",
+            }
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *,
+                            run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self._start(run_id, metadata, kwargs)
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *,
+                     run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        self._start(run_id, metadata, kwargs)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+        if not input_tokens and response.llm_output:
+            usage = response.llm_output.get("token_usage") or response.llm_output.get("usage_metadata") or {}
+            input_tokens = usage.get("input_tokens", usage.get("prompt_tokens", 0))
+            output_tokens = usage.get("output_tokens", usage.get("completion_tokens", 0))
+        self.ledger.record(
+            "llm", run["model"], run["node"], input_tokens, output_tokens,
+            time.perf_counter() - run["started"]
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is not None:
+            self.ledger.record("llm", run["model"], run["node"], 0, 0, time.perf_counter() - run["started"], error=True)
+
+
+# --------------------------------------------------------------------------
+# 임베딩 래퍼
+# --------------------------------------------------------------------------
+
+class LedgerEmbeddings(Embeddings):
+    """실제 임베딩 호출을 현재 작업 장부에 기록 (장부가 없으면 그대로 전달)"""
+
+    def __init__(self, base: Embeddings, model: str):
+        self.base = base
+        self.model = model
+
+    def _record(self, texts: List[str], started: float, error: bool = False) -> None:
+        ledger = _current_ledger.get()
+        if ledger is None:
+            return
+        ledger.record(
+            "embedding", self.model, current_node(),
+            sum(estimate_tokens(text) for text in texts), 0,
+            time.perf_counter() - started, error=error, items=len(texts)
+        )
+
+    def embed_documents(self, texts: List[str], **kwargs: Any) -> List[List[float]]:
+        started = time.perf_counter()
+        try:
+            vectors = self.base.embed_documents(texts, **kwargs)
+        except Exception:
+            self._record(texts, started, error=True)
+            raise
+        self._record(texts, started)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        started = time.perf_counter()
+        try:
+            vector = self.base.embed_query(text)
+        except Exception:
+            self._record([text], started, error=True)
+            raise
+        self._record([text], started)
+        return vector
+
+    async def aembed_documents(self, texts: List[str], **kwargs: Any) -> List[List[float]]:
+        started = time.perf_counter()
+        try:
+            vectors = await self.base.aembed_documents(texts, **kwargs)
+        except Exception:
+            self._record(texts, started, error=True)
+            raise
+        self._record(texts, started)
+        return vectors
+
+    async def aembed_query(self, text: str) -> List[float]:
+        started = time.perf_counter()
+        try:
+            vector = await self.base.aembed_query(text)
+        except Exception:
+            self._record([text], started, error=True)
+            raise
+        self._record([text], started)
+        return vector
@@ -0,0 +1,122 @@
+"""
+도구 결과 텍스트 공용 도우미 (토큰 추정, 규칙 기반 요약, 아티팩트 ID 추출)
+- workflow 모듈을 import하지 않음 → 근거 저장소 / 히스토리 압축 / 토큰 장부가 순환 import 없이 모듈 수준에서 사용
+- 요약: 메시지 첫 줄 + 목표/커서 줄 + 타입별 아티팩트 ID 목록 (표/ID가 없는 결과는 앞부분만)
+"""
+from typing import Any, List, Optional, Tuple
+import json
+import re
+
+
+MAX_AI_TEXT_CHARS = 600  # 오래된 턴의 에이전트 추론 텍스트 최대 길이
+MAX_IDS_PER_GROUP = 200  # 요약에 남길 타입별 최대 ID 수
+
+DIGEST_HEADER = "🗜️ [이전 도구 결과 요약 — 원문 생략, 상세 내용은 get_artifacts_by_ids_tool로 재조회]"
+
+_TYPE_HEADER_PATTERN = re.compile(r"^\[([^\]]+)\]\s+\d+건")
+_KEEP_LINE_PATTERN = re.compile(r"^(- 목표|- 기준|- 함께 나타난|next_cursor|이미 확인한|찾을 수 없는|\(토큰 예산 초과로)")
+
+
+# --------------------------------------------------------------------------
+# 도구 결과 요약 (규칙 기반)
+# --------------------------------------------------------------------------
+
+def _table_ids(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    """마크다운 표에서 id 컬럼 값을 그룹별로 수집 ("[타입] N건" 줄이 그룹 이름)"""
+    groups: List[Tuple[str, List[str]]] = []
+    group = ""
+    id_column: Optional[int] = None
+    for line in lines:
+        header = _TYPE_HEADER_PATTERN.match(line)
+        if header:
+            group = header.group(1)
+            id_column = None
+            continue
+        if not line.startswith("|"):
+            id_column = None
+            continue
+        cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+        if id_column is None:
+            if "id" in cells:
+                id_column = cells.index("id")
+                groups.append((group, []))
+            continue
+        if set(line) <= set("|-: "):
+            continue
+        if id_column < len(cells):
+            value = cells[id_column].rstrip(" *")
+            if value and value != "…" and not value.startswith("("):
+                groups[-1][1].append(value)
+    return [(name, ids) for name, ids in groups if ids]
+
+
+def _json_line_ids(lines: List[str]) -> List[str]:
+    """JSON 한 줄 레코드(ID 조회 결과)의 id 수집"""
+    ids = []
+    for line in lines:
+        if not line.startswith("{"):
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and record.get("id") is not None:
+            ids.append(str(record["id"]))
+    return ids
+
+
+def tool_content_ids(content: str) -> List[str]:
+    """도구 결과에 나온 아티팩트 ID 전체 (표의 id 컬럼 + JSON 레코드)"""
+    lines = content.splitlines()
+    ids = [artifact_id for _, group_ids in _table_ids(lines) for artifact_id in group_ids]
+    return list(dict.fromkeys(ids + _json_line_ids(lines)))
+
+
+def digest_tool_content(content: str, header: str = DIGEST_HEADER) -> str:
+    """
+    도구 결과 원문을 요약 (메시지 첫 줄, 목표/커서 줄, 타입별 아티팩트 ID 목록)
+
+    표/ID가 없는 결과(웹 검색 등)는 앞부분만 남깁니다.
+    """
+    text = content if isinstance(content, str) else json.dumps(content, ensure_ascii=False, default=str)
+    lines = text.splitlines()
+    if not lines:
+        return text
+
+    summary = [header, lines[0]]
+    summary.extend(line for line in lines[1:] if _KEEP_LINE_PATTERN.match(line))
+
+    groups = _table_ids(lines)
+    json_ids = _json_line_ids(lines)
+    if json_ids:
+        groups.append(("원본 조회", json_ids))
+
+    if not groups:
+        head = text[:MAX_AI_TEXT_CHARS]
+        summary.append(head + (f"…(+{len(text) - len(head)}자 생략)" if len(text) > len(head) else ""))
+        return "\n".join(summary)
+
+    for name, ids in groups:
+        shown = ids[:MAX_IDS_PER_GROUP]
+        more = f" 외 {len(ids) - len(shown)}개" if len(ids) > len(shown) else ""
+        label = f"[{name}] " if name else ""
+        summary.append(f"{label}{len(ids)}건 ID: {', '.join(shown)}{more}")
+    return "\n".join(summary)
+
+
+# --------------------------------------------------------------------------
+# 토큰 추정
+# --------------------------------------------------------------------------
+
+def estimate_tokens(text: Any) -> int:
+    """
+    토큰 수 근사치 (원격 토크나이저 호출 없이 계산)
+    
+    ASCII는 약 4자당 1토큰, 한글 등 비ASCII 문자는 1자당 약 1토큰으로 계산합니다.
+    """
+    if not text:
+        return 0
+    if not isinstance(text, str):
+        text = str(text)
+    ascii_count = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_count // 4 + (len(text) - ascii_count) + 1
@@ -1,19 +1,36 @@
 """
 RAG Agent가 사용하는 도구(Tools) 정의
 """
-from typing import Dict, Optional, Union
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+import asyncio
+import heapq
 import logging
 
-from langchain_core.tools import tool
-from langchain_tavily import TavilySearch
+import numpy as np
+import pandas as pd
+from langchain_core.documents import Document
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_core.tools import StructuredTool
 
 from workflow.classes import StructuredQuery
 from workflow.database import (
+    DEFAULT_COLLECTION_NAME,
     VectorDBConfig,
     MAX_SEARCH_RESULTS,
+    aembed_query_texts,
+    artifact_to_document,
     create_vectorstore,
+    embed_query_texts,
+    get_data_version,
+    get_document_embeddings,
+    get_embeddings,
     normalize_config,
-    parse_document_content
+    parse_document_content,
+    route_partitions
 )
 from workflow.utils import (
     ChromaDBError,
@@ -21,12 +38,37 @@ from workflow.utils import (
     format_metadata_section,
     create_search_error_response,
     datetime_to_timestamp,
+    timestamp_to_datetime,
     llm_medium
 )
 from workflow.prompts import (
     QUERY_PLANNER_SYSTEM_PROMPT,
     QUERY_PLANNER_USER_PROMPT
 )
+from workflow.aggregation import AggregationError, aggregate_artifacts, format_aggregate_result
+from workflow.entities import entity_query_keys
+from workflow.evidence_store import drop_evidence_store
+from workflow.llm_factory import create_web_search_tool
+from workflow.local_index import (
+    BASE_COLUMNS,
+    get_artifact_frame,
+    get_artifact_store,
+    get_bm25_index,
+    get_entity_index,
+    get_timeline_index
+)
+from workflow.query_cache import get_query_plan_cache, metadata_fingerprint
+from workflow.reranking import mmr_select
+from workflow.rule_planner import get_rule_planner
+from workflow.search_cache import get_search_result_cache, search_cache_key
+from workflow.search_session import SearchCursor, get_search_session, reset_search_session
+from workflow.result_formatter import (
+    derive_token_budget,
+    fit_search_result,
+    format_artifact_records,
+    format_entity_trace,
+    format_timeline_result
+)
 
 logger = logging.getLogger(__name__)
 
@@ -35,52 +77,96 @@ logger = logging.getLogger(__name__)
 # 도구 컨텍스트 설정 (State 정보 전달용)
 # --------------------------------------------------------------------------
 
-class ToolContext:
-    """도구가 State 정보에 접근할 수 있도록 하는 컨텍스트"""
-    collection_name: str = "artifacts_collection"
+@dataclass(frozen=True)
+class _RunContext:
+    collection_name: str = DEFAULT_COLLECTION_NAME
     db_config: Optional[Dict] = None
+    context_tokens: int = 0  # 에이전트 대화 히스토리의 추정 토큰 수
+    run_id: Optional[str] = None  # 그래프 실행 ID (검색 세션 키)
+
+
+# 실행(run)별 컨텍스트: 그래프 노드 / 스레드 풀 작업은 contextvar 복사본을 쓰므로 동시 실행 간에 섞이지 않음
+_run_context: ContextVar[_RunContext] = ContextVar("tool_run_context", default=_RunContext())
+
+
+class ToolContext:
+    """도구가 State 정보에 접근할 수 있도록 하는 컨텍스트 (실행별 contextvar 기반)"""
     
     @classmethod
-    def set_context(cls, collection_name: str, db_config: Optional[Dict] = None):
-        """State에서 컨텍스트 정보 설정"""
-        cls.collection_name = collection_name
-        cls.db_config = db_config
+    def set_context(
+        cls,
+        collection_name: str,
+        db_config: Optional[Dict] = None,
+        context_tokens: int = 0,
+        run_id: Optional[str] = None
+    ) -> Token:
+        """현재 실행 컨텍스트 설정 (반환된 토큰으로 reset 가능)"""
+        return _run_context.set(_RunContext(collection_name, db_config, context_tokens, run_id))
+    
+    @classmethod
+    def reset(cls, token: Token) -> None:
+        """set_context 이전 상태로 복원"""
+        _run_context.reset(token)
+    
+    @classmethod
+    @contextmanager
+    def from_state(cls, state: Dict) -> Iterator[None]:
+        """State의 컬렉션 / DB 설정 / 컨텍스트 크기 / 실행 ID로 블록 실행"""
+        token = cls.set_context(
+            state.get("collection_name") or DEFAULT_COLLECTION_NAME,
+            state.get("db_config"),
+            state.get("context_tokens") or 0,
+            state.get("run_id")
+        )
+        try:
+            yield
+        finally:
+            cls.reset(token)
     
     @classmethod
     def get_collection_name(cls) -> str:
         """현재 컬렉션 이름 반환"""
-        return cls.collection_name
+        return _run_context.get().collection_name
     
     @classmethod
     def get_db_config(cls) -> Optional[Dict]:
         """현재 DB 설정 반환"""
-        return cls.db_config
+        return _run_context.get().db_config
+    
+    @classmethod
+    def get_session_id(cls) -> str:
+        """검색 세션 키 (그래프 실행 ID, 그래프 밖에서 도구를 직접 호출하면 컬렉션 이름)"""
+        context = _run_context.get()
+        return context.run_id or context.collection_name
+    
+    @classmethod
+    def end_run(cls, run_id: str) -> None:
+        """실행 종료 시 실행 단위 상태(검색 세션, 도구 결과 근거 저장소) 정리"""
+        reset_search_session(run_id)
+        drop_evidence_store(run_id)
+    
+    @classmethod
+    def get_result_token_budget(cls) -> int:
+        """남은 컨텍스트 기준 검색 결과 토큰 예산"""
+        return derive_token_budget(_run_context.get().context_tokens)
 
 
 # --------------------------------------------------------------------------
 # RAG Tools
 # --------------------------------------------------------------------------
 
+def get_planner_stats() -> Dict:
+    """Query Planner 경로별 통계 (캐시 적중률, 규칙 기반 경로 적중률)"""
+    rule_planner = get_rule_planner()
+    return {
+        "cache": get_query_plan_cache().get_stats(),
+        "rule_planner": rule_planner.get_stats() if rule_planner else None
+    }
 
-@tool
-def query_planner_tool(natural_language_goal: str) -> Dict:
-    """
-    자연어 검색 목표를 구조화된 쿼리로 변환 (내부 함수)
-    
-    2단계 검색 시스템:
-    - 1차: 메타데이터 필터 (artifact_type, datetime)
-    - 2차: 벡터 유사도 검색
-    
-    Returns: StructuredQuery dict (query_text, filters, max_results, threshold)
-    """
-    logger.info("검색 쿼리 생성 시작: %s", natural_language_goal)
-    
-    # State에서 컨텍스트 정보 가져오기
-    collection_name = ToolContext.get_collection_name()
-    db_config = ToolContext.get_db_config()
-    
+
+def _load_metadata_info(collection_name: str, db_config: Union[None, dict, VectorDBConfig]) -> Dict:
+    """Query Planner용 메타데이터 요약 수집 (실패 시 빈 메타데이터)"""
     try:
-        # 메타데이터 정보 수집
         metadata_info = get_metadata_info(collection_name, db_config)
         
         if metadata_info["total_count"] > 0:
@@ -91,60 +177,445 @@ def query_planner_tool(natural_language_goal: str) -> Dict:
             )
         else:
             logger.warning("메타데이터 없음 (빈 DB)")
+        return metadata_info
         
     except ChromaDBError as e:
         logger.debug("메타데이터 수집 실패 (내부): %s", e)
         # 메타데이터 없이 계속 진행
-        metadata_info = {
+        return {
             "artifact_types": [],
             "datetime_range": {"earliest": None, "latest": None},
             "total_count": 0
         }
+
+
+def _plan_without_llm(natural_language_goal: str, metadata_info: Dict, fingerprint: str) -> Optional[Dict]:
+    """LLM/임베딩 호출 없는 계획 경로: 정확 일치 캐시 → 규칙 기반"""
+    cached_plan = get_query_plan_cache().get_exact(natural_language_goal, fingerprint)
+    if cached_plan is not None:
+        logger.info("쿼리 계획 캐시 적중: %s", cached_plan.get("query_text"))
+        return cached_plan
     
-    # 프롬프트 생성
+    # 규칙 기반 빠른 경로 (단순 목표는 LLM 호출 없이 계획)
+    rule_planner = get_rule_planner()
+    if rule_planner is not None:
+        rule_plan = rule_planner.plan(natural_language_goal, metadata_info)
+        if rule_plan is not None:
+            logger.info("규칙 기반 쿼리 생성: %s (적중률 %.0f%%)",
+                        rule_plan["query_text"], rule_planner.get_stats()["hit_rate"] * 100)
+            return rule_plan
+    return None
+
+
+def _planner_messages(natural_language_goal: str, metadata_info: Dict) -> List[Dict]:
+    """Query Planner LLM 프롬프트 생성"""
     metadata_section = format_metadata_section(metadata_info)
     system_prompt = QUERY_PLANNER_SYSTEM_PROMPT.format(metadata_section=metadata_section)
     user_prompt = QUERY_PLANNER_USER_PROMPT.format(natural_language_goal=natural_language_goal)
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def _fallback_plan(natural_language_goal: str) -> Dict:
+    """쿼리 생성 실패 시 기본 쿼리"""
+    fallback_query = StructuredQuery(
+        query_text=natural_language_goal,
+        filter_artifact_types=None,
+        filter_datetime_start=None,
+        filter_datetime_end=None,
+        max_results=20,
+        similarity_threshold=0.3
+    )
+    
+    logger.info("기본 쿼리 사용: %s", fallback_query.query_text)
+    return fallback_query.model_dump()
+
+
+def plan_query(natural_language_goal: str) -> Dict:
+    """
+    자연어 검색 목표를 구조화된 쿼리로 변환 (내부 함수)
+    
+    2단계 검색 시스템:
+    - 1차: 메타데이터 필터 (artifact_type, datetime)
+    - 2차: 벡터 유사도 검색
+    
+    Returns: StructuredQuery dict (query_text, filters, max_results, threshold)
+    """
+    logger.info("검색 쿼리 생성 시작: %s", natural_language_goal)
+    
+    # State에서 컨텍스트 정보 가져오기
+    collection_name = ToolContext.get_collection_name()
+    db_config = ToolContext.get_db_config()
+    metadata_info = _load_metadata_info(collection_name, db_config)
+    
+    # 계획 경로: 정확 일치 캐시 → 규칙 기반 → 의미 유사 캐시 → LLM
+    cache = get_query_plan_cache()
+    fingerprint = metadata_fingerprint(metadata_info)
+    plan = _plan_without_llm(natural_language_goal, metadata_info, fingerprint)
+    if plan is not None:
+        return plan
+    
+    # 의미 유사 캐시 (목표 임베딩 필요)
+    goal_embedding = None
+    if cache.enable_semantic:
+        try:
+            embeddings = get_embeddings(normalize_config(db_config))
+            goal_embedding = embeddings.embed_query(natural_language_goal)
+            plan = cache.get_semantic(goal_embedding, fingerprint)
+        except Exception as e:
+            logger.debug("검색 목표 임베딩 실패 (의미 캐시 건너뜀): %s", e)
+    
+    if plan is not None:
+        logger.info("쿼리 계획 캐시 적중: %s", plan.get("query_text"))
+        return plan
+    cache.record_miss()
     
     structured_llm = llm_medium.with_structured_output(StructuredQuery)
     
     try:
-        response: StructuredQuery = structured_llm.invoke([  # type: ignore
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ])
+        response: StructuredQuery = structured_llm.invoke(  # type: ignore
+            _planner_messages(natural_language_goal, metadata_info)
+        )
         
         logger.info("쿼리 생성 완료: %s", response.query_text)
-        return response.model_dump()
+        plan = response.model_dump()
+        cache.put(natural_language_goal, fingerprint, plan, embedding=goal_embedding)
+        return plan
         
     except Exception as e:
         logger.warning("쿼리 생성 실패, 기본 쿼리로 폴백: %s", str(e))
+        return _fallback_plan(natural_language_goal)
+
+
+async def aplan_query(natural_language_goal: str) -> Dict:
+    """plan_query의 비동기 버전 (메타데이터 조회는 스레드로, 임베딩/LLM은 비동기 호출)"""
+    logger.info("검색 쿼리 생성 시작 (async): %s", natural_language_goal)
+    
+    collection_name = ToolContext.get_collection_name()
+    db_config = ToolContext.get_db_config()
+    metadata_info = await asyncio.to_thread(_load_metadata_info, collection_name, db_config)
+    
+    cache = get_query_plan_cache()
+    fingerprint = metadata_fingerprint(metadata_info)
+    plan = _plan_without_llm(natural_language_goal, metadata_info, fingerprint)
+    if plan is not None:
+        return plan
+    
+    goal_embedding = None
+    if cache.enable_semantic:
+        try:
+            embeddings = get_embeddings(normalize_config(db_config))
+            goal_embedding = await embeddings.aembed_query(natural_language_goal)
+            plan = cache.get_semantic(goal_embedding, fingerprint)
+        except Exception as e:
+            logger.debug("검색 목표 임베딩 실패 (의미 캐시 건너뜀): %s", e)
+    
+    if plan is not None:
+        logger.info("쿼리 계획 캐시 적중: %s", plan.get("query_text"))
+        return plan
+    cache.record_miss()
+    
+    structured_llm = llm_medium.with_structured_output(StructuredQuery)
+    
+    try:
+        response: StructuredQuery = await structured_llm.ainvoke(  # type: ignore
+            _planner_messages(natural_language_goal, metadata_info)
+        )
+        
+        logger.info("쿼리 생성 완료: %s", response.query_text)
+        plan = response.model_dump()
+        cache.put(natural_language_goal, fingerprint, plan, embedding=goal_embedding)
+        return plan
         
-        # 폴백: 기본 쿼리 반환
-        fallback_query = StructuredQuery(
-            query_text=natural_language_goal,
-            filter_artifact_types=None,
-            filter_datetime_start=None,
-            filter_datetime_end=None,
-            max_results=20,
-            similarity_threshold=0.3
+    except Exception as e:
+        logger.warning("쿼리 생성 실패, 기본 쿼리로 폴백: %s", str(e))
+        return _fallback_plan(natural_language_goal)
+
+
+query_planner_tool = StructuredTool.from_function(
+    func=plan_query,
+    coroutine=aplan_query,
+    name="query_planner_tool"
+)
+
+
+def build_metadata_filter(structured_query: Dict) -> Optional[Dict]:
+    """StructuredQuery의 1차 필터(artifact_type, datetime)를 ChromaDB where 조건으로 변환"""
+    filter_types = structured_query.get("filter_artifact_types", [])
+    filter_datetime_start = structured_query.get("filter_datetime_start")
+    filter_datetime_end = structured_query.get("filter_datetime_end")
+    
+    filter_conditions = []
+    
+    # artifact_type 필터
+    if filter_types:
+        filter_conditions.append({"artifact_type": {"$in": filter_types}})
+    
+    # datetime 필터 (timestamp로 변환)
+    if filter_datetime_start:
+        start_ts = datetime_to_timestamp(filter_datetime_start)
+        if start_ts is not None:
+            filter_conditions.append({"timestamp": {"$gte": start_ts}})
+    
+    if filter_datetime_end:
+        end_ts = datetime_to_timestamp(filter_datetime_end)
+        if end_ts is not None:
+            filter_conditions.append({"timestamp": {"$lte": end_ts}})
+    
+    # ChromaDB 필터 구성
+    if not filter_conditions:
+        logger.info("1차 필터: 없음 (전체 검색)")
+        return None
+    if len(filter_conditions) == 1:
+        logger.info("1차 필터 적용: %s", filter_conditions[0])
+        return filter_conditions[0]
+    logger.info("1차 필터 적용 (다중 조건): %d개", len(filter_conditions))
+    return {"$and": filter_conditions}
+
+
+RRF_K = 60  # Reciprocal Rank Fusion 상수 (순위 차이 완화)
+MMR_POOL_FACTOR = 2  # 다양성 재정렬 시 후보 풀 확대 배수 (대체할 후보 확보)
+MAX_PARTITION_WORKERS = 8  # 파티션 병렬 검색 최대 스레드 수
+
+
+def _metadata_mask(frame: pd.DataFrame, structured_query: Dict) -> Optional[np.ndarray]:
+    """1차 필터(artifact_type, datetime)를 로컬 프레임 행 마스크로 변환 (필터 없으면 None)"""
+    filter_types = structured_query.get("filter_artifact_types")
+    start_ts = datetime_to_timestamp(structured_query.get("filter_datetime_start"))
+    end_ts = datetime_to_timestamp(structured_query.get("filter_datetime_end"))
+    if not filter_types and start_ts is None and end_ts is None:
+        return None
+    
+    mask = np.ones(len(frame), dtype=bool)
+    if filter_types:
+        mask &= frame["artifact_type"].isin(filter_types).to_numpy()
+    timestamps = frame["timestamp"].to_numpy(dtype=np.float64)
+    if start_ts is not None:
+        mask &= timestamps >= start_ts
+    if end_ts is not None:
+        mask &= timestamps <= end_ts
+    return mask
+
+
+def _fuse_lexical_results(
+    structured_query: Dict,
+    passed_results: List[Tuple[Document, float]],
+    results_with_scores: List[Tuple[Document, float]],
+    collection_name: str,
+    config: VectorDBConfig,
+    k: int
+) -> Tuple[List[Tuple[Document, Optional[float], Optional[float]]], int]:
+    """
+    벡터 검색 결과와 BM25 결과를 RRF로 융합
+    
+    - 벡터 후보: 유사도 임계값을 통과한 결과
+    - 키워드 후보: 같은 1차 필터를 적용한 BM25 상위 k개
+    
+    Returns:
+        ([(Document, 거리 또는 None, RRF 점수)], 키워드로만 추가된 결과 수)
+    """
+    vector_only = [(doc, score, None) for doc, score in passed_results]
+    bm25 = get_bm25_index(collection_name, config)
+    frame = get_artifact_frame(collection_name, config)
+    if bm25 is None or frame is None:
+        return vector_only, 0
+    
+    lexical = bm25.search(
+        structured_query.get("query_text", ""),
+        k,
+        mask=_metadata_mask(frame, structured_query)
+    )
+    if not lexical:
+        return vector_only, 0
+    
+    artifact_ids = frame["artifact_id"].to_numpy()
+    distances = {doc.metadata.get("artifact_id"): score for doc, score in results_with_scores}
+    documents: Dict[str, Document] = {}
+    fused: Dict[str, float] = {}
+    
+    for rank, (doc, _) in enumerate(passed_results, start=1):
+        artifact_id = doc.metadata.get("artifact_id")
+        documents[artifact_id] = doc
+        fused[artifact_id] = fused.get(artifact_id, 0.0) + 1.0 / (RRF_K + rank)
+    
+    lexical_only = []
+    for rank, (row, _) in enumerate(lexical, start=1):
+        artifact_id = str(artifact_ids[row])
+        fused[artifact_id] = fused.get(artifact_id, 0.0) + 1.0 / (RRF_K + rank)
+        if artifact_id not in documents:
+            lexical_only.append((artifact_id, row))
+    
+    # 키워드로만 찾은 결과는 원본 저장소에서 Document 복원 (저장 시와 같은 page_content)
+    if lexical_only:
+        store = get_artifact_store(collection_name, config)
+        records = store.get_many([artifact_id for artifact_id, _ in lexical_only]) if store else {}
+        for artifact_id, row in lexical_only:
+            if artifact_id in records:
+                documents[artifact_id] = artifact_to_document(records[artifact_id], row)
+    
+    ranked = sorted(
+        (artifact_id for artifact_id in fused if artifact_id in documents),
+        key=lambda artifact_id: -fused[artifact_id]
+    )
+    added = sum(1 for artifact_id, _ in lexical_only if artifact_id in documents)
+    logger.info("키워드 융합: 벡터 %d개 + 키워드 %d개 (신규 %d개)", len(passed_results), len(lexical), added)
+    return [
+        (documents[artifact_id], distances.get(artifact_id), fused[artifact_id])
+        for artifact_id in ranked
+    ], added
+
+
+def _diversify_results(
+    ranked_results: List[Tuple[Document, Optional[float], Optional[float]]],
+    diversity: float,
+    needed: int,
+    collection_name: str,
+    config: VectorDBConfig
+) -> List[Tuple[Document, Optional[float], Optional[float]]]:
+    """
+    MMR로 상위 needed개를 다시 골라 앞에 배치 (나머지는 기존 순서 유지)
+    
+    관련도는 기존 순위 점수(융합 시 RRF, 아니면 1 - 거리)를 사용하고,
+    결과 간 유사도는 컬렉션에 저장된 문서 임베딩으로 계산합니다.
+    """
+    if diversity <= 0 or len(ranked_results) < 2:
+        return ranked_results
+    
+    artifact_ids = [doc.metadata.get("artifact_id") for doc, _, _ in ranked_results]
+    try:
+        stored = get_document_embeddings(collection_name, artifact_ids, config)
+    except Exception as e:
+        logger.warning("다양성 재정렬 생략 (임베딩 조회 실패): %s", e)
+        return ranked_results
+    if not stored:
+        return ranked_results
+    
+    dimension = len(next(iter(stored.values())))
+    embeddings = np.zeros((len(artifact_ids), dimension), dtype=np.float32)
+    available = np.zeros(len(artifact_ids), dtype=bool)
+    for i, artifact_id in enumerate(artifact_ids):
+        if artifact_id in stored:
+            embeddings[i] = stored[artifact_id]
+            available[i] = True
+    
+    if all(relevance is not None for _, _, relevance in ranked_results):
+        relevance_scores = [relevance for _, _, relevance in ranked_results]
+    else:
+        relevance_scores = [1.0 - (score if score is not None else 1.0) for _, score, _ in ranked_results]
+    
+    selected = mmr_select(relevance_scores, embeddings, needed, diversity, available=available)
+    chosen = set(selected)
+    logger.info("다양성 재정렬 (MMR %.2f): 후보 %d개 중 %d개 선택", diversity, len(ranked_results), len(selected))
+    return [ranked_results[i] for i in selected] + [
+        item for i, item in enumerate(ranked_results) if i not in chosen
+    ]
+
+
+def _vector_search(
+    structured_query: Dict,
+    collection_name: str,
+    config: VectorDBConfig,
+    k: int,
+    metadata_filter: Optional[Dict],
+    query_embedding: Optional[List[float]] = None
+) -> List[Tuple[Document, float]]:
+    """
+    벡터 유사도 검색 (파티션 라우팅 포함)
+    
+    - 단일 컬렉션: 기존과 같이 메타데이터 필터로 검색
+    - 파티션 분할: 타입 필터에 맞는 파티션만 병렬 검색 후 거리순 상위 k개 병합
+      (파티션이 요청 타입만 담고 있으면 타입 필터 생략 → HNSW 위 필터 평가 제거)
+    """
+    query_text = structured_query.get("query_text", "")
+    targets = route_partitions(collection_name, structured_query.get("filter_artifact_types"), config)
+    
+    if len(targets) == 1 and targets[0][1] is None:
+        # 벡터 DB 재생성 (state에서 전달된 설정 사용)
+        vectorstore = create_vectorstore(
+            config=config,
+            collection_name=collection_name
         )
         
-        logger.info("기본 쿼리 사용: %s", fallback_query.query_text)
-        return fallback_query.model_dump()
+        # 동기 방식으로 검색 실행
+        if query_embedding is not None:
+            return vectorstore.similarity_search_by_vector_with_relevance_scores(
+                embedding=query_embedding,
+                k=k,
+                filter=metadata_filter
+            )
+        return vectorstore.similarity_search_with_score(
+            query=query_text,
+            k=k,
+            filter=metadata_filter
+        )
+    
+    if not targets:
+        logger.info("요청 타입을 포함한 파티션 없음: %s", structured_query.get("filter_artifact_types"))
+        return []
+    
+    # 쿼리 임베딩은 한 번만 생성해 모든 파티션에서 재사용
+    if query_embedding is None:
+        query_embedding = embed_query_texts(get_embeddings(config), [query_text])[0]
+    
+    requested_types = set(structured_query.get("filter_artifact_types") or [])
+    untyped_filter = build_metadata_filter({**structured_query, "filter_artifact_types": None})
+    
+    def search_partition(target: Tuple[str, Optional[List[str]]]) -> List[Tuple[Document, float]]:
+        name, partition_types = target
+        covered = not requested_types or set(partition_types or []) <= requested_types
+        vectorstore = create_vectorstore(config=config, collection_name=name)
+        return vectorstore.similarity_search_by_vector_with_relevance_scores(
+            embedding=query_embedding,
+            k=k,
+            filter=untyped_filter if covered else metadata_filter
+        )
+    
+    if len(targets) == 1:
+        partition_results = [search_partition(targets[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(targets), MAX_PARTITION_WORKERS)) as executor:
+            partition_results = list(executor.map(search_partition, targets))
+    
+    merged = heapq.nsmallest(
+        k,
+        (hit for hits in partition_results for hit in hits),
+        key=lambda hit: hit[1]
+    )
+    logger.info("파티션 검색: %d개 파티션 → %d개 병합", len(targets), len(merged))
+    return merged
+
+
+def _candidate_count(structured_query: Dict, needed: int) -> int:
+    """확보할 후보 수 (search_k는 이 값의 2배, 다양성 재정렬 시 후보 풀 확대)"""
+    if (structured_query.get("diversity") or 0.0) > 0:
+        return needed * MMR_POOL_FACTOR
+    return needed
 
 
-@tool
-def artifact_search_tool(
+def _result_cache_key(structured_query: Dict, collection_name: str, config: VectorDBConfig) -> str:
+    """검색 결과 캐시 키 (저장된 데이터 버전 포함)"""
+    return search_cache_key(
+        collection_name,
+        get_data_version(collection_name, config),
+        config.persist_directory,
+        structured_query
+    )
+
+
+def execute_artifact_search(
     structured_query: Dict,
     collection_name: Optional[str] = None,
-    db_config: Union[None, dict, VectorDBConfig] = None
+    db_config: Union[None, dict, VectorDBConfig] = None,
+    query_embedding: Optional[List[float]] = None,
+    offset: int = 0
 ) -> Dict:
     """
-    StructuredQuery로 벡터 검색 수행 (내부 함수)
+    StructuredQuery로 벡터 검색 수행 (artifact_search_tool / 배치 검색 / 페이지 조회 공용)
     
-    2단계 검색: 메타데이터 필터 → 벡터 유사도 검색
-    Returns: Dict (results, query_info, total_count, limited)
+    query_embedding이 주어지면 쿼리 임베딩 호출을 생략하고 해당 벡터로 검색합니다.
+    offset은 유사도 순위 기준 건너뛸 결과 수입니다 (다음 페이지 조회).
     """
     logger.info("아티팩트 검색 시작")
     
@@ -158,12 +629,6 @@ def artifact_search_tool(
         # Config 정규화
         config = normalize_config(db_config)
         
-        # 벡터 DB 재생성 (state에서 전달된 설정 사용)
-        vectorstore = create_vectorstore(
-            config=config,
-            collection_name=collection_name
-        )
-        
         # 검색 파라미터 추출
         query_text = structured_query.get("query_text", "")
         filter_types = structured_query.get("filter_artifact_types", [])
@@ -175,62 +640,64 @@ def artifact_search_tool(
         max_results = max(1, min(requested_max, MAX_SEARCH_RESULTS))
         limited = max_results < requested_max
         similarity_threshold = structured_query.get("similarity_threshold", 0.5)
+        distance_threshold = 1.0 - similarity_threshold
         
         if limited:
             logger.warning("max_results %d는 %d로 제한됩니다", requested_max, max_results)
         
         # 🔹 1차 필터: 메타데이터 필터 구성
-        filter_conditions = []
-        
-        # artifact_type 필터
-        if filter_types:
-            filter_conditions.append({"artifact_type": {"$in": filter_types}})
-        
-        # datetime 필터 (timestamp로 변환)
-        if filter_datetime_start:
-            start_ts = datetime_to_timestamp(filter_datetime_start)
-            if start_ts is not None:
-                filter_conditions.append({"timestamp": {"$gte": start_ts}})
-        
-        if filter_datetime_end:
-            end_ts = datetime_to_timestamp(filter_datetime_end)
-            if end_ts is not None:
-                filter_conditions.append({"timestamp": {"$lte": end_ts}})
-        
-        # ChromaDB 필터 구성
-        if not filter_conditions:
-            metadata_filter = None
-            logger.info("1차 필터: 없음 (전체 검색)")
-        elif len(filter_conditions) == 1:
-            metadata_filter = filter_conditions[0]
-            logger.info("1차 필터 적용: %s", metadata_filter)
-        else:
-            metadata_filter = {"$and": filter_conditions}
-            logger.info("1차 필터 적용 (다중 조건): %d개", len(filter_conditions))
+        metadata_filter = build_metadata_filter(structured_query)
         
         # 🔹 2차 검색: 유사도 검색 (1차 필터 결과 대상)
-        search_k = max_results * 2
+        offset = max(0, offset)
+        diversity = structured_query.get("diversity") or 0.0
+        candidates = _candidate_count(structured_query, offset + max_results)
+        search_k = candidates * 2
         
-        # 동기 방식으로 검색 실행
-        results_with_scores = vectorstore.similarity_search_with_score(
-            query=query_text,
-            k=search_k,
-            filter=metadata_filter
-        )
+        # 같은 쿼리의 이전 검색 결과 재사용 (저장된 데이터 버전이 같을 때만)
+        result_cache = get_search_result_cache()
+        cache_key = _result_cache_key(structured_query, collection_name, config)
+        results_with_scores = result_cache.get(cache_key, candidates, distance_threshold)
+        
+        if results_with_scores is not None:
+            logger.info("검색 결과 캐시 적중: %s", query_text)
+        else:
+            results_with_scores = _vector_search(
+                structured_query, collection_name, config, search_k,
+                metadata_filter, query_embedding
+            )
+            result_cache.put(cache_key, results_with_scores, search_k)
         
         # 검색 통계
         initial_count = len(results_with_scores)
         logger.info("1차 필터 통과: %d개", initial_count)
         
         # 🔹 유사도 임계값 필터링 (거리가 작을수록 유사함)
-        distance_threshold = 1.0 - similarity_threshold
-        filtered_results = [
+        passed_results = [
             (doc, score) 
             for doc, score in results_with_scores 
             if score <= distance_threshold
-        ][:max_results]
+        ]
+        
+        # 🔹 키워드(BM25) 결과와 순위 융합 (정확한 토큰 검색 보강)
+        ranked_results = [(doc, score, None) for doc, score in passed_results]
+        lexical_hits = 0
+        if structured_query.get("hybrid_search", True):
+            ranked_results, lexical_hits = _fuse_lexical_results(
+                structured_query, passed_results, results_with_scores,
+                collection_name, config, search_k
+            )
         
-        results = [doc for doc, score in filtered_results]
+        # 🔹 다양성 재정렬 (거의 같은 결과가 앞자리를 차지하지 않도록)
+        if diversity > 0:
+            ranked_results = _diversify_results(
+                ranked_results, diversity, offset + max_results, collection_name, config
+            )
+        
+        filtered_results = ranked_results[offset:offset + max_results]
+        has_more = len(ranked_results) > offset + max_results
+        
+        results = [doc for doc, _, _ in filtered_results]
         filtered_count = len(results)
         
         logger.info("2차 필터 (유사도 %.2f) 통과: %d개", similarity_threshold, filtered_count)
@@ -239,10 +706,14 @@ def artifact_search_tool(
         
         # Document를 딕셔너리로 변환
         artifacts = []
-        for doc in results:
+        for doc, score, relevance in filtered_results:
             artifact_dict = parse_document_content(doc.page_content)
             artifact_dict["id"] = doc.metadata.get("artifact_id", "unknown")
             artifact_dict["artifact_type"] = doc.metadata.get("artifact_type", "unknown")
+            if score is not None:
+                artifact_dict["similarity"] = round(1.0 - float(score), 4)
+            if relevance is not None:
+                artifact_dict["relevance"] = round(relevance, 5)
             artifacts.append(artifact_dict)
         
         # 결과 메시지 생성
@@ -252,6 +723,8 @@ def artifact_search_tool(
             message = f"✅ {filtered_count}개 검색 완료 (유사도 임계값 {similarity_threshold}로 필터링)"
         else:
             message = f"✅ {filtered_count}개 검색 완료"
+        if lexical_hits:
+            message += f" (키워드 일치 {lexical_hits}개 융합)"
         
         logger.info(message)
         
@@ -268,7 +741,11 @@ def artifact_search_tool(
                 "filter_types": filter_types or [],
                 "filter_datetime_start": filter_datetime_start,
                 "filter_datetime_end": filter_datetime_end,
-                "filter_used": bool(filter_conditions)
+                "filter_used": metadata_filter is not None,
+                "offset": offset,
+                "has_more": has_more,
+                "lexical_hits": lexical_hits,
+                "diversity": diversity
             }
         }
         
@@ -280,8 +757,130 @@ def artifact_search_tool(
         return create_search_error_response(f"아티팩트 검색 실패: {type(e).__name__} - {str(e)}", structured_query)
 
 
-@tool
-def search_artifacts_tool(natural_language_goal: str) -> Dict:
+async def aexecute_artifact_search(
+    structured_query: Dict,
+    collection_name: Optional[str] = None,
+    db_config: Union[None, dict, VectorDBConfig] = None,
+    query_embedding: Optional[List[float]] = None,
+    offset: int = 0
+) -> Dict:
+    """
+    execute_artifact_search의 비동기 버전
+
+    쿼리 임베딩은 비동기 API로 생성하고, ChromaDB 조회(동기 클라이언트)는 스레드로 넘겨
+    여러 검색이 이벤트 루프에서 동시에 진행되도록 합니다.
+    """
+    if collection_name is None:
+        collection_name = ToolContext.get_collection_name()
+    if db_config is None:
+        db_config = ToolContext.get_db_config()
+
+    if query_embedding is None:
+        try:
+            config = normalize_config(db_config)
+            needed = _candidate_count(
+                structured_query,
+                max(0, offset) + max(1, min(structured_query.get("max_results", 300), MAX_SEARCH_RESULTS))
+            )
+            distance_threshold = 1.0 - structured_query.get("similarity_threshold", 0.5)
+            cached = get_search_result_cache().peek(
+                _result_cache_key(structured_query, collection_name, config), needed, distance_threshold
+            )
+            # 캐시로 응답할 수 있으면 임베딩 생략
+            if not cached:
+                embeddings = get_embeddings(config)
+                query_embedding = await embeddings.aembed_query(structured_query.get("query_text", ""))
+        except Exception as e:
+            logger.debug("비동기 쿼리 임베딩 실패, 검색 스레드에서 임베딩: %s", e)
+
+    return await asyncio.to_thread(
+        execute_artifact_search,
+        structured_query,
+        collection_name,
+        db_config,
+        query_embedding,
+        offset
+    )
+
+
+def present_search_result(
+    search_result: Dict,
+    structured_query: Dict,
+    collection_name: Optional[str] = None,
+    db_config: Union[None, dict, VectorDBConfig] = None
+) -> Dict:
+    """
+    검색 결과를 에이전트에게 전달할 형태로 정리 (세션 기준)
+    
+    - 이번 실행에서 이미 보여준 아티팩트는 already_shown_ids에 ID만 표시
+    - 추가 결과가 남아 있으면 next_cursor 발급 (search_next_page_tool로 조회)
+    """
+    if collection_name is None:
+        collection_name = ToolContext.get_collection_name()
+    session = get_search_session(ToolContext.get_session_id())
+    
+    new_artifacts, shown_ids = session.split_new(search_result.get("artifacts", []))
+    presented = {**search_result, "artifacts": new_artifacts}
+    
+    if shown_ids:
+        presented["already_shown_ids"] = shown_ids
+        presented["message"] = (
+            f"{search_result.get('message', '')} "
+            f"(신규 {len(new_artifacts)}개, 이전에 확인한 {len(shown_ids)}개는 ID만 표시)"
+        )
+    
+    metadata = search_result.get("metadata", {})
+    if metadata.get("has_more"):
+        next_offset = metadata.get("offset", 0) + metadata.get("returned", 0)
+        presented["next_cursor"] = session.create_cursor(
+            structured_query, next_offset, collection_name, db_config
+        )
+    
+    return presented
+
+
+def render_search_result(presented: Dict) -> str:
+    """
+    정리된 검색 결과를 토큰 예산 안의 텍스트로 변환하고, 표에 들어간 아티팩트만 표시 완료로 기록
+
+    예산 초과로 생략된 행은 기록하지 않으므로 다시 검색하면 원문으로 돌아옵니다.
+    """
+    text, rendered_ids = fit_search_result(presented, ToolContext.get_result_token_budget())
+    get_search_session(ToolContext.get_session_id()).mark_shown(rendered_ids)
+    return text
+
+
+def artifact_search(
+    structured_query: Dict,
+    collection_name: Optional[str] = None,
+    db_config: Union[None, dict, VectorDBConfig] = None
+) -> Dict:
+    """
+    StructuredQuery로 벡터 검색 수행 (내부 함수)
+    
+    2단계 검색: 메타데이터 필터 → 벡터 유사도 검색
+    Returns: Dict (results, query_info, total_count, limited)
+    """
+    return execute_artifact_search(structured_query, collection_name, db_config)
+
+
+async def aartifact_search(
+    structured_query: Dict,
+    collection_name: Optional[str] = None,
+    db_config: Union[None, dict, VectorDBConfig] = None
+) -> Dict:
+    """artifact_search의 비동기 버전"""
+    return await aexecute_artifact_search(structured_query, collection_name, db_config)
+
+
+artifact_search_tool = StructuredTool.from_function(
+    func=artifact_search,
+    coroutine=aartifact_search,
+    name="artifact_search_tool"
+)
+
+
+def search_artifacts(natural_language_goal: str) -> str:
     """
     디지털 포렌식 아티팩트를 검색합니다. (통합 도구)
     
@@ -307,45 +906,33 @@ def search_artifacts_tool(natural_language_goal: str) -> Dict:
     - "브라우저 다운로드 기록에서 .exe 파일" ✅
     - "의심스러운 파일" ❌ (너무 광범위)
     
-    [검색 결과 구조]
-    - artifacts: 실제 검색된 아티팩트 리스트
-    - message: 검색 완료 메시지
-    - metadata: 검색 통계 (개수, 필터 적용 여부 등)
+    [검색 결과 구조] (토큰 절감을 위한 압축 텍스트)
+    - 첫 줄: 검색 완료 메시지
+    - [artifact_type] N건: 타입별 표 (id + 값이 있는 컬럼만, 긴 값은 "…(+N자)"로 생략)
+    - 공통: 해당 타입의 모든 행이 같은 값을 가진 컬럼
+    - 이미 확인한 아티팩트(ID만): 이번 분석에서 이미 확인한 아티팩트 ID (내용 생략)
+    - next_cursor: 추가 결과가 있을 때 발급 (search_next_page_tool로 다음 페이지 조회)
+    - 토큰 예산을 넘으면 유사도가 낮은 행부터 생략
     
     Args:
         natural_language_goal: 구체적인 검색 목표 (자연어)
     
     Returns:
-        Dict: {
-            "artifacts": [
-                {
-                    "id": "artifact_001",
-                    "artifact_type": "usb_files",
-                    "device_name": "Samsung",
-                    "file_name": "secret.pdf",
-                    ...
-                }
-            ],
-            "message": "18개 검색 완료",
-            "metadata": {
-                "requested": 20,
-                "returned": 18,
-                "filtered_from": 150,
-                "limited": False,
-                "threshold": 0.7,
-                "filter_types": ["usb_files"]
-            }
-        }
+        str: 예)
+            ✅ 18개 검색 완료
+            
+            [usb_files] 2건
+            공통: device_name=Samsung
+            | id | file_name | connected_at |
+            |---|---|---|
+            | artifact_001 | secret.pdf | 2024-01-15T10:20:00 |
+            | artifact_007 | plan.docx | 2024-01-15T10:25:00 |
+            next_cursor: cursor_1
     
     Examples:
         >>> search_artifacts_tool("USB로 전송된 기밀 문서")
-        {'artifacts': [...], 'message': '5개 검색 완료'}
-        
         >>> search_artifacts_tool("2024-01-15 오전 브라우저 다운로드 기록")
-        {'artifacts': [...], 'message': '12개 검색 완료'}
-        
         >>> search_artifacts_tool("이력서 관련 웹사이트 접속 기록")
-        {'artifacts': [...], 'message': '8개 검색 완료'}
     
     Note:
         - 최대 300개 결과 제한
@@ -357,49 +944,766 @@ def search_artifacts_tool(natural_language_goal: str) -> Dict:
     # Step 1: 쿼리 생성
     logger.info("Step 1/2: 검색 쿼리 최적화 중...")
     try:
-        query_result = query_planner_tool.invoke({"natural_language_goal": natural_language_goal})
+        query_result = plan_query(natural_language_goal)
         logger.info("쿼리 생성 완료")
     except Exception as e:
         logger.error("쿼리 생성 실패: %s", str(e), exc_info=True)
-        return {
-            "artifacts": [],
-            "message": f"❌ 쿼리 생성 실패: {str(e)}",
-            "metadata": {"returned": 0}
-        }
+        return f"❌ 쿼리 생성 실패: {str(e)}"
     
     # Step 2: 검색 실행
     logger.info("Step 2/2: 아티팩트 검색 중...")
     try:
-        search_result = artifact_search_tool.invoke({
-            "structured_query": query_result,
-            "collection_name": None,
-            "db_config": None
-        })
+        search_result = execute_artifact_search(query_result)
         
         artifacts_count = len(search_result.get("artifacts", []))
         logger.info("통합 검색 완료: %d개 발견", artifacts_count)
-        return search_result
+        presented = present_search_result(search_result, query_result)
+        return render_search_result(presented)
         
     except Exception as e:
         logger.error("검색 실패: %s", str(e), exc_info=True)
-        return {
-            "artifacts": [],
-            "message": f"❌ 검색 실패: {str(e)}",
-            "metadata": {"returned": 0}
+        return f"❌ 검색 실패: {str(e)}"
+
+
+async def asearch_artifacts(natural_language_goal: str) -> str:
+    """search_artifacts의 비동기 버전 (ToolNode가 여러 도구 호출을 동시에 실행)"""
+    logger.info("=== 통합 검색 실행 (async) ===")
+    
+    try:
+        query_result = await aplan_query(natural_language_goal)
+    except Exception as e:
+        logger.error("쿼리 생성 실패: %s", str(e), exc_info=True)
+        return f"❌ 쿼리 생성 실패: {str(e)}"
+    
+    try:
+        search_result = await aexecute_artifact_search(query_result)
+        
+        artifacts_count = len(search_result.get("artifacts", []))
+        logger.info("통합 검색 완료: %d개 발견", artifacts_count)
+        presented = present_search_result(search_result, query_result)
+        return render_search_result(presented)
+        
+    except Exception as e:
+        logger.error("검색 실패: %s", str(e), exc_info=True)
+        return f"❌ 검색 실패: {str(e)}"
+
+
+search_artifacts_tool = StructuredTool.from_function(
+    func=search_artifacts,
+    coroutine=asearch_artifacts,
+    name="search_artifacts_tool"
+)
+
+
+MAX_BATCH_GOALS = 8  # 배치 검색 1회당 최대 검색 목표 수
+
+
+def _normalize_batch_goals(natural_language_goals: List[str]) -> List[str]:
+    """빈 목표/중복 목표 정리 및 개수 제한"""
+    goals = []
+    for goal in natural_language_goals:
+        if goal and goal.strip() and goal not in goals:
+            goals.append(goal)
+    if len(goals) > MAX_BATCH_GOALS:
+        logger.warning("검색 목표 %d개는 %d개로 제한됩니다", len(goals), MAX_BATCH_GOALS)
+        goals = goals[:MAX_BATCH_GOALS]
+    return goals
+
+
+def _merge_batch_results(
+    goals: List[str],
+    plans: List[Optional[Dict]],
+    search_results: Dict[int, Dict],
+    collection_name: str,
+    db_config: Union[None, dict, VectorDBConfig]
+) -> str:
+    """목표별 검색 결과를 ID 기준으로 중복 제거하여 병합하고 압축 텍스트로 변환"""
+    session = get_search_session(ToolContext.get_session_id())
+    merged: Dict[str, Dict] = {}
+    goal_summaries = []
+    total_hits = 0
+    for idx, goal in enumerate(goals):
+        plan = plans[idx]
+        if plan is None:
+            goal_summaries.append({
+                "index": idx, "goal": goal, "query_text": None,
+                "returned": 0, "message": "❌ 쿼리 생성 실패"
+            })
+            continue
+        
+        result = search_results.get(idx, {})
+        artifacts = result.get("artifacts", [])
+        total_hits += len(artifacts)
+        for artifact in artifacts:
+            artifact_id = artifact.get("id", "unknown")
+            if artifact_id in merged:
+                merged[artifact_id]["matched_goals"].append(idx)
+            else:
+                merged[artifact_id] = {**artifact, "matched_goals": [idx]}
+        
+        summary = {
+            "index": idx,
+            "goal": goal,
+            "query_text": plan.get("query_text"),
+            "returned": len(artifacts),
+            "message": result.get("message", "")
+        }
+        metadata = result.get("metadata", {})
+        if metadata.get("has_more"):
+            summary["next_cursor"] = session.create_cursor(
+                plan, metadata.get("offset", 0) + len(artifacts), collection_name, db_config
+            )
+        goal_summaries.append(summary)
+    
+    # 이번 실행에서 이미 보여준 아티팩트는 ID만 반환
+    new_artifacts, shown_ids = session.split_new(list(merged.values()))
+    
+    message = (
+        f"✅ {len(goals)}개 목표, {len(merged)}개 아티팩트 검색 완료 "
+        f"(중복 제거 전 {total_hits}개, 신규 {len(new_artifacts)}개)"
+    )
+    logger.info(message)
+    
+    response = {
+        "artifacts": new_artifacts,
+        "goals": goal_summaries,
+        "message": message,
+        "metadata": {
+            "goal_count": len(goals),
+            "returned": len(merged),
+            "total_hits": total_hits
         }
+    }
+    if shown_ids:
+        response["already_shown_ids"] = shown_ids
+    return render_search_result(response)
 
 
-# 웹 검색 도구 (Tavily)
-web_search_tool = TavilySearch(max_results=3)
-web_search_tool.name = "web_search_tool"
-web_search_tool.description = """
-웹에서 최신 정보를 검색합니다. 보안 위협, 공격 기법, CVE 정보 등 
-외부 정보가 필요할 때 사용하세요.
-"""
+def batch_search_artifacts(natural_language_goals: List[str]) -> str:
+    """
+    여러 검색 목표를 한 번에 검색합니다. (배치 통합 도구)
+    
+    서로 독립적인 검색을 여러 번 나누어 호출하는 대신 한 번의 호출로 처리합니다.
+    - 모든 목표의 쿼리를 동시에 생성
+    - 모든 query_text를 한 번의 임베딩 호출로 변환
+    - 검색을 병렬로 실행한 뒤 ID 기준으로 중복 제거하여 병합
+    
+    Args:
+        natural_language_goals: 구체적인 검색 목표 리스트 (최대 8개)
+    
+    Returns:
+        str: search_artifacts_tool과 같은 압축 텍스트 + 목표별 요약 줄
+            - 목표 0: USB 연결 기록 → 12건 (query: ..., next_cursor=cursor_2)
+            - 표의 goals 컬럼: 해당 아티팩트를 찾은 목표 번호
+    
+    Examples:
+        >>> batch_search_artifacts_tool(["USB 장치 연결 기록", "크롬 다운로드 .zip 파일", "휴지통 삭제 파일"])
+    """
+    logger.info("=== 배치 검색 실행: %d개 목표 ===", len(natural_language_goals))
+    
+    goals = _normalize_batch_goals(natural_language_goals)
+    if not goals:
+        return "❌ 검색 목표가 비어있습니다"
+    
+    collection_name = ToolContext.get_collection_name()
+    db_config = ToolContext.get_db_config()
+    
+    # Step 1: 모든 목표의 쿼리를 동시에 생성
+    def _plan(goal: str) -> Optional[Dict]:
+        try:
+            return plan_query(goal)
+        except Exception as e:
+            logger.error("쿼리 생성 실패 (%s): %s", goal, str(e))
+            return None
+    
+    with ContextThreadPoolExecutor(max_workers=len(goals)) as executor:
+        plans = list(executor.map(_plan, goals))
+    
+    # Step 2: 모든 query_text를 한 번의 호출로 임베딩
+    planned = [(idx, plan) for idx, plan in enumerate(plans) if plan is not None]
+    query_embeddings: Dict[int, List[float]] = {}
+    try:
+        embeddings = get_embeddings(normalize_config(db_config))
+        vectors = embed_query_texts(embeddings, [plan.get("query_text", "") for _, plan in planned])
+        query_embeddings = {idx: vector for (idx, _), vector in zip(planned, vectors)}
+    except Exception as e:
+        logger.warning("배치 임베딩 실패, 검색별 임베딩으로 진행: %s", str(e))
+    
+    # Step 3: 검색 병렬 실행
+    def _search(item: Tuple[int, Dict]) -> Dict:
+        idx, plan = item
+        return execute_artifact_search(
+            plan,
+            collection_name=collection_name,
+            db_config=db_config,
+            query_embedding=query_embeddings.get(idx)
+        )
+    
+    with ContextThreadPoolExecutor(max_workers=len(planned) or 1) as executor:
+        search_results = dict(zip([idx for idx, _ in planned], executor.map(_search, planned)))
+    
+    # Step 4: ID 기준 중복 제거 + 목표별 출처 표시
+    return _merge_batch_results(goals, plans, search_results, collection_name, db_config)
+
+
+async def abatch_search_artifacts(natural_language_goals: List[str]) -> str:
+    """batch_search_artifacts의 비동기 버전 (쿼리 생성/검색을 asyncio.gather로 동시 실행)"""
+    logger.info("=== 배치 검색 실행 (async): %d개 목표 ===", len(natural_language_goals))
+    
+    goals = _normalize_batch_goals(natural_language_goals)
+    if not goals:
+        return "❌ 검색 목표가 비어있습니다"
+    
+    collection_name = ToolContext.get_collection_name()
+    db_config = ToolContext.get_db_config()
+    
+    async def _plan(goal: str) -> Optional[Dict]:
+        try:
+            return await aplan_query(goal)
+        except Exception as e:
+            logger.error("쿼리 생성 실패 (%s): %s", goal, str(e))
+            return None
+    
+    plans = list(await asyncio.gather(*(_plan(goal) for goal in goals)))
+    
+    planned = [(idx, plan) for idx, plan in enumerate(plans) if plan is not None]
+    query_embeddings: Dict[int, List[float]] = {}
+    try:
+        embeddings = get_embeddings(normalize_config(db_config))
+        vectors = await aembed_query_texts(embeddings, [plan.get("query_text", "") for _, plan in planned])
+        query_embeddings = {idx: vector for (idx, _), vector in zip(planned, vectors)}
+    except Exception as e:
+        logger.warning("배치 임베딩 실패, 검색별 임베딩으로 진행: %s", str(e))
+    
+    results = await asyncio.gather(*(
+        aexecute_artifact_search(
+            plan,
+            collection_name=collection_name,
+            db_config=db_config,
+            query_embedding=query_embeddings.get(idx)
+        )
+        for idx, plan in planned
+    ))
+    search_results = dict(zip([idx for idx, _ in planned], results))
+    
+    return _merge_batch_results(goals, plans, search_results, collection_name, db_config)
+
+
+batch_search_artifacts_tool = StructuredTool.from_function(
+    func=batch_search_artifacts,
+    coroutine=abatch_search_artifacts,
+    name="batch_search_artifacts_tool"
+)
+
+
+def _next_page_cursor(cursor: str) -> Optional[SearchCursor]:
+    """커서 조회 (없으면 None)"""
+    session = get_search_session(ToolContext.get_session_id())
+    cursor_state = session.get_cursor(cursor)
+    if cursor_state is not None:
+        logger.info("다음 페이지 조회: %s (offset %d)", cursor, cursor_state.offset)
+    return cursor_state
+
+
+def search_next_page(cursor: str) -> str:
+    """
+    이전 검색 결과의 다음 페이지를 조회합니다.
+    
+    검색 결과에 next_cursor가 있을 때만 사용하세요. 쿼리를 다시 생성하지 않고
+    같은 조건(필터, 유사도 순위)으로 이어지는 결과를 반환합니다.
+    max_results를 늘려 같은 검색을 반복하는 대신 이 도구를 사용하세요.
+    
+    Args:
+        cursor: 검색 결과의 next_cursor 값 (예: "cursor_3")
+    
+    Returns:
+        str: search_artifacts_tool과 동일한 압축 텍스트
+    """
+    cursor_state = _next_page_cursor(cursor)
+    if cursor_state is None:
+        return f"❌ 유효하지 않은 커서입니다: {cursor}"
+    
+    search_result = execute_artifact_search(
+        cursor_state.structured_query,
+        collection_name=cursor_state.collection_name,
+        db_config=cursor_state.db_config,
+        offset=cursor_state.offset
+    )
+    presented = present_search_result(
+        search_result,
+        cursor_state.structured_query,
+        collection_name=cursor_state.collection_name,
+        db_config=cursor_state.db_config
+    )
+    return render_search_result(presented)
+
+
+async def asearch_next_page(cursor: str) -> str:
+    """search_next_page의 비동기 버전"""
+    cursor_state = _next_page_cursor(cursor)
+    if cursor_state is None:
+        return f"❌ 유효하지 않은 커서입니다: {cursor}"
+    
+    search_result = await aexecute_artifact_search(
+        cursor_state.structured_query,
+        collection_name=cursor_state.collection_name,
+        db_config=cursor_state.db_config,
+        offset=cursor_state.offset
+    )
+    presented = present_search_result(
+        search_result,
+        cursor_state.structured_query,
+        collection_name=cursor_state.collection_name,
+        db_config=cursor_state.db_config
+    )
+    return render_search_result(presented)
+
+
+search_next_page_tool = StructuredTool.from_function(
+    func=search_next_page,
+    coroutine=asearch_next_page,
+    name="search_next_page_tool"
+)
+
+
+def aggregate_artifacts_in_collection(
+    group_by: Optional[List[str]] = None,
+    metric: str = "count",
+    field: Optional[str] = None,
+    artifact_types: Optional[List[str]] = None,
+    datetime_start: Optional[str] = None,
+    datetime_end: Optional[str] = None,
+    time_bucket: Optional[str] = None,
+    contains: Optional[Dict[str, str]] = None,
+    top_n: int = 20
+) -> str:
+    """
+    아티팩트 개수/통계를 집계합니다. (원본 행 대신 작은 집계표 반환)
+    
+    "날짜별 USB 연결 횟수", "가장 많이 방문한 도메인", "타입별 아티팩트 수"처럼
+    개수, 빈도, 최솟값/최댓값이 필요할 때 검색 결과를 직접 세지 말고 이 도구를 사용하세요.
+    임베딩/LLM 호출 없이 저장 시 생성된 로컬 컬럼 인덱스에서 즉시 계산합니다.
+    
+    Args:
+        group_by: 그룹 컬럼 목록. 기본 컬럼(artifact_type, source) 또는 data 필드 이름
+            - 파생 컬럼: "url:domain" (URL 도메인), "file_name:ext" (파일 확장자)
+        metric: "count"(기본) | "nunique" | "min" | "max"
+        field: nunique/min/max 대상 컬럼 (예: "datetime", "file_name")
+        artifact_types: artifact_type 필터 (예: ["usb_files"])
+        datetime_start / datetime_end: 시간 범위 필터 (ISO 8601)
+        time_bucket: "hour" | "day" | "week" | "month" - 시간 구간별 히스토그램
+        contains: 부분 문자열 필터 {컬럼: 값} (대소문자 무시, 예: {"url": "mail"})
+        top_n: 반환할 최대 그룹 수 (기본 20, 최대 100)
+    
+    Returns:
+        str: 예)
+            ✅ 집계 완료: 대상 42개, 그룹 3개
+            | day_bucket | count |
+            |---|---|
+            | 2024-01-15 | 30 |
+    
+    Examples:
+        >>> aggregate_artifacts_tool(artifact_types=["usb_files"], time_bucket="day")
+        >>> aggregate_artifacts_tool(group_by=["url:domain"], artifact_types=["Chrome.history"], top_n=10)
+        >>> aggregate_artifacts_tool(group_by=["artifact_type"], metric="max", field="datetime")
+    """
+    collection_name = ToolContext.get_collection_name()
+    config = normalize_config(ToolContext.get_db_config())
+    
+    frame = get_artifact_frame(collection_name, config)
+    if frame is None:
+        return "❌ 집계용 로컬 인덱스가 없습니다. search_artifacts_tool을 사용하세요."
+    
+    try:
+        result = aggregate_artifacts(
+            frame,
+            group_by=group_by,
+            metric=metric,
+            field=field,
+            artifact_types=artifact_types,
+            datetime_start=datetime_start,
+            datetime_end=datetime_end,
+            time_bucket=time_bucket,
+            contains=contains,
+            top_n=top_n
+        )
+    except AggregationError as e:
+        columns = ", ".join(str(column) for column in frame.columns)
+        return f"❌ {e}\n사용 가능한 컬럼: {columns}"
+    
+    logger.info("집계 완료: 대상 %d개, 그룹 %d개", result["matched"], result["total_groups"])
+    return format_aggregate_result(result)
+
+
+async def aaggregate_artifacts_in_collection(
+    group_by: Optional[List[str]] = None,
+    metric: str = "count",
+    field: Optional[str] = None,
+    artifact_types: Optional[List[str]] = None,
+    datetime_start: Optional[str] = None,
+    datetime_end: Optional[str] = None,
+    time_bucket: Optional[str] = None,
+    contains: Optional[Dict[str, str]] = None,
+    top_n: int = 20
+) -> str:
+    """aggregate_artifacts_in_collection의 비동기 버전 (pandas 연산은 스레드에서 실행)"""
+    return await asyncio.to_thread(
+        aggregate_artifacts_in_collection,
+        group_by, metric, field, artifact_types,
+        datetime_start, datetime_end, time_bucket, contains, top_n
+    )
+
+
+aggregate_artifacts_tool = StructuredTool.from_function(
+    func=aggregate_artifacts_in_collection,
+    coroutine=aaggregate_artifacts_in_collection,
+    name="aggregate_artifacts_tool"
+)
+
+
+MAX_TIMELINE_RESULTS = 200  # 시간 창 조회 1회당 최대 결과 수
+
+
+def _frame_row_summary(record: pd.Series) -> Dict:
+    """프레임 행 → 표 출력용 요약 (id, artifact_type, datetime, 비어있지 않은 data 필드)"""
+    base_columns = set(BASE_COLUMNS)
+    return {
+        "id": record["artifact_id"],
+        "artifact_type": record["artifact_type"],
+        "datetime": record["datetime"].isoformat() if pd.notna(record["datetime"]) else None,
+        "fields": {
+            key: value for key, value in record.items()
+            if key not in base_columns and isinstance(value, str) and value
+        }
+    }
+
+
+def timeline_window(
+    artifact_ids: Optional[List[str]] = None,
+    center_times: Optional[List[str]] = None,
+    minutes_before: float = 10.0,
+    minutes_after: float = 10.0,
+    artifact_types: Optional[List[str]] = None,
+    max_results: int = 50
+) -> str:
+    """
+    기준 아티팩트(또는 시각) 전후 시간 창 안의 모든 아티팩트를 시간순으로 조회합니다.
+    
+    "USB 연결 ±10분 동안 무슨 일이 있었는지"처럼 타임라인 재구성이 필요할 때
+    의미 검색 + 시간 필터 대신 이 도구를 사용하세요. 임베딩 호출 없이 정렬된
+    타임스탬프 인덱스를 이진 탐색하므로 빠르고 누락이 없습니다.
+    
+    Args:
+        artifact_ids: 기준 아티팩트 ID 목록 (예: ["artifact_045"])
+        center_times: 기준 시각 목록 (ISO 8601, 예: ["2024-06-15T14:30:00"])
+        minutes_before: 기준 시각 이전 범위 (분, 기본 10)
+        minutes_after: 기준 시각 이후 범위 (분, 기본 10)
+        artifact_types: artifact_type 필터 (예: ["lnk_files", "Chrome.downloads"])
+        max_results: 최대 결과 수 (기본 50, 최대 200) - 초과 시 기준 시각에 가까운 순으로 유지
+    
+    Returns:
+        str: 시간순 표 (Δ: 가장 가까운 기준 시각과의 차이, *: 기준 아티팩트)
+    
+    Examples:
+        >>> timeline_window_tool(artifact_ids=["artifact_045"], minutes_before=10, minutes_after=10)
+        >>> timeline_window_tool(center_times=["2024-06-15T14:30:00"], artifact_types=["lnk_files"])
+    """
+    collection_name = ToolContext.get_collection_name()
+    config = normalize_config(ToolContext.get_db_config())
+    
+    timeline = get_timeline_index(collection_name, config)
+    frame = get_artifact_frame(collection_name, config)
+    if timeline is None or frame is None:
+        return "❌ 타임라인 인덱스가 없습니다. search_artifacts_tool을 시간 필터와 함께 사용하세요."
+    
+    # 기준 시각 수집
+    anchors: List[Tuple[str, float]] = []
+    missing: List[str] = []
+    for artifact_id in artifact_ids or []:
+        timestamp = timeline.timestamp_of(artifact_id)
+        if timestamp is None:
+            missing.append(artifact_id)
+        else:
+            anchors.append((artifact_id, timestamp))
+    for center_time in center_times or []:
+        timestamp = datetime_to_timestamp(center_time)
+        if timestamp is None:
+            missing.append(center_time)
+        else:
+            anchors.append((center_time, timestamp))
+    
+    if not anchors:
+        return f"❌ 기준 아티팩트/시각을 찾을 수 없습니다: {', '.join(missing) or '(입력 없음)'}"
+    
+    # 기준별 이진 탐색 → 행별로 가장 가까운 기준과의 차이 기록
+    before = max(0.0, minutes_before) * 60
+    after = max(0.0, minutes_after) * 60
+    row_delta: Dict[int, float] = {}
+    for _, center in anchors:
+        rows = timeline.window(center - before, center + after, artifact_types)
+        deltas = timeline.row_timestamps(rows) - center
+        for row, delta in zip(rows.tolist(), deltas.tolist()):
+            if row not in row_delta or abs(delta) < abs(row_delta[row]):
+                row_delta[row] = delta
+    
+    max_results = max(1, min(max_results, MAX_TIMELINE_RESULTS))
+    selected = sorted(row_delta, key=lambda row: abs(row_delta[row]))[:max_results]
+    row_timestamps = timeline.row_timestamps(np.asarray(selected, dtype=np.int64)).tolist()
+    ordered = [row for _, row in sorted(zip(row_timestamps, selected))]
+    
+    anchor_ids = set(artifact_ids or [])
+    records = []
+    for row in ordered:
+        record = frame.iloc[row]
+        records.append({
+            **_frame_row_summary(record),
+            "delta": row_delta[row],
+            "is_anchor": record["artifact_id"] in anchor_ids
+        })
+    
+    message = f"✅ 시간 창 조회: 기준 {len(anchors)}개, {len(row_delta)}개 발견"
+    if len(row_delta) > len(records):
+        message += f" (기준 시각에 가까운 {len(records)}개 표시)"
+    if missing:
+        message += f" / 찾을 수 없는 기준: {', '.join(missing)}"
+    logger.info(message)
+    
+    result = {
+        "message": message,
+        "anchors": [
+            {"label": label, "datetime": timestamp_to_datetime(timestamp)}
+            for label, timestamp in anchors
+        ],
+        "rows": records
+    }
+    return format_timeline_result(result, ToolContext.get_result_token_budget())
+
+
+async def atimeline_window(
+    artifact_ids: Optional[List[str]] = None,
+    center_times: Optional[List[str]] = None,
+    minutes_before: float = 10.0,
+    minutes_after: float = 10.0,
+    artifact_types: Optional[List[str]] = None,
+    max_results: int = 50
+) -> str:
+    """timeline_window의 비동기 버전"""
+    return await asyncio.to_thread(
+        timeline_window,
+        artifact_ids, center_times, minutes_before, minutes_after, artifact_types, max_results
+    )
+
+
+timeline_window_tool = StructuredTool.from_function(
+    func=timeline_window,
+    coroutine=atimeline_window,
+    name="timeline_window_tool"
+)
+
+
+MAX_LOOKUP_IDS = 50  # ID 조회 1회당 최대 아티팩트 수
+
+
+def get_artifacts_by_ids(artifact_ids: List[str]) -> str:
+    """
+    아티팩트 ID로 원본 레코드 전체를 조회합니다. (검색 없이 정확히 조회)
+    
+    이전 검색/시간 창 결과에서 이미 알고 있는 artifact_id의 전체 내용이 필요할 때 사용하세요.
+    검색 결과 표는 긴 값을 생략하지만, 이 도구는 저장 시점의 원본 레코드를
+    (id, artifact_type, source, collected_at, data) 그대로 반환합니다.
+    
+    Args:
+        artifact_ids: 조회할 아티팩트 ID 목록 (최대 50개)
+    
+    Returns:
+        str: 아티팩트별 원본 JSON 한 줄 + 찾을 수 없는 ID 목록
+    
+    Examples:
+        >>> get_artifacts_by_ids_tool(["artifact_045", "artifact_067"])
+    """
+    collection_name = ToolContext.get_collection_name()
+    config = normalize_config(ToolContext.get_db_config())
+    
+    store = get_artifact_store(collection_name, config)
+    if store is None:
+        return "❌ 원본 아티팩트 저장소가 없습니다. search_artifacts_tool을 사용하세요."
+    
+    requested = [artifact_id for artifact_id in dict.fromkeys(artifact_ids) if artifact_id]
+    if not requested:
+        return "❌ 조회할 아티팩트 ID가 비어있습니다"
+    if len(requested) > MAX_LOOKUP_IDS:
+        logger.warning("아티팩트 ID %d개는 %d개로 제한됩니다", len(requested), MAX_LOOKUP_IDS)
+        requested = requested[:MAX_LOOKUP_IDS]
+    
+    found = store.get_many(requested)
+    records = [found[artifact_id] for artifact_id in requested if artifact_id in found]
+    missing = [artifact_id for artifact_id in requested if artifact_id not in found]
+    logger.info("ID 조회: %d개 요청, %d개 발견", len(requested), len(records))
+    
+    return format_artifact_records(records, missing, ToolContext.get_result_token_budget())
+
+
+async def aget_artifacts_by_ids(artifact_ids: List[str]) -> str:
+    """get_artifacts_by_ids의 비동기 버전"""
+    return await asyncio.to_thread(get_artifacts_by_ids, artifact_ids)
+
+
+get_artifacts_by_ids_tool = StructuredTool.from_function(
+    func=get_artifacts_by_ids,
+    coroutine=aget_artifacts_by_ids,
+    name="get_artifacts_by_ids_tool"
+)
+
+
+MAX_TRACE_RESULTS = 300  # 엔티티 추적 1회당 최대 결과 수
+
+
+def trace_entity(
+    entity: str,
+    kind: str = "auto",
+    artifact_types: Optional[List[str]] = None,
+    max_results: int = 100
+) -> str:
+    """
+    파일명/경로/드라이브/장치 시리얼/도메인 하나와 관련된 모든 아티팩트를 시간순으로 조회합니다.
+    
+    같은 파일이 lnk_files, prefetch_files, Chrome.downloads, recycle_bin_files, USB/메신저 기록 등
+    여러 아티팩트에 남긴 흔적을 의미 검색을 반복하지 않고 한 번에 연결할 때 사용하세요.
+    저장 시 추출한 엔티티 역색인을 조회하므로 임베딩 호출이 없고 누락이 없습니다.
+    경로를 입력하면 같은 파일명의 다른 위치 기록도 함께 찾습니다.
+    
+    Args:
+        entity: 추적할 값 (예: "Strategy2025.docx", "E:\\Work\\Strategy2025.docx", "E:",
+            "S5XXNJ0R123456", "drive.google.com") 또는 "file:값" 같은 종류 지정 형식
+        kind: auto | file | path | drive | serial | domain (기본 auto: 입력 형태로 판단)
+        artifact_types: artifact_type 필터 (예: ["lnk_files", "recycle_bin_files"])
+        max_results: 최대 결과 수 (기본 100, 최대 300) - 초과 시 처음과 마지막 기록 위주로 유지
+    
+    Returns:
+        str: 시간순 표 (일치한 엔티티 키, 함께 나타난 다른 엔티티 요약 포함)
+    
+    Examples:
+        >>> trace_entity_tool(entity="Strategy2025.docx")
+        >>> trace_entity_tool(entity="S5XXNJ0R123456", kind="serial")
+    """
+    collection_name = ToolContext.get_collection_name()
+    config = normalize_config(ToolContext.get_db_config())
+    
+    index = get_entity_index(collection_name, config)
+    frame = get_artifact_frame(collection_name, config)
+    if index is None or frame is None:
+        return "❌ 엔티티 인덱스가 없습니다. search_artifacts_tool을 사용하세요."
+    
+    keys = entity_query_keys(entity, kind)
+    if not keys:
+        return "❌ 추적할 엔티티가 비어있습니다"
+    
+    matched = index.lookup(keys)
+    if artifact_types:
+        types = frame["artifact_type"].to_numpy()
+        allowed = set(artifact_types)
+        matched = {row: hits for row, hits in matched.items() if types[row] in allowed}
+    if not matched:
+        return f"✅ '{entity}' 관련 아티팩트 없음 (조회 키: {', '.join(keys)})"
+    
+    # 시간순 정렬 (시각 없는 기록은 마지막)
+    timestamps = frame["timestamp"].to_numpy(dtype=np.float64)
+    ordered = sorted(matched, key=lambda row: (np.isnan(timestamps[row]), timestamps[row], row))
+    
+    max_results = max(1, min(max_results, MAX_TRACE_RESULTS))
+    shown = ordered
+    if len(ordered) > max_results:
+        head = (max_results + 1) // 2
+        shown = ordered[:head] + ordered[len(ordered) - (max_results - head):]
+    
+    records = [
+        {**_frame_row_summary(frame.iloc[row]), "matched": matched[row]}
+        for row in shown
+    ]
+    type_counts = pd.Series([frame.iloc[row]["artifact_type"] for row in ordered]).value_counts()
+    message = (
+        f"✅ '{entity}' 추적: {len(ordered)}개 아티팩트 "
+        f"({', '.join(f'{name} {count}' for name, count in type_counts.items())})"
+    )
+    if len(ordered) > len(records):
+        message += f" - 처음/마지막 {len(records)}개 표시"
+    logger.info(message)
+    
+    result = {
+        "message": message,
+        "related": index.co_occurring(ordered, exclude=keys),
+        "rows": records
+    }
+    return format_entity_trace(result, ToolContext.get_result_token_budget())
+
+
+async def atrace_entity(
+    entity: str,
+    kind: str = "auto",
+    artifact_types: Optional[List[str]] = None,
+    max_results: int = 100
+) -> str:
+    """trace_entity의 비동기 버전"""
+    return await asyncio.to_thread(trace_entity, entity, kind, artifact_types, max_results)
+
+
+trace_entity_tool = StructuredTool.from_function(
+    func=trace_entity,
+    coroutine=atrace_entity,
+    name="trace_entity_tool"
+)
+
+
+FINISH_TOOL_NAME = "finish_analysis_tool"
+
+
+def finish_analysis(
+    summary: str,
+    evidence_artifact_ids: Optional[List[str]] = None,
+    evidence_handles: Optional[List[str]] = None
+) -> str:
+    """
+    조사를 마치고 최종 보고서 생성 단계로 넘어갑니다. (분석 종료 신호)
+    
+    시나리오를 구성할 충분한 증거를 확보했다고 판단되면 이 도구를 호출하세요.
+    호출 즉시 추가 추론 없이 보고서 생성이 시작되므로, 더 조사할 내용이 있으면 호출하지 마세요.
+    
+    Args:
+        summary: 확보한 증거와 결론 요약 (보고서 생성 시 참고)
+        evidence_artifact_ids: 핵심 근거 아티팩트 ID 목록 (예: ["artifact_045", "artifact_067"])
+        evidence_handles: 보고서 근거로 쓸 도구 결과의 핸들 목록 (도구 결과의 📎 [ev_0003] 표시, 예: ["ev_0003"])
+    
+    Returns:
+        str: 종료 확인 메시지
+    
+    Examples:
+        >>> finish_analysis_tool(summary="USB로 기밀 문서 복사 후 휴지통 삭제 확인", evidence_artifact_ids=["artifact_045"], evidence_handles=["ev_0003"])
+    """
+    evidence = [artifact_id for artifact_id in dict.fromkeys(evidence_artifact_ids or []) if artifact_id]
+    handles = [handle for handle in dict.fromkeys(evidence_handles or []) if handle]
+    logger.info("분석 종료 신호: 근거 %d개, 인용 결과 %d개", len(evidence), len(handles))
+    return f"✅ 분석 종료 (근거 아티팩트 {len(evidence)}개, 인용 결과 {len(handles)}개) → 최종 보고서 생성 단계로 이동"
+
+
+finish_analysis_tool = StructuredTool.from_function(
+    func=finish_analysis,
+    name=FINISH_TOOL_NAME
+)
+
+
+# 웹 검색 도구 (Tavily, LLM_MODE=record/replay이면 기록/재생)
+web_search_tool = create_web_search_tool()
 
 
 # 모든 도구를 리스트로 export
 agent_tools = [
     search_artifacts_tool,  # 통합 검색 도구 (query_planner + artifact_search)
-    web_search_tool
+    batch_search_artifacts_tool,  # 다중 목표 배치 검색 도구
+    search_next_page_tool,  # 이전 검색의 다음 페이지 조회
+    aggregate_artifacts_tool,  # 로컬 인덱스 기반 개수/통계 집계
+    timeline_window_tool,  # 기준 시각 전후 시간 창 조회
+    get_artifacts_by_ids_tool,  # ID로 원본 아티팩트 조회
+    trace_entity_tool,  # 파일명/경로/장치/도메인 교차 추적
+    web_search_tool,
+    finish_analysis_tool  # 분석 종료 신호 (라우터가 LLM 호출 없이 종료 판단)
 ]
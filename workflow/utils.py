@@ -1,24 +1,65 @@
 """
 워크플로우 유틸리티 함수
+- 환경 변수 설정 읽기
 - 메타데이터 추출 및 포맷팅
 - 에러 응답 생성
+
+다른 workflow 모듈을 import 시점에 불러오지 않음 → DB / 모델 계층에서도 순환 없이 설정 헬퍼 사용
+(llm_small / llm_medium / llm_large는 처음 접근할 때 생성)
 """
 import os
 import logging
 from dotenv import load_dotenv
 from datetime import date, datetime
-from typing import Any, Dict, List, Optional, Union
-from workflow.database import VectorDBConfig, get_chroma_client
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+if TYPE_CHECKING:
+    from workflow.database import VectorDBConfig
 
 env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
 load_dotenv(env_path)
 
-from langchain.chat_models import init_chat_model
-
 logger = logging.getLogger(__name__)
-llm_small = init_chat_model("google_genai:gemini-2.5-flash-lite", temperature=0)
-llm_medium = init_chat_model("google_genai:gemini-2.5-flash", temperature=0)
-llm_large = init_chat_model("google_genai:gemini-2.5-pro", temperature=0)
+
+_LLM_TIERS = ("small", "medium", "large")
+
+
+def __getattr__(name: str) -> Any:
+    """llm_small / llm_medium / llm_large → 등급별 공유 채팅 모델"""
+    if name.startswith("llm_") and name[len("llm_"):] in _LLM_TIERS:
+        from workflow.llm_factory import get_chat_model
+        return get_chat_model(name[len("llm_"):])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# --------------------------------------------------------------------------
+# 환경 변수 설정
+# --------------------------------------------------------------------------
+# .env.template을 그대로 복사한 .env는 값이 빈 키를 남김 → 빈 문자열은 미설정으로 취급
+# 설정은 사용 시점에 읽음 (import 이후에 로드되거나 테스트에서 바꾼 값도 반영)
+
+def env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    """문자열 설정 (비어 있으면 default)"""
+    value = os.getenv(name)
+    return value if value and value.strip() else default
+
+
+def env_int(name: str, default: int) -> int:
+    """정수 설정 (비어 있으면 default)"""
+    return int(env_str(name) or default)
+
+
+def env_float(name: str, default: float) -> float:
+    """실수 설정 (비어 있으면 default)"""
+    return float(env_str(name) or default)
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """on/off 설정 (1 / true / yes / on → True, 비어 있으면 default)"""
+    value = env_str(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
 
 
 # --------------------------------------------------------------------------
@@ -48,14 +89,14 @@ class MetadataExtractionError(ChromaDBError):
 
 def get_metadata_info(
     collection_name: str,
-    config: Union[None, dict, VectorDBConfig] = None
+    config: Union[None, dict, "VectorDBConfig"] = None
 ) -> Dict:
     """
     벡터 DB에서 메타데이터 통계 정보 추출
     (artifact_types, datetime_range, total_count)
     """
     try:
-        from workflow.database import normalize_config
+        from workflow.database import get_chroma_client, normalize_config, physical_collections
         
         # Config 정규화
         db_config = normalize_config(config)
@@ -63,15 +104,20 @@ def get_metadata_info(
         # 전역 클라이언트 가져오기
         client = get_chroma_client(db_config)
         
-        # 컬렉션 가져오기
+        # 컬렉션 가져오기 (파티션 분할 저장된 경우 모든 파티션)
         try:
-            collection = client.get_collection(name=collection_name)
+            collections = [
+                client.get_collection(name=name)
+                for name in physical_collections(collection_name, db_config)
+            ]
         except Exception as e:
             raise CollectionNotFoundError(collection_name) from e
         
         # 메타데이터 가져오기
-        results = collection.get(include=["metadatas"])
-        metadatas = results.get("metadatas", [])
+        metadatas = []
+        for collection in collections:
+            results = collection.get(include=["metadatas"])
+            metadatas.extend(results.get("metadatas") or [])
         
         if not metadatas:
             logger.warning("컬렉션 '%s'가 비어있습니다", collection_name)